@@ -0,0 +1,355 @@
+"""
+Benchmarks reproduzíveis dos caminhos críticos do motor, do Model e do banco.
+
+Gera DFAs aleatórios e corpora de palavras a partir de uma semente, mede
+cada operação várias vezes e salva os resultados em JSON, para comparar
+execuções e pegar regressões antes que elas cheguem à versão publicada.
+
+Exemplos:
+    python -m benchmark --saida base.json
+    python -m benchmark --saida novo.json --comparar base.json
+    python -m benchmark --historico 1000 10000 100000 1000000 10000000
+
+Com --comparar, o código de saída é 1 se alguma medida ficou mais lenta
+que a base além da tolerância (--tolerancia, padrão 1.25 = 25%).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from model.banco import DatabaseManager
+from model.dfa import DFA, carregar_numpy
+from model.model import AutomatonModel
+
+# Símbolos de um caractere que não atrapalham o formato de texto das
+# transições ("estado, simbolo -> destino") nem o de listas ("a,b,c")
+_SIMBOLOS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def gerar_dfa(num_estados, tamanho_alfabeto, semente, densidade=1.0, fracao_finais=0.5):
+    """
+    Gera a definição de um DFA aleatório (sempre a mesma para a mesma semente).
+
+    :param densidade: (float) Fração das transições definidas (1.0 = DFA completo).
+    :return: (dict) Parâmetros de DFA(...): estados, alfabeto, transicoes,
+             estado_inicial e estados_finais.
+    """
+    rnd = random.Random(semente)
+    estados = [f"q{i}" for i in range(num_estados)]
+    alfabeto = [_SIMBOLOS[j] if j < len(_SIMBOLOS) else chr(0x4E00 + j) for j in range(tamanho_alfabeto)]
+    transicoes = {}
+    for estado in estados:
+        caminhos = {simbolo: rnd.choice(estados) for simbolo in alfabeto if rnd.random() < densidade}
+        if caminhos:
+            transicoes[estado] = caminhos
+    finais = {estado for estado in estados if rnd.random() < fracao_finais}
+    return {
+        "estados": set(estados),
+        "alfabeto": set(alfabeto),
+        "transicoes": transicoes,
+        "estado_inicial": estados[0],
+        "estados_finais": finais,
+    }
+
+
+def gerar_palavras(alfabeto, quantidade, comprimento, semente):
+    """Gera 'quantidade' palavras aleatórias de 'comprimento' símbolos."""
+    rnd = random.Random(semente)
+    simbolos = sorted(alfabeto)
+    return ["".join(rnd.choices(simbolos, k=comprimento)) for _ in range(quantidade)]
+
+
+def gerar_palavras_com_prefixos(alfabeto, quantidade, comprimento, semente):
+    """
+    Gera palavras de 'comprimento' símbolos com muitos prefixos em comum
+    (como casos de fuzzing): cada uma copia um prefixo de uma palavra já
+    gerada e completa o resto aleatoriamente.
+    """
+    rnd = random.Random(semente)
+    simbolos = sorted(alfabeto)
+    palavras = ["".join(rnd.choices(simbolos, k=comprimento))]
+    for _ in range(quantidade - 1):
+        prefixo = rnd.choice(palavras)[:rnd.randint(comprimento // 2, comprimento)]
+        palavras.append(prefixo + "".join(rnd.choices(simbolos, k=comprimento - len(prefixo))))
+    return palavras[:quantidade]
+
+
+def transicoes_para_texto(transicoes):
+    """Escreve as transições no formato do formulário (entrada de _parse_transitions)."""
+    return "\n".join(
+        f"{origem}, {simbolo} -> {destino}"
+        for origem, caminhos in transicoes.items()
+        for simbolo, destino in caminhos.items()
+    )
+
+
+def medir(funcao, repeticoes=5, preparar=None):
+    """
+    Executa 'funcao' várias vezes e retorna as estatísticas do tempo (em segundos).
+
+    :param preparar: Função chamada antes de cada repetição, fora da medição;
+                     o que ela retorna é passado para 'funcao'.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        argumento = preparar() if preparar else None
+        inicio = time.perf_counter()
+        funcao(argumento) if preparar else funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        "min": min(tempos),
+        "mediana": statistics.median(tempos),
+        "media": statistics.fmean(tempos),
+        "repeticoes": repeticoes,
+    }
+
+
+class Benchmark:
+    """Coleta os resultados, cada um identificado por nome e parâmetros."""
+
+    def __init__(self, semente, repeticoes, pasta):
+        self.semente = semente
+        self.repeticoes = repeticoes
+        self.pasta = pasta
+        self.resultados = []
+
+    def registrar(self, nome, parametros, tempos, unidades=None):
+        """
+        Guarda uma medida.
+        :param unidades: (int) Quantos itens cada repetição processou, para
+                         calcular a vazão (itens por segundo).
+        """
+        resultado = {"nome": nome, "parametros": parametros, **tempos}
+        if unidades:
+            resultado["unidades"] = unidades
+            resultado["por_segundo"] = unidades / tempos["mediana"] if tempos["mediana"] else None
+        self.resultados.append(resultado)
+        vazao = f"  ({resultado['por_segundo']:,.0f}/s)" if resultado.get("por_segundo") else ""
+        print(f"{nome:<28} {_formatar_parametros(parametros):<42} "
+              f"{tempos['mediana'] * 1000:10.3f} ms{vazao}", file=sys.stderr)
+
+    def _novo_banco(self, nome):
+        """Cria um DatabaseManager num arquivo novo da pasta temporária."""
+        caminho = os.path.join(self.pasta, f"{nome}.db")
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        db = DatabaseManager(db_file=caminho)
+        db.connect()
+        db.create_tables()
+        return db
+
+    # --- Motor (DFA) ---
+
+    def dfa_init(self, tamanhos):
+        for num_estados, tamanho_alfabeto in tamanhos:
+            definicao = gerar_dfa(num_estados, tamanho_alfabeto, self.semente)
+            tempos = medir(lambda: DFA(**definicao), self.repeticoes)
+            self.registrar("dfa_init", {"estados": num_estados, "alfabeto": tamanho_alfabeto}, tempos)
+
+    def dfa_run(self, tamanhos, comprimentos):
+        for num_estados, tamanho_alfabeto in tamanhos:
+            definicao = gerar_dfa(num_estados, tamanho_alfabeto, self.semente)
+            dfa = DFA(**definicao)
+            dfa.compilar()
+            for comprimento in comprimentos:
+                palavra = gerar_palavras(definicao["alfabeto"], 1, comprimento, self.semente)[0]
+                tempos = medir(lambda: dfa.run(palavra), self.repeticoes)
+                self.registrar("dfa_run", {"estados": num_estados, "alfabeto": tamanho_alfabeto,
+                                           "comprimento": comprimento}, tempos, unidades=comprimento)
+
+    def dfa_run_batch(self, tamanhos, quantidade, comprimento):
+        for num_estados, tamanho_alfabeto in tamanhos:
+            definicao = gerar_dfa(num_estados, tamanho_alfabeto, self.semente)
+            dfa = DFA(**definicao)
+            palavras = gerar_palavras(definicao["alfabeto"], quantidade, comprimento, self.semente)
+            tempos = medir(lambda: dfa.run_batch(palavras), self.repeticoes)
+            self.registrar("dfa_run_batch", {"estados": num_estados, "alfabeto": tamanho_alfabeto,
+                                             "palavras": quantidade, "comprimento": comprimento},
+                           tempos, unidades=quantidade)
+
+    def dfa_run_batch_prefixos(self, tamanhos, quantidade, comprimento):
+        for num_estados, tamanho_alfabeto in tamanhos:
+            definicao = gerar_dfa(num_estados, tamanho_alfabeto, self.semente)
+            dfa = DFA(**definicao)
+            palavras = gerar_palavras_com_prefixos(definicao["alfabeto"], quantidade, comprimento, self.semente)
+            tempos = medir(lambda: dfa.run_batch(palavras, compartilhar_prefixos=True), self.repeticoes)
+            self.registrar("dfa_run_batch_prefixos", {"estados": num_estados, "alfabeto": tamanho_alfabeto,
+                                                      "palavras": quantidade, "comprimento": comprimento},
+                           tempos, unidades=quantidade)
+
+    # --- Model ---
+
+    def parse_transitions(self, tamanhos):
+        for num_estados, tamanho_alfabeto in tamanhos:
+            texto = transicoes_para_texto(gerar_dfa(num_estados, tamanho_alfabeto, self.semente)["transicoes"])
+            tempos = medir(lambda: AutomatonModel._parse_transitions(texto), self.repeticoes)
+            self.registrar("parse_transitions", {"estados": num_estados, "alfabeto": tamanho_alfabeto},
+                           tempos, unidades=num_estados * tamanho_alfabeto)
+
+    # --- Banco de dados ---
+
+    def definicoes(self, quantidade, num_estados, tamanho_alfabeto):
+        definicoes = [gerar_dfa(num_estados, tamanho_alfabeto, self.semente + i) for i in range(quantidade)]
+        parametros = {"automatos": quantidade, "estados": num_estados, "alfabeto": tamanho_alfabeto}
+
+        def salvar(db):
+            for i, d in enumerate(definicoes):
+                db.save_automaton_definition(f"A{i}", d["estados"], d["alfabeto"], d["estado_inicial"],
+                                             d["estados_finais"], d["transicoes"])
+            db.close()
+
+        tempos = medir(salvar, self.repeticoes, preparar=lambda: self._novo_banco("definicoes"))
+        self.registrar("save_automaton_definition", parametros, tempos, unidades=quantidade)
+
+        db = DatabaseManager(db_file=os.path.join(self.pasta, "definicoes.db"))
+        db.connect()
+        tempos = medir(db.get_all_automaton_definitions, self.repeticoes)
+        self.registrar("get_all_automaton_definitions", parametros, tempos, unidades=quantidade)
+        db.close()
+
+    def historico(self, tamanhos, tamanho_lote=10000, tamanho_pagina=200):
+        """
+        Insere o histórico em etapas até cada tamanho de 'tamanhos' e, a cada
+        etapa, mede a inserção e as consultas usadas pela interface.
+        """
+        db = self._novo_banco("historico")
+        rnd = random.Random(self.semente)
+        nomes = [f"A{i}" for i in range(20)]
+        total = 0
+        for tamanho in sorted(tamanhos):
+            novas = tamanho - total
+            inicio = time.perf_counter()
+            while total < tamanho:
+                lote = min(tamanho_lote, tamanho - total)
+                db.save_test_results(
+                    (rnd.choice(nomes), f"{rnd.getrandbits(32):b}", rnd.random() < 0.5) for _ in range(lote)
+                )
+                total += lote
+            duracao = time.perf_counter() - inicio
+            tempos = {"min": duracao, "mediana": duracao, "media": duracao, "repeticoes": 1}
+            self.registrar("historico_insert", {"linhas": tamanho, "novas": novas}, tempos, unidades=novas)
+
+            parametros = {"linhas": tamanho, "pagina": tamanho_pagina}
+            primeira = db.get_test_history(limit=tamanho_pagina)
+            self.registrar("historico_primeira_pagina", parametros,
+                           medir(lambda: db.get_test_history(limit=tamanho_pagina), self.repeticoes))
+
+            meio = db._execute_query("SELECT timestamp, id FROM historico_testes WHERE id = ?",
+                                     (tamanho // 2,), fetch_one=True)
+            self.registrar("historico_pagina_profunda", parametros,
+                           medir(lambda: db.get_test_history(after=tuple(meio), limit=tamanho_pagina),
+                                 self.repeticoes))
+
+            self.registrar("historico_filtro_automato", parametros,
+                           medir(lambda: db.get_test_history(limit=tamanho_pagina, automaton=nomes[0]),
+                                 self.repeticoes))
+
+            desde = primeira[-1][4] if primeira else 0
+            self.registrar("historico_desde", parametros,
+                           medir(lambda: db.get_test_history_since(desde), self.repeticoes))
+        db.close()
+
+
+def _formatar_parametros(parametros):
+    return " ".join(f"{chave}={valor}" for chave, valor in parametros.items())
+
+
+def _chave(resultado):
+    return resultado["nome"], json.dumps(resultado["parametros"], sort_keys=True)
+
+
+def comparar(resultados, base, tolerancia):
+    """
+    Compara as medianas com as de uma execução anterior.
+    :return: (list) Tuplas (resultado, mediana da base, razão) das medidas
+             que ficaram mais lentas que base * tolerancia.
+    """
+    medianas_base = {_chave(r): r["mediana"] for r in base["resultados"]}
+    regressoes = []
+    for resultado in resultados:
+        mediana_base = medianas_base.get(_chave(resultado))
+        if mediana_base:
+            razao = resultado["mediana"] / mediana_base
+            if razao > tolerancia:
+                regressoes.append((resultado, mediana_base, razao))
+    return regressoes
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmark",
+                                     description="Benchmarks do motor, do Model e do banco de dados.")
+    parser.add_argument("--semente", type=int, default=1234, help="Semente dos dados gerados (padrão: 1234).")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Repetições de cada medida (padrão: 5).")
+    parser.add_argument("--estados", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Números de estados dos DFAs gerados.")
+    parser.add_argument("--alfabeto", type=int, nargs="+", default=[2, 26],
+                        help="Tamanhos de alfabeto dos DFAs gerados.")
+    parser.add_argument("--comprimentos", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="Comprimentos das palavras de DFA.run.")
+    parser.add_argument("--historico", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Tamanhos do histórico medidos (até 10^7, se houver tempo e disco).")
+    parser.add_argument("--saida", help="Arquivo JSON onde salvar os resultados.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar.")
+    parser.add_argument("--tolerancia", type=float, default=1.25,
+                        help="Razão máxima aceita em relação à base (padrão: 1.25).")
+    return parser
+
+
+def main(argv=None):
+    args = _criar_parser().parse_args(argv)
+    tamanhos = [(n, k) for n in args.estados for k in args.alfabeto]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        bench = Benchmark(args.semente, args.repeticoes, pasta)
+        # As mensagens do banco e do Model não entram na medição nem na saída
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            bench.dfa_init(tamanhos)
+            bench.dfa_run(tamanhos, args.comprimentos)
+            bench.dfa_run_batch(tamanhos, quantidade=10000, comprimento=32)
+            bench.dfa_run_batch_prefixos(tamanhos, quantidade=10000, comprimento=32)
+            bench.parse_transitions(tamanhos)
+            bench.definicoes(quantidade=50, num_estados=max(args.estados), tamanho_alfabeto=max(args.alfabeto))
+            bench.historico(args.historico)
+
+    np = carregar_numpy()
+    relatorio = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "numpy": np.__version__ if np is not None else None,
+        "semente": args.semente,
+        "repeticoes": args.repeticoes,
+        "resultados": bench.resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"Resultados salvos em '{args.saida}'.", file=sys.stderr)
+    else:
+        json.dump(relatorio, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(bench.resultados, base, args.tolerancia)
+        for resultado, mediana_base, razao in regressoes:
+            print(f"REGRESSÃO: {resultado['nome']} {_formatar_parametros(resultado['parametros'])}: "
+                  f"{mediana_base * 1000:.3f} ms -> {resultado['mediana'] * 1000:.3f} ms ({razao:.2f}x)",
+                  file=sys.stderr)
+        if regressoes:
+            return 1
+        print("Nenhuma regressão em relação à base.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
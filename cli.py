@@ -0,0 +1,219 @@
+"""
+Executor de testes em lote pela linha de comando, sem interface gráfica.
+
+Usa o DatabaseManager e o AutomatonModel diretamente (nunca importa o
+ttkbootstrap nem a View), então inicia rápido e roda em servidores sem tela.
+
+Exemplos:
+    python -m cli --listar
+    python -m cli par_de_zeros palavras.txt
+    cat palavras.txt | python -m cli par_de_zeros --formato csv --workers 4 --historico
+    python -m cli --todos palavras.txt
+
+Cada linha da entrada é uma palavra (uma linha vazia é a palavra vazia).
+Os resultados são escritos na saída padrão conforme ficam prontos, um por
+linha, em NDJSON ({"palavra": ..., "aceita": ..., "estado": ...}) ou CSV.
+Com --todos (ou --automatos), cada palavra é testada em vários autômatos
+numa única passada, e a saída diz quais a aceitaram
+({"palavra": ..., "aceita_por": [...]}).
+"""
+import argparse
+import contextlib
+import csv
+import os
+import sys
+from itertools import islice
+from json.encoder import encode_basestring
+
+from model.banco import DatabaseManager
+from model.model import AutomatonModel
+
+
+def _ler_blocos(entrada, tamanho_bloco):
+    """Divide as linhas da entrada em blocos de palavras (sem o '\\n' final)."""
+    palavras = (linha.rstrip('\r\n') for linha in entrada)
+    while True:
+        bloco = list(islice(palavras, tamanho_bloco))
+        if not bloco:
+            return
+        yield bloco
+
+
+def _nome_estado(nomes_estados, estado):
+    """Nome do estado final, ou None (estado de morte ou símbolo inválido)."""
+    if nomes_estados is None:
+        return estado # NFA: o Model já devolve o nome (ou None)
+    estado = int(estado)
+    if 0 <= estado < len(nomes_estados):
+        return nomes_estados[estado]
+    return None
+
+
+def _como_lista(valores):
+    """Converte um array NumPy em lista de valores Python (mais rápida de percorrer)."""
+    return valores.tolist() if hasattr(valores, 'tolist') else valores
+
+
+def _linhas_ndjson(bloco, aceitas, estados, nomes_estados, sufixos):
+    """
+    Formata os resultados de um bloco em NDJSON. O final de cada linha só
+    depende do estado final, então ele é montado uma vez por estado
+    (em 'sufixos') e só a palavra é codificada a cada linha.
+    """
+    linhas = []
+    for palavra, aceita, estado in zip(bloco, _como_lista(aceitas), _como_lista(estados)):
+        sufixo = sufixos.get(estado)
+        if sufixo is None:
+            nome = _nome_estado(nomes_estados, estado)
+            sufixo = sufixos[estado] = ', "aceita": %s, "estado": %s}\n' % (
+                "true" if aceita else "false", "null" if nome is None else encode_basestring(nome))
+        linhas.append('{"palavra": ' + encode_basestring(palavra) + sufixo)
+    return "".join(linhas)
+
+
+def _linhas_csv(bloco, aceitas, estados, nomes_estados, colunas):
+    """Gera as linhas CSV de um bloco (as colunas de cada estado são montadas uma vez)."""
+    for palavra, aceita, estado in zip(bloco, _como_lista(aceitas), _como_lista(estados)):
+        resto = colunas.get(estado)
+        if resto is None:
+            resto = colunas[estado] = ("true" if aceita else "false", _nome_estado(nomes_estados, estado) or "")
+        yield (palavra,) + resto
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Testa palavras em um autômato salvo, sem abrir a interface gráfica."
+    )
+    parser.add_argument("automato", nargs="?", help="Nome do autômato salvo no banco.")
+    parser.add_argument("entrada", nargs="?", default="-",
+                        help="Arquivo com uma palavra por linha ('-' ou omitido: entrada padrão).")
+    parser.add_argument("--db", default="automata.db", help="Arquivo do banco SQLite (padrão: automata.db).")
+    parser.add_argument("--formato", choices=("ndjson", "csv"), default="ndjson",
+                        help="Formato da saída (padrão: ndjson).")
+    parser.add_argument("--historico", action="store_true",
+                        help="Grava os testes no histórico do banco (desligado por padrão).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Número de processos (padrão: 1; 0 = número de núcleos).")
+    parser.add_argument("--bloco", type=int, default=4096,
+                        help="Palavras lidas e executadas por vez (padrão: 4096).")
+    parser.add_argument("--prefixos", action="store_true",
+                        help="Percorre uma vez só os prefixos comuns às palavras de cada bloco "
+                             "(para entradas com muitos prefixos repetidos; ignora --workers).")
+    parser.add_argument("--listar", action="store_true", help="Lista os autômatos salvos e sai.")
+    parser.add_argument("--todos", action="store_true",
+                        help="Testa cada palavra em todos os autômatos salvos (sem o nome do autômato).")
+    parser.add_argument("--automatos",
+                        help="Como --todos, mas só nestes autômatos (nomes separados por vírgula).")
+    return parser
+
+
+def main(argv=None):
+    args = _criar_parser().parse_args(argv)
+    classificar = args.todos or args.automatos is not None
+    if classificar:
+        # Sem o nome de um autômato, o único posicional é a entrada
+        if args.entrada != "-":
+            print("Com --todos/--automatos, informe só a entrada (sem o nome do autômato).", file=sys.stderr)
+            return 2
+        args.entrada = args.automato or "-"
+    elif not args.listar and not args.automato:
+        print("Informe o nome do autômato (ou use --listar).", file=sys.stderr)
+        return 2
+    if args.bloco < 1 or args.workers < 0:
+        print("--bloco deve ser positivo e --workers não pode ser negativo.", file=sys.stderr)
+        return 2
+
+    # As mensagens do Model e do banco vão para stderr: a saída padrão
+    # fica só com os resultados.
+    saida = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        db_manager = DatabaseManager(db_file=args.db, buffer_historico=args.historico,
+                                     gravar_historico=args.historico)
+        try:
+            db_manager.connect()
+            model = AutomatonModel(db_manager)
+
+            if args.listar:
+                for nome in model.get_available_automata_names():
+                    saida.write(nome + "\n")
+                return 0
+
+            if classificar:
+                return _classificar(model, args, saida)
+            return _executar(model, args, saida)
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+        except BrokenPipeError:
+            # A saída foi fechada antes do fim (ex: '| head'): não é um erro.
+            # Aponta stdout para o devnull para o Python não reclamar ao sair.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), saida.fileno())
+            return 0
+        finally:
+            db_manager.close()
+
+
+def _executar(model, args, saida):
+    """Lê as palavras, executa os blocos e escreve os resultados."""
+    nomes_estados = model.get_state_names(args.automato)
+    workers = args.workers or os.cpu_count() or 1
+
+    sufixos = {} # Parte da saída que só depende do estado final, por estado
+    escritor = None
+    if args.formato == "csv":
+        escritor = csv.writer(saida, lineterminator="\n")
+        escritor.writerow(["palavra", "aceita", "estado"])
+
+    with contextlib.ExitStack() as pilha:
+        if args.entrada == "-":
+            entrada = sys.stdin
+        else:
+            entrada = pilha.enter_context(open(args.entrada, 'r', encoding='utf-8'))
+
+        blocos = _ler_blocos(entrada, args.bloco)
+        for bloco, aceitas, estados in model.run_test_blocks(
+                args.automato, blocos, workers=workers, salvar_historico=args.historico,
+                compartilhar_prefixos=args.prefixos):
+            if escritor:
+                escritor.writerows(_linhas_csv(bloco, aceitas, estados, nomes_estados, sufixos))
+            else:
+                saida.write(_linhas_ndjson(bloco, aceitas, estados, nomes_estados, sufixos))
+            saida.flush()
+    return 0
+
+
+def _classificar(model, args, saida):
+    """Testa cada palavra em vários autômatos e escreve quais a aceitaram."""
+    nomes = None
+    if args.automatos is not None:
+        nomes = [nome.strip() for nome in args.automatos.split(',') if nome.strip()]
+
+    escritor = None
+    if args.formato == "csv":
+        escritor = csv.writer(saida, lineterminator="\n")
+        escritor.writerow(["palavra", "aceita_por"])
+
+    with contextlib.ExitStack() as pilha:
+        if args.entrada == "-":
+            entrada = sys.stdin
+        else:
+            entrada = pilha.enter_context(open(args.entrada, 'r', encoding='utf-8'))
+
+        for bloco in _ler_blocos(entrada, args.bloco):
+            nomes_bloco, resultados = model.classify_words(bloco, nomes, salvar_historico=args.historico)
+            aceitos = ([nome for nome, aceita in zip(nomes_bloco, aceitas) if aceita] for aceitas in resultados)
+            if escritor:
+                escritor.writerows((palavra, ";".join(aceita_por)) for palavra, aceita_por in zip(bloco, aceitos))
+            else:
+                saida.write("".join(
+                    '{"palavra": %s, "aceita_por": [%s]}\n' % (
+                        encode_basestring(palavra), ", ".join(encode_basestring(nome) for nome in aceita_por))
+                    for palavra, aceita_por in zip(bloco, aceitos)
+                ))
+            saida.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
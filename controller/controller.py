@@ -1,10 +1,15 @@
 
 from model.model import AutomatonModel
 from view.view import AutomatonView
+from controller.tarefas import TaskRunner
+import os
 import sys
 
 class AutomatonController:
     
+    # Tamanho (em caracteres) dos blocos lidos ao carregar um arquivo
+    FILE_READ_BLOCK = 1 << 16
+    
     def __init__(self, model: AutomatonModel, view: AutomatonView):
         """
         Inicializa o Controller.
@@ -15,6 +20,13 @@ class AutomatonController:
         self.model = model
         self.view = view
         
+        # Id da entrada mais recente do histórico já exibida na View
+        self._history_last_id = 0
+        
+        # Tarefas em segundo plano (testes, salvamentos e importações),
+        # para que a janela não congele durante trabalhos pesados
+        self.tasks = TaskRunner(self.view.root)
+        
         # --- "Injeta" este controller na View ---
         # Isso permite que a View vincule seus botões a estes métodos
         self.view.set_controller(self)
@@ -64,19 +76,52 @@ class AutomatonController:
                 self.view.show_message("Atenção", "Por favor, selecione um autômato.", type="warning")
                 return
 
-            # 2. Manda o Model executar a lógica
-            aceita, caminho = self.model.run_test(automaton_name, word)
+            # 2. Manda o Model executar a lógica (em segundo plano).
+            #    Um novo teste substitui o anterior, se ainda estiver rodando.
+            def tarefa(t):
+                t.progresso(f"Testando palavra de {len(word)} símbolos...")
+                return self.model.run_test(automaton_name, word, tarefa=t)
             
-            # 3. Manda a View exibir o resultado
-            self.view.show_test_result(aceita, caminho)
+            def on_success(resultado):
+                aceita, caminho, decided_at, motivo = resultado
+                # 3. Manda a View exibir o resultado, com a posição em que o
+                #    veredito foi decidido antecipadamente e o motivo da
+                #    rejeição, como o Model os devolveu (veja DFA.run_detalhado)
+                self.view.show_test_result(aceita, caminho, decided_at, len(word), motivo)
+                
+                # 4. (Bônus) Acrescenta ao histórico só o que foi salvo desde a última vez
+                self._append_new_history()
             
-            # 4. (Bônus) Atualiza o histórico, já que um novo teste foi salvo
-            self.on_refresh_history_click()
+            def on_error(e):
+                self.view.show_message("Erro no Teste", f"Ocorreu um erro: {e}", type="error")
+            
+            self._submit_task("teste", tarefa, on_success, on_error)
             
         except Exception as e:
             print(f"Erro no teste: {e}", file=sys.stderr)
             self.view.show_message("Erro no Teste", f"Ocorreu um erro: {e}", type="error")
 
+    def on_classify_click(self):
+        """
+        Chamado quando o botão "Testar em Todos" é clicado: testa a palavra
+        em todos os autômatos salvos de uma vez.
+        """
+        word = self.view.get_test_data()["word"]
+        
+        def tarefa(t):
+            t.progresso("Testando a palavra em todos os autômatos...")
+            return self.model.classify_word(word, tarefa=t)
+        
+        def on_success(resultado):
+            aceitos = [nome for nome, aceita in resultado.items() if aceita]
+            self.view.show_classification_result(aceitos, len(resultado))
+            self._append_new_history()
+        
+        def on_error(e):
+            self.view.show_message("Erro no Teste", f"Ocorreu um erro: {e}", type="error")
+        
+        self._submit_task("teste", tarefa, on_success, on_error)
+
     def on_save_automaton_click(self):
         """
         Chamado quando o botão "Salvar Autômato" é clicado.
@@ -85,30 +130,51 @@ class AutomatonController:
             # 1. Pega todos os dados brutos (strings) do formulário na View
             data = self.view.get_new_automaton_data()
             
-            # 2. Manda o Model tentar criar (parsear, validar e salvar)
-            self.model.create_new_automaton(
-                nome=data["nome"],
-                estados_str=data["estados_str"],
-                alfabeto_str=data["alfabeto_str"],
-                inicial_str=data["inicial_str"],
-                finais_str=data["finais_str"],
-                transicoes_str=data["transicoes_str"]
-            )
-            
-            # 3. Se o Model NÃO deu erro, foi um sucesso
-            self.view.show_message("Sucesso", f"Autômato '{data['nome']}' salvo com sucesso!")
+            # 2. Manda o Model tentar criar (parsear, validar e salvar), em segundo plano
+            def tarefa(t):
+                t.progresso(f"Validando e salvando '{data['nome']}'...")
+                return self.model.create_new_automaton(
+                    nome=data["nome"],
+                    estados_str=data["estados_str"],
+                    alfabeto_str=data["alfabeto_str"],
+                    inicial_str=data["inicial_str"],
+                    finais_str=data["finais_str"],
+                    transicoes_str=data["transicoes_str"],
+                    tipo=data["tipo"],
+                    verificar_duplicatas=data["verificar_duplicatas"],
+                    tarefa=t
+                )
             
-            # 4. Limpa o formulário na View
-            self.view.clear_create_form()
+            def on_success(duplicatas):
+                # 3. Se o Model NÃO deu erro, foi um sucesso
+                if duplicatas:
+                    self.view.show_message(
+                        "Salvo (duplicado)",
+                        f"Autômato '{data['nome']}' salvo, mas ele aceita a mesma linguagem que: "
+                        f"{', '.join(duplicatas)}.",
+                        type="warning"
+                    )
+                else:
+                    self.view.show_message("Sucesso", f"Autômato '{data['nome']}' salvo com sucesso!")
+                
+                # 4. Limpa o formulário na View
+                self.view.clear_create_form()
+                
+                # 5. Atualiza a lista de autômatos na Aba 1
+                self._load_automata_list()
             
-            # 5. Atualiza a lista de autômatos na Aba 1
-            self._load_automata_list()
+            self._submit_task("salvar", tarefa, on_success, self._on_save_error)
             
-        except ValueError as e:
+        except Exception as e:
+            self._on_save_error(e)
+
+    def _on_save_error(self, e):
+        """Mostra um erro do salvamento de um autômato."""
+        if isinstance(e, ValueError):
             # Erro de validação (ex: nome duplicado, formato inválido)
             print(f"Erro de validação ao salvar: {e}", file=sys.stderr)
             self.view.show_message("Erro de Validação", str(e), type="error")
-        except Exception as e:
+        else:
             # Outro erro inesperado (ex: DB falhou)
             print(f"Erro inesperado ao salvar: {e}", file=sys.stderr)
             self.view.show_message("Erro Inesperado", f"Ocorreu um erro: {e}", type="error")
@@ -119,11 +185,10 @@ class AutomatonController:
         (ou após um novo teste ser executado).
         """
         try:
-            # 1. Pega os dados do histórico do Model
-            history_rows = self.model.get_test_history()
-            
-            # 2. Manda a View popular a tabela
-            self.view.populate_history_table(history_rows)
+            # A View recarrega a tabela virtual, que busca só a primeira
+            # página (por fetch_history_page) e as demais sob demanda.
+            self.view.reset_history_table()
+            self._history_last_id = self.model.get_last_history_id()
             
         except Exception as e:
             print(f"Erro ao carregar histórico: {e}", file=sys.stderr)
@@ -133,6 +198,30 @@ class AutomatonController:
                 type="error"
             )
 
+    def _append_new_history(self):
+        """
+        Busca só as entradas do histórico novas desde a última atualização
+        e manda a View colocá-las no topo da tabela.
+        """
+        try:
+            new_rows = self.model.get_test_history_since(self._history_last_id)
+            if new_rows:
+                self.view.prepend_history_rows(new_rows)
+                self._history_last_id = new_rows[0][4]
+        except Exception as e:
+            print(f"Erro ao atualizar histórico: {e}", file=sys.stderr)
+
+    def fetch_history_page(self, after, limit):
+        """
+        Chamado pela tabela virtual da View para buscar uma página do
+        histórico (do mais recente para o mais antigo) a partir do cursor 'after'.
+        """
+        try:
+            return self.model.get_test_history(after=after, limit=limit)
+        except Exception as e:
+            print(f"Erro ao carregar página do histórico: {e}", file=sys.stderr)
+            return []
+
     # (Dentro da classe AutomatonController)
 
     def on_clear_history_click(self):
@@ -180,19 +269,27 @@ class AutomatonController:
             print("Carregamento de arquivo cancelado pelo usuário.")
             return
 
-        # 2. Se um arquivo foi pego, tenta lê-lo
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                file_content = f.read()
-        except Exception as e:
-            self.view.show_message("Erro de Leitura", f"Não foi possível ler o arquivo '{filepath}'.\nErro: {e}", "error")
-            return
-            
-        # 3. Manda o Model processar o conteúdo do arquivo
-        try:
-            # Esta é a nova função que criamos no Model
-            self.model.create_automaton_from_file_content(file_content)
+        # 2. Em segundo plano: lê o arquivo (em blocos, com progresso)
+        #    e manda o Model processar o conteúdo
+        def tarefa(t):
+            try:
+                tamanho = os.path.getsize(filepath) or 1
+                partes = []
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    for bloco in iter(lambda: f.read(self.FILE_READ_BLOCK), ''):
+                        t.verificar_cancelamento()
+                        partes.append(bloco)
+                        t.progresso(f"Lendo '{os.path.basename(filepath)}'...", min(f.tell() / tamanho, 1.0))
+                file_content = ''.join(partes)
+            except OSError as e:
+                raise IOError(f"Não foi possível ler o arquivo '{filepath}'.\nErro: {e}")
             
+            t.verificar_cancelamento()
+            t.progresso("Validando e salvando o autômato...")
+            # 3. Esta é a nova função que criamos no Model
+            self.model.create_automaton_from_file_content(file_content, tarefa=t)
+        
+        def on_success(_):
             # 4. Sucesso!
             self.view.show_message("Sucesso", "Autômato carregado do arquivo e salvo com sucesso!")
             
@@ -201,7 +298,101 @@ class AutomatonController:
             
             # 6. Limpa o formulário (pois os dados foram carregados)
             self.view.clear_create_form()
+        
+        def on_error(e):
+            if isinstance(e, IOError):
+                self.view.show_message("Erro de Leitura", str(e), "error")
+            else:
+                # Pega erros de formato do arquivo (do Model)
+                self.view.show_message("Erro de Formato", f"O arquivo está mal formatado ou a definição é inválida.\n\nErro: {e}", "error")
+        
+        self._submit_task("arquivo", tarefa, on_success, on_error)
 
-        except (ValueError, Exception) as e:
-            # Pega erros de formato do arquivo (do Model)
-            self.view.show_message("Erro de Formato", f"O arquivo está mal formatado ou a definição é inválida.\n\nErro: {e}", "error")
\ No newline at end of file
+    def on_bulk_import_click(self):
+        """
+        Chamado quando o botão "Importar Pasta" é clicado: importa todos
+        os arquivos .txt da pasta escolhida de uma vez.
+        """
+        directory = self.view.get_directory_to_import()
+        if not directory:
+            print("Importação em lote cancelada pelo usuário.")
+            return
+        
+        def tarefa(t):
+            t.progresso(f"Importando definições de '{directory}'...")
+            return self.model.import_automata_bulk(directory, tarefa=t)
+        
+        def on_success(relatorio):
+            erros = {arquivo: erro for arquivo, erro in relatorio.items() if erro}
+            importados = len(relatorio) - len(erros)
+            message = f"{importados} autômato(s) importado(s), {len(erros)} arquivo(s) com erro."
+            if erros:
+                # Mostra só os primeiros erros, para o pop-up não ficar gigante
+                detalhes = "\n".join(f"- {arquivo}: {erro}" for arquivo, erro in list(erros.items())[:10])
+                self.view.show_message("Importação em Lote", f"{message}\n\n{detalhes}", type="warning")
+            else:
+                self.view.show_message("Importação em Lote", message)
+            self._load_automata_list()
+        
+        def on_error(e):
+            self.view.show_message("Erro na Importação", f"Ocorreu um erro: {e}", type="error")
+        
+        self._submit_task("importacao", tarefa, on_success, on_error)
+
+    # --- Diagnóstico ---
+
+    def on_toggle_metrics(self):
+        """
+        Chamado quando a opção "Coletar métricas" é marcada ou desmarcada.
+        """
+        ativo = self.view.is_metrics_collection_checked()
+        self.model.set_metrics_enabled(ativo)
+        print(f"Coleta de métricas {'ligada' if ativo else 'desligada'}.")
+
+    def on_refresh_metrics_click(self):
+        """
+        Chamado quando o botão "Atualizar" da aba "Diagnóstico" é clicado.
+        """
+        self.view.populate_metrics_table(self.model.get_metrics())
+
+    def on_reset_metrics_click(self):
+        """
+        Chamado quando o botão "Zerar" da aba "Diagnóstico" é clicado.
+        """
+        self.model.reset_metrics()
+        self.view.populate_metrics_table({})
+
+    # --- Tarefas em segundo plano ---
+
+    def _submit_task(self, tipo, tarefa, on_success, on_error):
+        """
+        Roda 'tarefa' fora da thread do Tk, mostrando o progresso na View.
+        Os callbacks rodam de volta na thread do Tk.
+        """
+        def finalizar():
+            if not self.tasks.is_busy():
+                self.view.hide_progress()
+        
+        def sucesso(resultado):
+            finalizar()
+            on_success(resultado)
+        
+        def erro(e):
+            finalizar()
+            on_error(e)
+        
+        self.view.show_progress("Processando...")
+        self.tasks.submit(tipo, tarefa, sucesso, erro, on_progress=self.view.show_progress)
+
+    def on_cancel_click(self):
+        """
+        Chamado quando o botão "Cancelar" é clicado: cancela as tarefas
+        em andamento. As que já estão gravando no banco não podem mais ser
+        canceladas: elas terminam e o resultado é aplicado normalmente.
+        """
+        if self.tasks.cancel():
+            print("Tarefas em andamento canceladas pelo usuário.")
+        if self.tasks.is_busy():
+            self.view.show_progress("Concluindo (já não pode ser cancelado)...")
+        else:
+            self.view.hide_progress("Cancelado.")
\ No newline at end of file
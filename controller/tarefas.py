@@ -0,0 +1,175 @@
+import queue
+import sys
+import threading
+
+
+class TarefaCancelada(Exception):
+    """Disparada dentro de uma tarefa quando ela foi cancelada."""
+
+
+class Tarefa:
+    """
+    Representa uma execução em segundo plano. A função da tarefa recebe
+    este objeto para informar progresso e verificar se foi cancelada.
+
+    Uma tarefa que grava algo (ex: no banco) chama confirmar() logo antes:
+    daí em diante ela não pode mais ser cancelada e o resultado sempre é
+    entregue, para que a interface não diga "Cancelado" de algo que foi feito.
+    """
+
+    def __init__(self, tipo, geracao, fila):
+        self.tipo = tipo
+        self.geracao = geracao
+        self.cancelado = threading.Event()
+        self.confirmada = False
+        self.callbacks = (None, None, None) # (on_success, on_error, on_progress)
+        self._lock = threading.Lock() # Entre cancelar() e confirmar()
+        self._fila = fila
+
+    def progresso(self, mensagem, fracao=None):
+        """
+        Informa o progresso (chamado na thread de trabalho).
+        :param fracao: (float) De 0 a 1, ou None se não for possível medir.
+        """
+        self._fila.put((self, "progresso", (mensagem, fracao)))
+
+    def verificar_cancelamento(self):
+        """Dispara TarefaCancelada se a tarefa foi cancelada."""
+        if self.cancelado.is_set():
+            raise TarefaCancelada("Tarefa cancelada.")
+
+    def confirmar(self):
+        """
+        Marca o ponto sem volta da tarefa (chamado na thread de trabalho):
+        dispara TarefaCancelada se ela já foi cancelada e, senão, ela não
+        pode mais ser cancelada.
+        """
+        with self._lock:
+            self.verificar_cancelamento()
+            self.confirmada = True
+
+    def cancelar(self):
+        """
+        Cancela a tarefa, se ela ainda não foi confirmada.
+        :return: (bool) False se ela já passou de confirmar().
+        """
+        with self._lock:
+            if self.confirmada:
+                return False
+            self.cancelado.set()
+            return True
+
+
+class TaskRunner:
+    """
+    Camada de tarefas do Controller: roda chamadas do Model numa thread de
+    trabalho, para que a janela não congele, e entrega progresso e
+    resultado de volta na thread do Tk (via root.after).
+
+    Cada tarefa tem um 'tipo' (ex: "teste"). Uma tarefa nova do mesmo tipo
+    substitui a anterior: o resultado da antiga, quando chegar, é descartado
+    (a não ser que ela já tivesse sido confirmada, veja Tarefa.confirmar).
+    """
+
+    POLL_MS = 50 # Intervalo com que a fila de resultados é lida
+
+    def __init__(self, root):
+        self.root = root
+        self._fila = queue.Queue()
+        self._atuais = {}  # tipo -> Tarefa mais recente
+        self._pendentes = 0 # Tarefas (inclusive substituídas) cujo fim ainda não foi lido da fila
+        self._lendo = False
+
+    def submit(self, tipo, funcao, on_success, on_error=None, on_progress=None):
+        """
+        Executa funcao(tarefa) numa thread de trabalho.
+
+        :param on_success: Chamado na thread do Tk com o retorno da função.
+        :param on_error: Chamado na thread do Tk com a exceção, se houver.
+        :param on_progress: Chamado na thread do Tk com (mensagem, fracao).
+        """
+        anterior = self._atuais.get(tipo)
+        geracao = 1
+        if anterior:
+            anterior.cancelar()
+            geracao = anterior.geracao + 1
+
+        tarefa = Tarefa(tipo, geracao, self._fila)
+        tarefa.callbacks = (on_success, on_error, on_progress)
+        self._atuais[tipo] = tarefa
+        self._pendentes += 1
+
+        thread = threading.Thread(target=self._rodar, args=(tarefa, funcao), daemon=True)
+        thread.start()
+
+        if not self._lendo:
+            self._lendo = True
+            self.root.after(self.POLL_MS, self._processar_fila)
+        return tarefa
+
+    def cancel(self, tipo=None):
+        """
+        Cancela a tarefa do tipo informado (ou todas). As que já foram
+        confirmadas continuam e terão o resultado entregue normalmente.
+        Retorna quantas foram canceladas.
+        """
+        tipos = [tipo] if tipo is not None else list(self._atuais)
+        canceladas = 0
+        for t in tipos:
+            atual = self._atuais.get(t)
+            if atual and atual.cancelar():
+                del self._atuais[t]
+                canceladas += 1
+        return canceladas
+
+    def is_busy(self):
+        """True se alguma tarefa ainda não terminou."""
+        return bool(self._atuais)
+
+    def _rodar(self, tarefa, funcao):
+        """Corpo da thread de trabalho."""
+        try:
+            resultado = funcao(tarefa)
+            self._fila.put((tarefa, "ok", resultado))
+        except TarefaCancelada:
+            self._fila.put((tarefa, "cancelada", None))
+        except Exception as e:
+            print(f"Erro na tarefa '{tarefa.tipo}': {e}", file=sys.stderr)
+            self._fila.put((tarefa, "erro", e))
+
+    def _processar_fila(self):
+        """Roda na thread do Tk: entrega os eventos das tarefas ainda válidas."""
+        while True:
+            try:
+                tarefa, evento, dado = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if evento != "progresso":
+                self._pendentes -= 1
+
+            on_success, on_error, on_progress = tarefa.callbacks
+            if self._atuais.get(tarefa.tipo) is not tarefa or tarefa.cancelado.is_set():
+                # Resultado velho (substituída ou cancelada): descarta, a não
+                # ser que ela já tivesse gravado algo (o resultado é aplicado)
+                if tarefa.confirmada and evento == "ok":
+                    on_success(dado)
+                continue
+
+            if evento == "progresso":
+                if on_progress:
+                    on_progress(*dado)
+                continue
+
+            del self._atuais[tarefa.tipo]
+            if evento == "ok":
+                on_success(dado)
+            elif evento == "erro" and on_error:
+                on_error(dado)
+
+        # Continua lendo enquanto alguma thread não tiver terminado, mesmo
+        # que a tarefa dela tenha sido substituída: o resultado de uma
+        # tarefa confirmada ainda precisa ser entregue
+        if self._pendentes:
+            self.root.after(self.POLL_MS, self._processar_fila)
+        else:
+            self._lendo = False
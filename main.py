@@ -1,3 +1,4 @@
+import sys
 import ttkbootstrap as tb  
 from model.banco import DatabaseManager
 from model.model import AutomatonModel
@@ -12,15 +13,18 @@ def main():
     root = tb.Window(themename="vapor") 
     
     try:
-        db_manager = DatabaseManager(db_file="automata.db")
+        db_manager = DatabaseManager(db_file="automata.db", buffer_historico=True)
         db_manager.connect() 
         model = AutomatonModel(db_manager)
+        # Converte (uma única vez) as definições antigas, salvas em JSON
+        model.migrate_to_binary_storage()
     except Exception as e:
         print(f"Erro fatal ao inicializar o Model: {e}")
         root.destroy()
         return
 
-    view = AutomatonView(root)
+    # "--diagnostico" mostra a aba de métricas de tempo por etapa
+    view = AutomatonView(root, diagnostics="--diagnostico" in sys.argv)
     
     controller = AutomatonController(model, view)
     
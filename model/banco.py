@@ -1,6 +1,138 @@
 import sqlite3
 import json
 import datetime
+import queue
+import threading
+import time
+
+from .metricas import instrumentado
+
+
+class HistoryWriter:
+    """
+    Grava o histórico de testes em segundo plano.
+    
+    Os resultados ficam numa fila em memória e uma thread os grava em lote
+    (executemany, uma transação só) quando junta 'tamanho_lote' resultados
+    ou quando o mais antigo espera mais que 'intervalo' segundos.
+    A thread usa sua própria conexão, pois conexões sqlite3 não podem ser
+    compartilhadas entre threads.
+    """
+    
+    _FECHAR = object() # Sinal para a thread terminar
+    _ESPERA = 0.1      # De quanto em quanto tempo flush confere se a thread está viva
+    
+    def __init__(self, db_file, tamanho_lote=1000, intervalo=0.5):
+        self.db_file = db_file
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._fila = queue.Queue()
+        self._erro = None # Erro de gravação (ou que parou a thread) ainda não repassado
+        self._thread = threading.Thread(target=self._loop, name="HistoryWriter", daemon=True)
+        self._thread.start()
+
+    def add(self, automato_nome, palavra, resultado_str, decidida_em=None, motivo=None):
+        """Enfileira um resultado (não espera a gravação)."""
+        self._fila.put((automato_nome, palavra, resultado_str, decidida_em, motivo))
+
+    def flush(self, timeout=None):
+        """
+        Grava tudo o que está na fila e espera a gravação terminar.
+        
+        :param timeout: (float) Máximo de segundos de espera (None = enquanto
+                        a thread estiver rodando).
+        :raises RuntimeError: Se alguma gravação falhou desde a última
+                              verificação, ou se a thread parou.
+        :raises TimeoutError: Se a gravação não terminou em 'timeout' segundos.
+        """
+        gravado = threading.Event()
+        if self._thread.is_alive():
+            self._fila.put(gravado)
+        prazo = None if timeout is None else time.monotonic() + timeout
+        while not gravado.wait(self._ESPERA):
+            if not self._thread.is_alive():
+                break
+            if prazo is not None and time.monotonic() >= prazo:
+                raise TimeoutError("A gravação do histórico não terminou a tempo.")
+        self._repassar_erro()
+        if not gravado.is_set():
+            raise RuntimeError("A thread de gravação do histórico não está rodando.")
+
+    def close(self, timeout=None):
+        """
+        Grava o que restou na fila e encerra a thread.
+        Repassa (como flush) um erro de gravação ainda não informado.
+        """
+        if self._thread.is_alive():
+            self._fila.put(self._FECHAR)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                raise TimeoutError("A gravação do histórico não terminou a tempo.")
+        self._repassar_erro()
+
+    def _repassar_erro(self):
+        """Dispara RuntimeError com o último erro da thread, se houver (uma vez só)."""
+        erro, self._erro = self._erro, None
+        if erro is not None:
+            raise RuntimeError(f"Erro ao gravar o histórico: {erro}") from erro
+
+    @instrumentado("db.gravar_historico")
+    def _gravar(self, conn, pendentes):
+        if not pendentes:
+            return
+        query = """
+        INSERT INTO historico_testes (automato_nome, palavra_testada, resultado, decidida_em, motivo)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        try:
+            with conn:
+                conn.executemany(query, pendentes)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar histórico em lote: {e}")
+            self._erro = e
+        pendentes.clear()
+
+    def _loop(self):
+        try:
+            self._processar_fila()
+        except Exception as e:
+            # A thread vai parar: flush e close repassam o erro a quem chamou
+            print(f"Erro na gravação do histórico: {e}")
+            self._erro = e
+
+    def _processar_fila(self):
+        """Corpo da thread: lê a fila e grava em lotes até receber _FECHAR."""
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        pendentes = []
+        prazo = None
+        while True:
+            try:
+                if prazo is None:
+                    item = self._fila.get()
+                else:
+                    item = self._fila.get(timeout=max(0, prazo - time.monotonic()))
+            except queue.Empty:
+                # Estourou o tempo: grava o que estiver esperando
+                self._gravar(conn, pendentes)
+                prazo = None
+                continue
+            
+            if item is self._FECHAR:
+                self._gravar(conn, pendentes)
+                break
+            if isinstance(item, threading.Event):
+                self._gravar(conn, pendentes)
+                prazo = None
+                item.set()
+                continue
+            
+            pendentes.append(item)
+            if prazo is None:
+                prazo = time.monotonic() + self.intervalo
+            if len(pendentes) >= self.tamanho_lote:
+                self._gravar(conn, pendentes)
+                prazo = None
+        conn.close()
 
 class DatabaseManager:
     """
@@ -9,19 +141,32 @@ class DatabaseManager:
     ler dados das tabelas.
     """
     
-    def __init__(self, db_file="automata.db"):
+    def __init__(self, db_file="automata.db", buffer_historico=False, gravar_historico=True):
         """
         Inicializa o gerenciador, especificando o arquivo do banco.
+        
+        :param buffer_historico: (bool) Se True, o histórico é gravado em lote
+                                 por um HistoryWriter em segundo plano.
+        :param gravar_historico: (bool) Se False, os resultados de teste não
+                                 são gravados (execuções só de desempenho).
         """
         self.db_file = db_file
         self.conn = None
+        # A conexão pode ser usada pela thread do Tk e pelas tarefas em
+        # segundo plano do Controller; o lock garante uma query por vez.
+        self._lock = threading.RLock()
+        self.gravar_historico = gravar_historico
+        self.history_writer = None
+        # Um banco ':memory:' não é visto por outra conexão, então fica sem buffer
+        if buffer_historico and db_file != ":memory:":
+            self.history_writer = HistoryWriter(db_file)
 
     def connect(self):
         """
         Cria uma conexão com o banco de dados.
         """
         try:
-            self.conn = sqlite3.connect(self.db_file)
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
             print(f"Conectado ao banco de dados: {self.db_file}")
         except sqlite3.Error as e:
             print(f"Erro ao conectar ao banco de dados: {e}")
@@ -30,15 +175,33 @@ class DatabaseManager:
     def close(self):
         """
         Fecha a conexão com o banco de dados.
+        Antes, garante que o histórico em buffer seja todo gravado.
         """
+        if self.history_writer:
+            try:
+                self.history_writer.close()
+            except (RuntimeError, TimeoutError) as e:
+                print(f"Histórico em buffer pode não ter sido gravado: {e}")
+            self.history_writer = None
         if self.conn:
             self.conn.close()
             print("Conexão com o banco fechada.")
 
-    def _execute_query(self, query, params=(), fetch_one=False, fetch_all=False):
+    @instrumentado("db.execute_query")
+    def _execute_query(self, query, params=(), fetch_one=False, fetch_all=False, levantar=False):
         """
         Método auxiliar privado para executar qualquer query.
+        
+        :param levantar: (bool) Se True, um erro do SQLite é repassado a quem
+                         chamou (depois do rollback) em vez de só ser impresso.
+                         Usado nas gravações de definições, que não podem
+                         ser dadas como salvas se a transação falhou.
         """
+        with self._lock:
+            return self._execute_query_locked(query, params, fetch_one, fetch_all, levantar)
+
+    def _execute_query_locked(self, query, params, fetch_one, fetch_all, levantar=False):
+        """Corpo de _execute_query, já com o lock da conexão."""
         if not self.conn:
             self.connect()
             
@@ -54,8 +217,31 @@ class DatabaseManager:
                     
         except sqlite3.Error as e:
             print(f"Erro ao executar query: {e}")
+            if levantar:
+                raise
             # Em um app real, talvez queiramos logar isso
             return None
+
+    @instrumentado("db.execute_many")
+    def _execute_many(self, query, params_seq, levantar=False):
+        """
+        Método auxiliar privado para executar a mesma query com vários
+        conjuntos de parâmetros, numa única transação.
+        
+        :param levantar: (bool) Como em _execute_query: se True, um erro
+                         (a transação inteira é desfeita) é repassado a quem chamou.
+        """
+        with self._lock:
+            if not self.conn:
+                self.connect()
+                
+            try:
+                with self.conn:
+                    self.conn.executemany(query, params_seq)
+            except sqlite3.Error as e:
+                print(f"Erro ao executar query em lote: {e}")
+                if levantar:
+                    raise
         
     # (Dentro da classe DatabaseManager)
 
@@ -66,6 +252,7 @@ class DatabaseManager:
         query_reset_seq = "DELETE FROM sqlite_sequence WHERE name='historico_testes'"
         
         print("Limpando histórico de testes do banco de dados...")
+        self.flush_history() # Resultados ainda na fila também são apagados
         self._execute_query(query_delete)
         self._execute_query(query_reset_seq) # Executa isso para que os IDs recomecem do 1
         print("Histórico de testes limpo.")
@@ -96,44 +283,189 @@ class DatabaseManager:
         );
         """
         
+        # Índices do histórico (paginação por cursor e filtro por autômato).
+        # 'IF NOT EXISTS' também serve de migração para bancos já existentes.
+        query_indices = [
+            "CREATE INDEX IF NOT EXISTS idx_historico_timestamp ON historico_testes (timestamp, id)",
+            "CREATE INDEX IF NOT EXISTS idx_historico_automato ON historico_testes (automato_nome, timestamp, id)",
+        ]
+        
         print("Criando tabelas (se não existirem)...")
         self._execute_query(query_automatos)
         self._execute_query(query_historico)
+        for query in query_indices:
+            self._execute_query(query)
+        self._migrate_columns()
+        # Busca de uma regex já compilada (depende da coluna criada na migração)
+        self._execute_query("CREATE INDEX IF NOT EXISTS idx_automatos_fonte_hash ON automatos (fonte_hash)")
         print("Tabelas prontas.")
 
+    def _migrate_columns(self):
+        """
+        Acrescenta à tabela 'automatos' as colunas novas, se o banco for de
+        uma versão anterior: as do formato binário (veja
+        TabelaCompilada.para_bytes), o tipo do autômato ('dfa', 'nfa' ou
+        'regex'), a fonte de onde ele foi compilado, com o seu hash, e a
+        versão da definição (incrementada a cada atualização) e a tabela do
+        DFA mínimo já calculada (veja set_minimized_table). Na tabela
+        'historico_testes', a posição em que o veredito foi decidido e o
+        motivo da rejeição (veja DFA.run_detalhado).
+        As linhas antigas continuam em JSON até serem convertidas.
+        """
+        colunas = {row[1] for row in self._execute_query("PRAGMA table_info(automatos)", fetch_all=True) or []}
+        if "tabela_bin" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN tabela_bin BLOB")
+        if "formato_bin" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN formato_bin INTEGER")
+        if "tipo" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN tipo TEXT NOT NULL DEFAULT 'dfa'")
+        if "fonte" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN fonte TEXT")
+        if "fonte_hash" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN fonte_hash TEXT")
+        if "versao" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+        if "tabela_min" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN tabela_min BLOB")
+        if "formato_min" not in colunas:
+            self._execute_query("ALTER TABLE automatos ADD COLUMN formato_min INTEGER")
+        
+        colunas = {row[1] for row in self._execute_query("PRAGMA table_info(historico_testes)", fetch_all=True) or []}
+        if "decidida_em" not in colunas:
+            self._execute_query("ALTER TABLE historico_testes ADD COLUMN decidida_em INTEGER")
+        if "motivo" not in colunas:
+            self._execute_query("ALTER TABLE historico_testes ADD COLUMN motivo TEXT")
+
     # --- Funções para a Tabela 'automatos' ---
 
-    def save_automaton_definition(self, nome, estados, alfabeto, estado_inicial, estados_finais, transicoes_dict):
+    def save_automaton_definition(self, nome, estados, alfabeto, estado_inicial, estados_finais, transicoes_dict,
+                                  tabela_bin=None, formato_bin=None, tipo="dfa", fonte=None, fonte_hash=None):
         """
         Salva uma nova definição de autômato no banco.
         
         :param estados: (set) {'q0', 'q1'}
         :param alfabeto: (set) {'0', '1'}
         :param transicoes_dict: (dict) {'q0': {'0': 'q1'}, ...}
+        :param tabela_bin: (bytes) Tabela no formato binário. Se informada,
+                           as transições não são gravadas em JSON.
+        :param formato_bin: (int) Versão do formato binário.
+        :param tipo: (str) 'dfa', 'nfa' (transições com conjuntos de destinos)
+                     ou 'regex' (DFA compilado de uma expressão regular).
+        :param fonte: (str) A expressão regular, se o autômato foi compilado de uma.
+        :param fonte_hash: (str) Hash da fonte (veja model.regex.hash_regex).
+        :raises sqlite3.Error: Se a gravação falhar (ex.: nome já existente).
         """
         query = """
-        INSERT INTO automatos (nome, estados, alfabeto, estado_inicial, estados_finais, transicoes)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO automatos (nome, estados, alfabeto, estado_inicial, estados_finais, transicoes, tabela_bin, formato_bin, tipo,
+                               fonte, fonte_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
-        # Converte dados complexos (sets e dicts) para strings
+        params = (nome,) + self._definition_params(estados, alfabeto, estado_inicial, estados_finais, transicoes_dict,
+                                                   tabela_bin, formato_bin, tipo, fonte, fonte_hash)
+        
+        self._execute_query(query, params, levantar=True)
+        print(f"Definição do autômato '{nome}' salva.")
+
+    def save_automaton_definitions(self, definicoes):
+        """
+        Salva várias definições novas numa única transação.
+        
+        :param definicoes: (iterable) Tuplas (nome, estados, alfabeto,
+                           estado_inicial, estados_finais, transicoes_dict),
+                           opcionalmente seguidas de (tabela_bin, formato_bin, tipo,
+                           fonte, fonte_hash)
+        :raises sqlite3.Error: Se a transação falhar; nesse caso nenhuma
+                               definição do lote é gravada.
+        """
+        query = """
+        INSERT INTO automatos (nome, estados, alfabeto, estado_inicial, estados_finais, transicoes, tabela_bin, formato_bin, tipo,
+                               fonte, fonte_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        
+        params_seq = [(definicao[0],) + self._definition_params(*definicao[1:]) for definicao in definicoes]
+        
+        self._execute_many(query, params_seq, levantar=True)
+        print(f"{len(params_seq)} definições de autômatos salvas.")
+
+    def update_automaton_definition(self, nome, estados, alfabeto, estado_inicial, estados_finais, transicoes_dict,
+                                    tabela_bin=None, formato_bin=None, tipo="dfa", fonte=None, fonte_hash=None):
+        """
+        Substitui a definição de um autômato já salvo (mesmo formato de
+        save_automaton_definition).
+        """
+        query = """
+        UPDATE automatos
+        SET estados = ?, alfabeto = ?, estado_inicial = ?, estados_finais = ?, transicoes = ?,
+            tabela_bin = ?, formato_bin = ?, tipo = ?, fonte = ?, fonte_hash = ?, versao = versao + 1,
+            tabela_min = NULL, formato_min = NULL
+        WHERE nome = ?
+        """
+        
+        params = self._definition_params(estados, alfabeto, estado_inicial, estados_finais, transicoes_dict,
+                                         tabela_bin, formato_bin, tipo, fonte, fonte_hash) + (nome,)
+        
+        self._execute_query(query, params, levantar=True)
+        print(f"Definição do autômato '{nome}' atualizada.")
+
+    def delete_automaton_definition(self, nome):
+        """Apaga a definição de um autômato pelo nome."""
+        self._execute_query("DELETE FROM automatos WHERE nome = ?", (nome,))
+        print(f"Definição do autômato '{nome}' apagada.")
+
+    def set_automaton_binary_tables(self, tabelas):
+        """
+        Converte linhas já salvas para o formato binário, numa única transação:
+        grava a tabela binária e esvazia a coluna JSON de transições.
+        
+        :param tabelas: (iterable) Tuplas (nome, tabela_bin, formato_bin)
+        """
+        query = "UPDATE automatos SET tabela_bin = ?, formato_bin = ?, transicoes = '' WHERE nome = ?"
+        params_seq = [(tabela_bin, formato_bin, nome) for nome, tabela_bin, formato_bin in tabelas]
+        
+        self._execute_many(query, params_seq, levantar=True)
+        print(f"{len(params_seq)} definições convertidas para o formato binário.")
+
+    def set_minimized_table(self, nome, tabela_min, formato_min):
+        """
+        Guarda a tabela do DFA mínimo de um autômato (calculada uma vez e
+        reaproveitada nos carregamentos seguintes). Uma tabela vazia (b'')
+        indica que a definição salva já é mínima. A tabela é apagada quando
+        a definição é atualizada.
+        """
+        self._execute_query("UPDATE automatos SET tabela_min = ?, formato_min = ? WHERE nome = ?",
+                            (tabela_min, formato_min, nome))
+
+    def get_json_automaton_names(self):
+        """Busca os nomes dos DFAs que ainda guardam as transições em JSON."""
+        rows = self._execute_query("SELECT nome FROM automatos WHERE tabela_bin IS NULL AND tipo = 'dfa'", fetch_all=True)
+        return [row[0] for row in rows] if rows else []
+
+    def _definition_params(self, estados, alfabeto, estado_inicial, estados_finais, transicoes_dict,
+                           tabela_bin=None, formato_bin=None, tipo="dfa", fonte=None, fonte_hash=None):
+        """Converte dados complexos (sets e dicts) para as colunas de texto da tabela."""
         estados_str = ",".join(sorted(list(estados)))
         alfabeto_str = ",".join(sorted(list(alfabeto)))
         finais_str = ",".join(sorted(list(estados_finais)))
         
         # Converte o dicionário de transições para uma string JSON
-        transicoes_json = json.dumps(transicoes_dict)
-        
-        params = (nome, estados_str, alfabeto_str, estado_inicial, finais_str, transicoes_json)
+        # (dispensável quando a tabela binária é gravada). Os conjuntos de
+        # destinos de um NFA viram listas ordenadas.
+        transicoes_json = json.dumps(transicoes_dict, default=sorted) if tabela_bin is None else ''
         
-        self._execute_query(query, params)
-        print(f"Definição do autômato '{nome}' salva.")
+        return (estados_str, alfabeto_str, estado_inicial, finais_str, transicoes_json, tabela_bin, formato_bin, tipo,
+                fonte, fonte_hash)
 
     def get_all_automaton_definitions(self):
         """
         Busca todas as definições de autômatos salvas no banco.
         """
-        query = "SELECT nome, estados, alfabeto, estado_inicial, estados_finais, transicoes FROM automatos"
+        query = """
+        SELECT nome, estados, alfabeto, estado_inicial, estados_finais, transicoes, tabela_bin, formato_bin, tipo,
+               fonte, fonte_hash, tabela_min, formato_min
+        FROM automatos
+        """
         
         rows = self._execute_query(query, fetch_all=True)
         
@@ -143,41 +475,223 @@ class DatabaseManager:
             return definitions
             
         for row in rows:
-            nome, estados_str, alfabeto_str, inicial, finais_str, transicoes_json = row
-            
-            definitions.append({
-                "nome": nome,
-                "estados": set(estados_str.split(',')),
-                "alfabeto": set(alfabeto_str.split(',')),
-                "estado_inicial": inicial,
-                "estados_finais": set(finais_str.split(',')),
-                "transicoes": json.loads(transicoes_json) # Converte JSON de volta para dict
-            })
+            definitions.append(self._row_to_definition(row))
             
         print(f"Carregadas {len(definitions)} definições do DB.")
         return definitions
 
+    def get_automaton_names(self):
+        """
+        Busca só os nomes dos autômatos salvos (sem ler as definições),
+        para que a inicialização não dependa do tamanho da biblioteca.
+        """
+        rows = self._execute_query("SELECT nome FROM automatos", fetch_all=True)
+        return [row[0] for row in rows] if rows else []
+
+    def get_automaton_versions(self):
+        """
+        Busca o tipo e a versão de cada autômato salvo, sem ler as
+        definições. A versão é o par (id, versao): um autômato apagado e
+        criado de novo com o mesmo nome recebe outro id.
+        
+        :return: (dict) {nome: (tipo, (id, versao))}
+        """
+        rows = self._execute_query("SELECT nome, tipo, id, versao FROM automatos", fetch_all=True)
+        return {nome: (tipo, (id_, versao)) for nome, tipo, id_, versao in rows} if rows else {}
+
+    def get_automaton_definition(self, nome):
+        """
+        Busca a definição de um único autômato pelo nome.
+        Retorna None se ele não existir.
+        """
+        query = """
+        SELECT nome, estados, alfabeto, estado_inicial, estados_finais, transicoes, tabela_bin, formato_bin, tipo,
+               fonte, fonte_hash, tabela_min, formato_min
+        FROM automatos WHERE nome = ?
+        """
+        
+        row = self._execute_query(query, (nome,), fetch_one=True)
+        return self._row_to_definition(row) if row else None
+
+    def get_compiled_source(self, fonte_hash):
+        """
+        Busca uma tabela já compilada de uma fonte com o hash dado (ex: a
+        mesma regex salva com outro nome), para não compilá-la de novo.
+        
+        :return: (tuple) (tabela_bin, formato_bin), ou None se não houver.
+        """
+        query = """
+        SELECT tabela_bin, formato_bin FROM automatos
+        WHERE fonte_hash = ? AND tabela_bin IS NOT NULL LIMIT 1
+        """
+        
+        row = self._execute_query(query, (fonte_hash,), fetch_one=True)
+        return tuple(row) if row else None
+
+    def _row_to_definition(self, row):
+        """
+        Converte uma linha da tabela 'automatos' no dicionário de definição.
+        Nas linhas em formato binário, 'transicoes' é None e a tabela vem
+        intacta em 'tabela_bin' (veja TabelaCompilada.de_bytes).
+        """
+        (nome, estados_str, alfabeto_str, inicial, finais_str, transicoes_json, tabela_bin, formato_bin, tipo,
+         fonte, fonte_hash, tabela_min, formato_min) = row
+        
+        return {
+            "nome": nome,
+            "estados": set(estados_str.split(',')),
+            "alfabeto": set(alfabeto_str.split(',')),
+            "estado_inicial": inicial,
+            "estados_finais": set(finais_str.split(',')),
+            # Converte JSON de volta para dict (só nas linhas ainda não convertidas)
+            "transicoes": json.loads(transicoes_json) if tabela_bin is None else None,
+            "tabela_bin": tabela_bin,
+            "formato_bin": formato_bin,
+            "tipo": tipo,
+            "fonte": fonte,
+            "fonte_hash": fonte_hash,
+            "tabela_min": tabela_min,
+            "formato_min": formato_min
+        }
+
     # --- Funções para a Tabela 'historico_testes' ---
     
-    def save_test_result(self, automato_nome, palavra, resultado_bool):
+    def save_test_result(self, automato_nome, palavra, resultado_bool, decidida_em=None, motivo=None):
         """
         Salva o resultado de uma execução de teste no histórico.
+        
+        :param decidida_em: (int) Posição em que o veredito foi decidido
+                            antecipadamente (None se a palavra foi lida inteira).
+        :param motivo: (str) Motivo da rejeição (veja DFA.run_detalhado).
         """
         query = """
-        INSERT INTO historico_testes (automato_nome, palavra_testada, resultado)
-        VALUES (?, ?, ?)
+        INSERT INTO historico_testes (automato_nome, palavra_testada, resultado, decidida_em, motivo)
+        VALUES (?, ?, ?, ?, ?)
         """
         
+        if not self.gravar_historico:
+            return
+        
         resultado_str = "Aceita" if resultado_bool else "Rejeitada"
-        params = (automato_nome, palavra, resultado_str)
+        if self.history_writer:
+            self.history_writer.add(automato_nome, palavra, resultado_str, decidida_em, motivo)
+            return
+        
+        params = (automato_nome, palavra, resultado_str, decidida_em, motivo)
         
         self._execute_query(query, params)
 
-    def get_test_history(self):
+    def save_test_results(self, resultados):
         """
-        Retorna todo o histórico de testes, do mais recente para o mais antigo.
+        Salva vários resultados de teste de uma vez (um único commit).
+        
+        :param resultados: (iterable) Tuplas (automato_nome, palavra, resultado_bool)
+        """
+        query = """
+        INSERT INTO historico_testes (automato_nome, palavra_testada, resultado)
+        VALUES (?, ?, ?)
         """
-        query = "SELECT timestamp, automato_nome, palavra_testada, resultado FROM historico_testes ORDER BY timestamp DESC"
         
-        rows = self._execute_query(query, fetch_all=True)
+        if not self.gravar_historico:
+            return
+        
+        params_seq = (
+            (automato_nome, palavra, "Aceita" if resultado_bool else "Rejeitada")
+            for automato_nome, palavra, resultado_bool in resultados
+        )
+        
+        if self.history_writer:
+            for params in params_seq:
+                self.history_writer.add(*params)
+            return
+        
+        self._execute_many(query, params_seq)
+
+    def flush_history(self):
+        """
+        Grava imediatamente o histórico que ainda estiver no buffer
+        (não faz nada sem buffer).
+        """
+        if self.history_writer:
+            self.history_writer.flush()
+
+    def get_test_history(self, after=None, limit=None, automaton=None, result=None):
+        """
+        Retorna o histórico de testes, do mais recente para o mais antigo.
+        Sem parâmetros, retorna todo o histórico.
+        
+        Cada linha é (timestamp, automato_nome, palavra_testada, resultado, id,
+        decidida_em, motivo); as duas últimas só são gravadas por testes
+        individuais (veja save_test_result).
+        A paginação é por cursor ("keyset"): o cursor de uma página é
+        (timestamp, id) da sua última linha, e cada página custa o mesmo
+        independentemente do tamanho do histórico.
+        
+        :param after: (tuple) Cursor (timestamp, id); retorna as linhas depois dele.
+        :param limit: (int) Máximo de linhas retornadas.
+        :param automaton: (str) Filtra pelo nome do autômato.
+        :param result: (bool ou str) Filtra por resultado (True/"Aceita", False/"Rejeitada").
+        """
+        filtros = []
+        params_filtros = []
+        if automaton is not None:
+            filtros.append("automato_nome = ?")
+            params_filtros.append(automaton)
+        if result is not None:
+            if isinstance(result, bool):
+                result = "Aceita" if result else "Rejeitada"
+            filtros.append("resultado = ?")
+            params_filtros.append(result)
+        
+        self.flush_history() # Inclui os resultados que ainda estão no buffer
+        
+        if after is None:
+            return self._history_range(filtros, params_filtros, limit)
+        
+        # "(timestamp, id) < cursor" é feito em duas buscas no índice:
+        # o resto do mesmo timestamp e, se faltar, os timestamps anteriores.
+        # (Uma comparação de tuplas só usaria o índice pelo timestamp.)
+        timestamp, id_cursor = after
+        rows = self._history_range(
+            filtros + ["timestamp = ?", "id < ?"], params_filtros + [timestamp, id_cursor], limit
+        )
+        if limit is None or len(rows) < limit:
+            restantes = None if limit is None else limit - len(rows)
+            rows += self._history_range(filtros + ["timestamp < ?"], params_filtros + [timestamp], restantes)
+        return rows
+
+    def get_test_history_since(self, after_id):
+        """
+        Retorna só as linhas do histórico com id maior que 'after_id'
+        (as gravadas depois dele), da mais recente para a mais antiga,
+        no mesmo formato de get_test_history.
+        """
+        self.flush_history()
+        
+        query = """
+        SELECT timestamp, automato_nome, palavra_testada, resultado, id, decidida_em, motivo
+        FROM historico_testes WHERE id > ? ORDER BY id DESC
+        """
+        rows = self._execute_query(query, (after_id or 0,), fetch_all=True)
+        return rows if rows else []
+
+    def get_last_history_id(self):
+        """Retorna o maior id do histórico (0 se estiver vazio)."""
+        self.flush_history()
+        
+        row = self._execute_query("SELECT MAX(id) FROM historico_testes", fetch_one=True)
+        return row[0] if row and row[0] is not None else 0
+
+    def _history_range(self, condicoes, params, limit):
+        """Busca auxiliar de get_test_history: uma faixa do histórico, em ordem."""
+        query = ("SELECT timestamp, automato_nome, palavra_testada, resultado, id, decidida_em, motivo "
+                 "FROM historico_testes")
+        if condicoes:
+            query += " WHERE " + " AND ".join(condicoes)
+        query += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params = params + [limit]
+        
+        rows = self._execute_query(query, tuple(params), fetch_all=True)
         return rows if rows else []
\ No newline at end of file
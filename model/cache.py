@@ -0,0 +1,118 @@
+"""
+Cache LRU limitado por número de entradas e por memória estimada.
+"""
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Guarda valores por chave e, quando um dos limites é ultrapassado,
+    descarta os usados há mais tempo (LRU). A entrada mais recente é
+    sempre mantida, mesmo que sozinha passe do limite de memória.
+
+    Pode ser usado por várias threads ao mesmo tempo (tarefas do Controller).
+    """
+
+    def __init__(self, max_entradas=64, max_bytes=256 * 1024 * 1024, medir=None):
+        """
+        :param max_entradas: (int) Número máximo de entradas (None = sem limite).
+        :param max_bytes: (int) Memória estimada máxima (None = sem limite).
+        :param medir: Função valor -> tamanho estimado em bytes
+                      (padrão: valor.tamanho_estimado()).
+        """
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._medir = medir or (lambda valor: valor.tamanho_estimado())
+        self._itens = OrderedDict() # chave -> (valor, tamanho), do mais antigo ao mais recente
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+
+    def get(self, chave):
+        """Retorna o valor da chave (e o marca como recente), ou None se não estiver no cache."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[0]
+
+    def peek(self, chave):
+        """Retorna o valor da chave (ou None) sem marcá-lo como recente nem contar acerto/falha."""
+        with self._lock:
+            item = self._itens.get(chave)
+            return item[0] if item is not None else None
+
+    def put(self, chave, valor):
+        """Guarda (ou substitui) um valor e descarta os mais antigos, se preciso."""
+        tamanho = self._medir(valor)
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._bytes -= antigo[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            self._despejar()
+
+    def remeasure(self, chave):
+        """
+        Recalcula o tamanho de uma entrada que cresceu depois de guardada
+        (ex: um DFA que montou a tabela do lote) e aplica os limites de novo.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return
+            tamanho = self._medir(item[0])
+            self._itens[chave] = (item[0], tamanho)
+            self._bytes += tamanho - item[1]
+            self._despejar()
+
+    def pop(self, chave):
+        """Tira uma entrada do cache (sem contar como despejo)."""
+        with self._lock:
+            item = self._itens.pop(chave, None)
+            if item is not None:
+                self._bytes -= item[1]
+
+    def clear(self):
+        """Esvazia o cache (os contadores são mantidos)."""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def _despejar(self):
+        """Descarta as entradas mais antigas até respeitar os limites (com o lock)."""
+        while len(self._itens) > 1 and (
+                (self.max_entradas is not None and len(self._itens) > self.max_entradas)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, tamanho) = self._itens.popitem(last=False)
+            self._bytes -= tamanho
+            self.despejos += 1
+
+    def __contains__(self, chave):
+        return chave in self._itens
+
+    def __len__(self):
+        return len(self._itens)
+
+    def stats(self):
+        """
+        :return: (dict) Entradas, memória estimada, limites e os contadores
+                 de acertos, falhas e despejos.
+        """
+        with self._lock:
+            return {
+                "entradas": len(self._itens),
+                "bytes": self._bytes,
+                "max_entradas": self.max_entradas,
+                "max_bytes": self.max_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "despejos": self.despejos,
+            }
@@ -1,8 +1,548 @@
-
+import struct
 import sys
+from array import array
+
+# NumPy é opcional (sem ele, o lote roda palavra por palavra) e só é
+# importado na primeira execução em lote (veja carregar_numpy): importá-lo
+# custa mais que todo o resto da inicialização do executor de linha de comando.
+np = None
+_numpy_procurado = False
+
+# Quantas palavras são codificadas de uma vez na matriz do lote.
+# Limita a memória da matriz (palavras x maior comprimento).
+TAMANHO_BLOCO_LOTE = 4096
+
+# Versão do formato binário de TabelaCompilada.para_bytes
+FORMATO_BINARIO = 1
+_CABECALHO_BINARIO = struct.Struct('<IIIII') # estados, símbolos, inicial, bytes dos nomes, bytes dos símbolos
+
+# Valores de TabelaCompilada.decisao: o que já se sabe sobre a palavra
+# assim que a execução entra em cada estado.
+DECISAO_ABERTA = 0   # O veredito ainda depende do resto da palavra
+DECISAO_REJEITA = 1  # Nenhum estado final é alcançável (inclui o estado de morte)
+DECISAO_ACEITA = 2   # Só estados finais são alcançáveis (sumidouro de aceitação)
+
+# Motivos de rejeição devolvidos por DFA.run_detalhado (e gravados no histórico)
+MOTIVO_SIMBOLO_INVALIDO = "simbolo_invalido"   # A palavra tem símbolo fora do alfabeto
+MOTIVO_SEM_TRANSICAO = "sem_transicao"         # Transição não definida (estado de morte)
+MOTIVO_FINAL_INALCANCAVEL = "final_inalcancavel" # Nenhum estado final é alcançável
+MOTIVO_ESTADO_NAO_FINAL = "estado_nao_final"   # A palavra terminou num estado não final
+
+
+def carregar_numpy():
+    """
+    Importa o NumPy na primeira chamada (nas seguintes, só o devolve).
+
+    :return: (module) O módulo numpy, ou None se ele não estiver instalado.
+    """
+    global np, _numpy_procurado
+    if not _numpy_procurado:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_procurado = True
+    return np
+
+
+def _prefixo_comum(a, b):
+    """
+    Comprimento do maior prefixo comum de duas strings, por busca binária
+    (cada comparação de fatias é feita em C, sem percorrer símbolo a símbolo).
+    """
+    menor, maior = 0, min(len(a), len(b))
+    while menor < maior:
+        meio = (menor + maior + 1) // 2
+        if a[:meio] == b[:meio]:
+            menor = meio
+        else:
+            maior = meio - 1
+    return menor
+
+
+class TabelaCompilada:
+    """
+    Forma "compilada" de um DFA, usada pelo motor de execução.
+
+    Estados e símbolos são "internados" como inteiros pequenos e as
+    transições ficam numa tabela plana de inteiros (array), onde a
+    transição (estado i, símbolo j) está na posição i * num_simbolos + j.
+
+    Transições não definidas apontam para um estado de morte explícito
+    (índice num_estados), que só leva a ele mesmo e nunca é final.
+    """
+
+    def __init__(self, estados, simbolos, tabela, inicial, finais):
+        """
+        :param estados: (list) Nomes dos estados, na ordem dos índices.
+        :param simbolos: (list) Símbolos do alfabeto, na ordem dos índices.
+        :param tabela: (array) Tabela plana com (num_estados + 1) * num_simbolos posições.
+        :param inicial: (int) Índice do estado inicial.
+        :param finais: (bytearray) 1 na posição de cada estado final (inclui o estado de morte).
+        """
+        self.estados = list(estados)
+        self.simbolos = list(simbolos)
+        self.indice_estados = {estado: i for i, estado in enumerate(self.estados)}
+        self.indice_simbolos = {simbolo: j for j, simbolo in enumerate(self.simbolos)}
+        self.num_estados = len(self.estados)
+        self.num_simbolos = len(self.simbolos)
+        self.morto = self.num_estados
+        self.tabela = tabela
+        self.inicial = inicial
+        self.finais = finais
+        self._matriz_lote = None # Tabela NumPy do lote, montada sob demanda
+        self._decisao = None     # Veja a propriedade 'decisao'
+
+    @classmethod
+    def de_definicao(cls, estados, alfabeto, transicoes, estado_inicial, estados_finais):
+        """
+        Compila uma definição (sets + dicionário aninhado) para a forma tabular.
+        A ordem dos índices é a ordem alfabética, para que a compilação seja
+        sempre a mesma para a mesma definição.
+        """
+        nomes = sorted(estados)
+        simbolos = sorted(alfabeto)
+        indice_estados = {estado: i for i, estado in enumerate(nomes)}
+        indice_simbolos = {simbolo: j for j, simbolo in enumerate(simbolos)}
+
+        num_simbolos = len(simbolos)
+        morto = len(nomes)
+
+        # Começa com tudo indo para o estado de morte (inclusive a linha dele)
+        tabela = array('i', [morto]) * ((morto + 1) * num_simbolos)
+        for estado_origem, caminhos in transicoes.items():
+            base = indice_estados[estado_origem] * num_simbolos
+            for simbolo, estado_destino in caminhos.items():
+                tabela[base + indice_simbolos[simbolo]] = indice_estados[estado_destino]
+
+        finais = bytearray(morto + 1)
+        for estado in estados_finais:
+            finais[indice_estados[estado]] = 1
+
+        return cls(nomes, simbolos, tabela, indice_estados[estado_inicial], finais)
+
+    def para_bytes(self):
+        """
+        Serializa a tabela no formato binário compacto (versão FORMATO_BINARIO):
+        cabeçalho, nomes dos estados e símbolos (UTF-8, separados por \\0),
+        um byte por estado para 'finais' e a tabela de int32 little-endian,
+        alinhada em 4 bytes.
+        """
+        nomes = "\0".join(self.estados).encode('utf-8')
+        simbolos = "\0".join(self.simbolos).encode('utf-8')
+        corpo = _CABECALHO_BINARIO.pack(self.num_estados, self.num_simbolos, self.inicial,
+                                        len(nomes), len(simbolos))
+        corpo += nomes + simbolos + bytes(self.finais)
+        corpo += b'\0' * (-len(corpo) % 4)
+
+        tabela = array('i', self.tabela)
+        if sys.byteorder == 'big':
+            tabela.byteswap()
+        return corpo + tabela.tobytes()
+
+    @classmethod
+    def de_bytes(cls, dados):
+        """
+        Lê uma tabela gerada por para_bytes. A tabela de transições não é
+        copiada nem convertida entrada por entrada: ela é um memoryview
+        sobre os próprios bytes (exceto em máquinas big-endian).
+        """
+        visao = memoryview(dados)
+        num_estados, num_simbolos, inicial, tam_nomes, tam_simbolos = _CABECALHO_BINARIO.unpack_from(visao, 0)
+        posicao = _CABECALHO_BINARIO.size
+
+        nomes = bytes(visao[posicao:posicao + tam_nomes]).decode('utf-8').split("\0")
+        posicao += tam_nomes
+        simbolos = bytes(visao[posicao:posicao + tam_simbolos]).decode('utf-8').split("\0") if num_simbolos else []
+        posicao += tam_simbolos
+        finais = bytearray(visao[posicao:posicao + num_estados + 1])
+        posicao += num_estados + 1
+        posicao += -posicao % 4
+
+        tamanho_tabela = (num_estados + 1) * num_simbolos * 4
+        if len(nomes) != num_estados or len(simbolos) != num_simbolos or len(visao) != posicao + tamanho_tabela:
+            raise ValueError("Tabela binária corrompida ou incompleta.")
+
+        if sys.byteorder == 'big' or array('i').itemsize != 4:
+            tabela = array('i')
+            tabela.frombytes(bytes(visao[posicao:]))
+            if sys.byteorder == 'big':
+                tabela.byteswap()
+        else:
+            tabela = visao[posicao:].cast('i')
+        return cls(nomes, simbolos, tabela, inicial, finais)
+
+    def para_transicoes(self):
+        """Reconstrói o dicionário aninhado de transições (sem o estado de morte)."""
+        k = self.num_simbolos
+        transicoes = {}
+        for i, estado in enumerate(self.estados):
+            caminhos = {}
+            for j, simbolo in enumerate(self.simbolos):
+                destino = self.tabela[i * k + j]
+                if destino != self.morto:
+                    caminhos[simbolo] = self.estados[destino]
+            if caminhos:
+                transicoes[estado] = caminhos
+        return transicoes
+
+    def __getstate__(self):
+        # Um memoryview não pode ser enviado a outro processo (pickle):
+        # manda uma cópia em array, e sem a tabela NumPy (refeita sob demanda).
+        estado = self.__dict__.copy()
+        if isinstance(self.tabela, memoryview):
+            estado['tabela'] = array('i', self.tabela)
+        estado['_matriz_lote'] = None
+        return estado
+
+    def tamanho_estimado(self):
+        """
+        Estimativa (em bytes) da memória ocupada pela tabela: transições,
+        nomes internados e, se já montada, a tabela NumPy do lote.
+        """
+        tamanho = self.tabela.nbytes if isinstance(self.tabela, memoryview) else sys.getsizeof(self.tabela)
+        tamanho += sys.getsizeof(self.finais) + len(self._decisao or b'')
+        for nomes, indice in ((self.estados, self.indice_estados), (self.simbolos, self.indice_simbolos)):
+            tamanho += sys.getsizeof(nomes) + sys.getsizeof(indice) + sum(sys.getsizeof(nome) for nome in nomes)
+        if self._matriz_lote is not None:
+            tamanho += self._matriz_lote.nbytes
+        return tamanho
+
+    @property
+    def decisao(self):
+        """
+        bytearray com o que cada estado (incluindo o de morte) já decide sobre
+        a palavra (veja as constantes DECISAO_*). Calculado na primeira
+        consulta, para que carregar uma tabela (de_bytes) não custe uma
+        passada pelas transições.
+        """
+        if self._decisao is None:
+            self._decisao = self._analisar_decisoes()
+        return self._decisao
+
+    def _predecessores(self):
+        """Lista, para cada estado (incluindo o de morte), os estados que levam a ele."""
+        k = self.num_simbolos
+        tabela = self.tabela
+        predecessores = [[] for _ in range(self.num_estados + 1)]
+        for estado in range(self.num_estados + 1):
+            base = estado * k
+            for destino in tabela[base:base + k]:
+                predecessores[destino].append(estado)
+        return predecessores
+
+    def _alcancaveis_ao_contrario(self, origens, predecessores):
+        """
+        Retorna um bytearray com 1 em todo estado (incluindo o de morte) a partir
+        do qual algum estado de 'origens' é alcançável.
+        
+        :param predecessores: (list) Resultado de _predecessores.
+        """
+        marcados = bytearray(self.num_estados + 1)
+        pendentes = list(origens)
+        for estado in pendentes:
+            marcados[estado] = 1
+        while pendentes:
+            estado = pendentes.pop()
+            for anterior in predecessores[estado]:
+                if not marcados[anterior]:
+                    marcados[anterior] = 1
+                    pendentes.append(anterior)
+        return marcados
+
+    def _analisar_decisoes(self):
+        """
+        Calcula, por busca reversa a partir dos estados finais e dos não finais,
+        quais estados já decidem o veredito (veja as constantes DECISAO_*).
+        As duas buscas usam a mesma lista de predecessores.
+        """
+        todos = range(self.num_estados + 1)
+        predecessores = self._predecessores()
+        chega_em_final = self._alcancaveis_ao_contrario((e for e in todos if self.finais[e]), predecessores)
+        chega_em_nao_final = self._alcancaveis_ao_contrario((e for e in todos if not self.finais[e]), predecessores)
+
+        decisao = bytearray(self.num_estados + 1)
+        for estado in todos:
+            if not chega_em_final[estado]:
+                decisao[estado] = DECISAO_REJEITA
+            elif not chega_em_nao_final[estado]:
+                decisao[estado] = DECISAO_ACEITA
+        return decisao
+
+    def alcancaveis(self):
+        """
+        Retorna a lista dos estados (índices, incluindo o de morte)
+        alcançáveis a partir do estado inicial.
+        """
+        k = self.num_simbolos
+        tabela = self.tabela
+        vistos = bytearray(self.num_estados + 1)
+        vistos[self.inicial] = 1
+        ordem = [self.inicial]
+        for estado in ordem:
+            base = estado * k
+            for destino in tabela[base:base + k]:
+                if not vistos[destino]:
+                    vistos[destino] = 1
+                    ordem.append(destino)
+        return ordem
+
+    def classes_equivalencia(self):
+        """
+        Algoritmo de Hopcroft (O(n log n)): particiona os estados alcançáveis
+        em classes de estados equivalentes (que aceitam as mesmas palavras).
+
+        :return: (list) Lista de conjuntos de índices de estados.
+        """
+        k = self.num_simbolos
+        tabela = self.tabela
+        estados = self.alcancaveis()
+
+        # Transições reversas, por símbolo: reverso[j][q] = estados p com δ(p, j) = q
+        reverso = [{} for _ in range(k)]
+        for estado in estados:
+            base = estado * k
+            for j in range(k):
+                reverso[j].setdefault(tabela[base + j], []).append(estado)
+
+        blocos = []
+        bloco_de = {}
+        for grupo in ([e for e in estados if self.finais[e]], [e for e in estados if not self.finais[e]]):
+            if grupo:
+                for estado in grupo:
+                    bloco_de[estado] = len(blocos)
+                blocos.append(set(grupo))
+
+        pendentes = set(range(len(blocos)))
+        while pendentes:
+            alvo = list(blocos[pendentes.pop()])
+            for j in range(k):
+                # Agrupa, por bloco, os estados que vão para 'alvo' com o símbolo j
+                tocados = {}
+                for destino in alvo:
+                    for origem in reverso[j].get(destino, ()):
+                        tocados.setdefault(bloco_de[origem], []).append(origem)
+
+                for b, membros in tocados.items():
+                    if len(membros) == len(blocos[b]):
+                        continue
+                    novo = set(membros)
+                    blocos[b] -= novo
+                    novo_id = len(blocos)
+                    blocos.append(novo)
+                    for estado in novo:
+                        bloco_de[estado] = novo_id
+                    # Basta refinar pelo menor dos dois pedaços
+                    if b in pendentes or len(novo) <= len(blocos[b]):
+                        pendentes.add(novo_id)
+                    else:
+                        pendentes.add(b)
+        return blocos
+
+    def executar(self, palavra):
+        """
+        Processa a palavra sobre a tabela, sem montar o caminho.
+
+        :return: (int) Índice do estado final alcançado (pode ser o estado de morte)
+                 ou None se algum símbolo não pertencer ao alfabeto.
+        """
+        indice = self.indice_simbolos
+        tabela = self.tabela
+        k = self.num_simbolos
+        estado = self.inicial
+        try:
+            for simbolo in palavra:
+                estado = tabela[estado * k + indice[simbolo]]
+        except KeyError:
+            return None
+        return estado
+
+    def mapear_pedaco(self, pedaco):
+        """
+        Execução especulativa: calcula para onde o pedaço leva cada estado
+        possível (inclusive o de morte), sem saber em que estado ele começa.
+
+        Primeiro percorre o pedaço a partir do estado 0 guardando a trajetória;
+        os outros estados param assim que caem nessa trajetória (a partir
+        daí o caminho é o mesmo), o que costuma acontecer logo no início.
+
+        :return: (array) mapa[estado inicial] = estado ao fim do pedaço,
+                 ou None se algum símbolo não pertencer ao alfabeto.
+        """
+        indice = self.indice_simbolos
+        tabela = self.tabela
+        k = self.num_simbolos
+
+        if not pedaco:
+            return array('i', range(self.num_estados + 1))
+
+        trajetoria = array('i')
+        estado = 0
+        try:
+            for simbolo in pedaco:
+                estado = tabela[estado * k + indice[simbolo]]
+                trajetoria.append(estado)
+        except KeyError:
+            return None
+
+        final = trajetoria[-1]
+        mapa = array('i', [final]) * (self.num_estados + 1)
+        for inicio in range(1, self.num_estados + 1):
+            estado = inicio
+            for posicao, simbolo in enumerate(pedaco):
+                estado = tabela[estado * k + indice[simbolo]]
+                if estado == trajetoria[posicao]:
+                    break
+            else:
+                mapa[inicio] = estado
+        return mapa
+
+    def _tabela_lote(self):
+        """
+        Monta (uma vez) a tabela NumPy usada pela execução em lote.
+
+        Em relação à tabela plana, ela tem duas colunas e uma linha a mais:
+        - coluna num_simbolos: "preenchimento", leva cada estado a ele mesmo
+          (palavras curtas ficam paradas enquanto as longas avançam);
+        - coluna num_simbolos + 1: símbolo fora do alfabeto, leva à linha extra;
+        - linha num_estados + 1: estado "inválido", que nunca sai de si mesmo.
+        """
+        if self._matriz_lote is None:
+            k = self.num_simbolos
+            invalido = self.num_estados + 1
+            matriz = np.empty((invalido + 1, k + 2), dtype=np.int32)
+            matriz[:invalido, :k] = np.frombuffer(self.tabela, dtype=np.int32).reshape(invalido, k)
+            matriz[:, k] = np.arange(invalido + 1, dtype=np.int32)
+            matriz[:, k + 1] = invalido
+            matriz[invalido, :] = invalido
+            self._matriz_lote = matriz
+        return self._matriz_lote
+
+    def _codificar_lote(self, palavras):
+        """
+        Converte as palavras em uma matriz de índices de símbolos, uma coluna
+        por palavra (cada linha é uma posição), completada com o símbolo de
+        preenchimento.
+        """
+        k = self.num_simbolos
+        comprimentos = np.fromiter((len(p) for p in palavras), dtype=np.int64, count=len(palavras))
+        largura = int(comprimentos.max()) if len(palavras) else 0
+        matriz = np.full((largura, len(palavras)), k, dtype=np.int32)
+        if largura == 0:
+            return matriz
+
+        # Todos os caracteres do bloco, como code points, numa só passada
+        codigos = np.frombuffer(''.join(palavras).encode('utf-32-le'), dtype=np.uint32)
+
+        # Só símbolos de um caractere podem aparecer numa palavra
+        unitarios = sorted((ord(s), j) for s, j in self.indice_simbolos.items() if len(s) == 1)
+        traduzidos = np.full(len(codigos), k + 1, dtype=np.int32)
+        if unitarios:
+            pontos = np.array([c for c, _ in unitarios], dtype=np.uint32)
+            indices = np.array([j for _, j in unitarios], dtype=np.int32)
+            posicoes = np.searchsorted(pontos, codigos).clip(0, len(pontos) - 1)
+            achados = pontos[posicoes] == codigos
+            traduzidos[achados] = indices[posicoes[achados]]
+
+        colunas = np.repeat(np.arange(len(palavras)), comprimentos)
+        inicios = np.repeat(np.cumsum(comprimentos) - comprimentos, comprimentos)
+        linhas = np.arange(len(codigos)) - inicios
+        matriz[linhas, colunas] = traduzidos
+        return matriz
+
+    def executar_lote(self, palavras):
+        """
+        Processa várias palavras de uma vez, avançando todas um símbolo por
+        passo com indexação vetorizada na tabela (NumPy).
+
+        :return: (tuple) (array de bool de aceitação, array de índices dos
+                 estados finais). O índice é num_estados para o estado de
+                 morte e -1 para palavras com símbolo fora do alfabeto.
+        """
+        palavras = list(palavras)
+        if carregar_numpy() is None:
+            return self._executar_lote_sem_numpy(palavras)
+
+        matriz = self._tabela_lote()
+        invalido = self.num_estados + 1
+        finais = np.frombuffer(bytes(self.finais) + b'\x00', dtype=np.uint8).astype(bool)
+
+        estados = np.empty(len(palavras), dtype=np.int32)
+        # Ordena por comprimento para que cada bloco tenha pouco preenchimento
+        ordem = sorted(range(len(palavras)), key=lambda i: len(palavras[i]))
+        for inicio in range(0, len(ordem), TAMANHO_BLOCO_LOTE):
+            bloco = ordem[inicio:inicio + TAMANHO_BLOCO_LOTE]
+            codigos = self._codificar_lote([palavras[i] for i in bloco])
+            atuais = np.full(len(bloco), self.inicial, dtype=np.int32)
+            for simbolos in codigos:
+                atuais = matriz[atuais, simbolos]
+            estados[bloco] = atuais
+
+        aceitas = finais[estados]
+        estados[estados == invalido] = -1
+        return aceitas, estados
+
+    def executar_lote_prefixos(self, palavras):
+        """
+        Processa várias palavras compartilhando os prefixos comuns: as
+        palavras são percorridas em ordem alfabética e cada uma continua do
+        estado em que a anterior estava no fim do prefixo que as duas têm em
+        comum. Assim cada prefixo distinto (cada nó da trie das palavras) é
+        percorrido uma única vez, em vez de uma vez por palavra.
+
+        Compensa em corpora com muitos prefixos repetidos (palavras geradas,
+        casos de fuzzing); com palavras aleatórias, executar_lote é melhor.
+
+        :return: (tuple) (lista de aceitações, lista de índices dos estados
+                 finais), na ordem de 'palavras', com os mesmos valores de
+                 executar_lote (-1 para símbolo fora do alfabeto).
+        """
+        palavras = list(palavras)
+        indice = self.indice_simbolos
+        tabela = self.tabela
+        k = self.num_simbolos
+
+        aceitas = [False] * len(palavras)
+        estados = [-1] * len(palavras)
+        # caminho[i]: estado depois dos i primeiros símbolos da palavra anterior
+        # (-1 depois de um símbolo fora do alfabeto, e daí em diante)
+        caminho = array('i', [self.inicial])
+        anterior = ""
+        for i in sorted(range(len(palavras)), key=palavras.__getitem__):
+            palavra = palavras[i]
+            comum = _prefixo_comum(anterior, palavra)
+            del caminho[comum + 1:]
+            estado = caminho[comum]
+            for simbolo in palavra[comum:]:
+                if estado >= 0:
+                    j = indice.get(simbolo)
+                    estado = -1 if j is None else tabela[estado * k + j]
+                caminho.append(estado)
+            anterior = palavra
+
+            if estado >= 0:
+                aceitas[i] = self.finais[estado] == 1
+                estados[i] = estado
+        return aceitas, estados
+
+    def _executar_lote_sem_numpy(self, palavras):
+        """Versão de executar_lote para quando o NumPy não está instalado."""
+        aceitas = []
+        estados = []
+        for palavra in palavras:
+            estado = self.executar(palavra)
+            if estado is None:
+                aceitas.append(False)
+                estados.append(-1)
+            else:
+                aceitas.append(self.finais[estado] == 1)
+                estados.append(estado)
+        return aceitas, estados
+
 
 class DFA:
-    
+
     def __init__(self, estados, alfabeto, transicoes, estado_inicial, estados_finais):
         """
         Inicializa o motor do DFA.
@@ -15,77 +555,394 @@ class DFA:
         :param estado_inicial: (str) O nome do estado inicial (ex: 'q0')
         :param estados_finais: (set) Um conjunto dos estados de aceitação (ex: {'q1'})
         """
-        
+
         self.estados = set(estados)
         self.alfabeto = set(alfabeto)
         self.transicoes = transicoes
         self.estado_inicial = estado_inicial
         self.estados_finais = set(estados_finais)
-        
+
+        # A tabela compilada só é montada quando alguém for executar o DFA
+        # (a validação no salvamento não precisa dela).
+        self._compilado = None
+
         # Validação para garantir que a definição está correta
         # Esta é a validação lógica que discutimos
         self._validar_definicao()
 
+    @classmethod
+    def de_tabela(cls, tabela_compilada):
+        """
+        Cria o DFA direto de uma TabelaCompilada (ex: lida do formato
+        binário), sem montar o dicionário de transições: ele só é
+        reconstruído se alguém acessar 'transicoes'.
+        """
+        dfa = cls.__new__(cls)
+        dfa.estados = set(tabela_compilada.estados)
+        dfa.alfabeto = set(tabela_compilada.simbolos)
+        dfa._transicoes = None
+        dfa.estado_inicial = tabela_compilada.estados[tabela_compilada.inicial]
+        dfa.estados_finais = {
+            nome for i, nome in enumerate(tabela_compilada.estados) if tabela_compilada.finais[i]
+        }
+        dfa._compilado = tabela_compilada
+        return dfa
+
+    @property
+    def transicoes(self):
+        """(dict) Transições no formato {estado_origem: {simbolo: estado_destino}}."""
+        if self._transicoes is None:
+            self._transicoes = self._compilado.para_transicoes()
+        return self._transicoes
+
+    @transicoes.setter
+    def transicoes(self, transicoes):
+        self._transicoes = transicoes
+
     def _validar_definicao(self):
         """
         Verifica se a definição do DFA é coerente e logicamente válida.
         Dispara um ValueError se encontrar um problema.
         """
-        
+
         if self.estado_inicial not in self.estados:
             raise ValueError(f"Definição inválida: Estado inicial '{self.estado_inicial}' não pertence ao conjunto de estados.")
 
         if not self.estados_finais.issubset(self.estados):
             raise ValueError("Definição inválida: Pelo menos um estado final não pertence ao conjunto de estados.")
-            
+
         for estado_origem, caminhos in self.transicoes.items():
             # Verifica se o estado de origem é válido
             if estado_origem not in self.estados:
                 raise ValueError(f"Definição inválida: Estado de transição '{estado_origem}' não pertence ao conjunto de estados.")
-            
+
             for simbolo, estado_destino in caminhos.items():
                 # Verifica se o símbolo da transição é válido
                 if simbolo not in self.alfabeto:
                     raise ValueError(f"Definição inválida: Símbolo '{simbolo}' na transição de '{estado_origem}' não pertence ao alfabeto.")
-                
+
                 # Verifica se o estado de destino é válido
                 if estado_destino not in self.estados:
                     raise ValueError(f"Definição inválida: Estado de destino '{estado_destino}' na transição de '{estado_origem}' não pertence ao conjunto de estados.")
 
+    def compilar(self):
+        """
+        Retorna a TabelaCompilada deste DFA, montando-a na primeira chamada.
+        """
+        if self._compilado is None:
+            self._compilado = TabelaCompilada.de_definicao(
+                self.estados, self.alfabeto, self.transicoes,
+                self.estado_inicial, self.estados_finais
+            )
+        return self._compilado
+
+    def tamanho_estimado(self):
+        """
+        Estimativa (em bytes) da memória ocupada por este DFA: conjuntos,
+        tabela compilada e, se já montados, o dicionário de transições e o
+        mapa da minimização. Os nomes dos estados são contados uma só vez
+        (as estruturas compartilham as mesmas strings).
+        """
+        tamanho = sum(sys.getsizeof(c) for c in (self.estados, self.alfabeto, self.estados_finais))
+        if self._compilado is not None:
+            tamanho += self._compilado.tamanho_estimado()
+        else:
+            tamanho += sum(sys.getsizeof(nome) for nome in self.estados)
+        if self._transicoes is not None:
+            tamanho += sys.getsizeof(self._transicoes)
+            tamanho += sum(sys.getsizeof(caminhos) for caminhos in self._transicoes.values())
+        mapa = getattr(self, 'mapa_minimizacao', None)
+        if mapa is not None:
+            tamanho += sys.getsizeof(mapa)
+        return tamanho
+
+    def minimizar(self):
+        """
+        Retorna um novo DFA mínimo equivalente a este: estados inalcançáveis
+        e estados mortos são removidos e estados equivalentes são unidos
+        (Hopcroft). Estados unidos recebem o nome "{q1|q3}".
+
+        O novo DFA tem o atributo 'mapa_minimizacao', que leva cada estado
+        original ao nome do seu estado no DFA mínimo (None se foi removido).
+        """
+        tabela_compilada = self.compilar()
+        nomes = tabela_compilada.estados
+        morto = tabela_compilada.morto
+        k = tabela_compilada.num_simbolos
+
+        classe_de = {}
+        nome_classe = {}
+        representante = {}
+        classe_morta = None
+        for numero, bloco in enumerate(tabela_compilada.classes_equivalencia()):
+            representante[numero] = min(bloco)
+            for estado in bloco:
+                classe_de[estado] = numero
+            if tabela_compilada.decisao[representante[numero]] == DECISAO_REJEITA:
+                classe_morta = numero # Inclui o estado de morte, se alcançável
+            membros = sorted(nomes[e] for e in bloco if e != morto)
+            nome_classe[numero] = membros[0] if len(membros) == 1 else "{" + "|".join(membros) + "}"
+
+        classe_inicial = classe_de[tabela_compilada.inicial]
+        if classe_inicial == classe_morta:
+            # Linguagem vazia: sobra só o estado inicial, sem transições
+            vivas = [classe_inicial]
+        else:
+            vivas = [c for c in representante if c != classe_morta]
+
+        transicoes = {}
+        for classe in vivas:
+            caminhos = {}
+            base = representante[classe] * k
+            for j, simbolo in enumerate(tabela_compilada.simbolos):
+                destino = classe_de[tabela_compilada.tabela[base + j]]
+                if destino != classe_morta:
+                    caminhos[simbolo] = nome_classe[destino]
+            if caminhos:
+                transicoes[nome_classe[classe]] = caminhos
+
+        minimo = DFA(
+            estados={nome_classe[c] for c in vivas},
+            alfabeto=self.alfabeto,
+            transicoes=transicoes,
+            estado_inicial=nome_classe[classe_inicial],
+            estados_finais={nome_classe[c] for c in vivas if tabela_compilada.finais[representante[c]]}
+        )
+        vivas = set(vivas)
+        minimo.mapa_minimizacao = {
+            nome: nome_classe[classe_de[i]] if classe_de.get(i) in vivas else None
+            for i, nome in enumerate(nomes)
+        }
+        return minimo
+
+    @property
+    def estados_mortos(self):
+        """(set) Estados a partir dos quais nenhum estado final é alcançável."""
+        tabela_compilada = self.compilar()
+        return {
+            nome for i, nome in enumerate(tabela_compilada.estados)
+            if tabela_compilada.decisao[i] == DECISAO_REJEITA
+        }
+
+    @property
+    def estados_sumidouro(self):
+        """(set) Estados finais dos quais só se alcançam estados finais."""
+        tabela_compilada = self.compilar()
+        return {
+            nome for i, nome in enumerate(tabela_compilada.estados)
+            if tabela_compilada.decisao[i] == DECISAO_ACEITA
+        }
+
+    def _simbolo_invalido(self, resto):
+        """Retorna um símbolo de 'resto' fora do alfabeto, ou None."""
+        invalidos = set(resto) - self.alfabeto
+        if not invalidos:
+            return None
+        return next(simbolo for simbolo in resto if simbolo in invalidos)
+
     def run(self, palavra):
         """
         Processa uma palavra e retorna True (Aceita) ou False (Rejeitada).
-        
+
+        Se a execução entrar num estado que já decide o veredito (estado morto
+        ou sumidouro de aceitação), ela termina ali e o caminho retornado para
+        nesse estado (veja run_detalhado para a posição e o motivo).
+
         :param palavra: (str) A string de entrada a ser testada.
         :return: (tuple) (bool de aceitação, list de passos/caminho)
         """
-        
-        # --- 1. Validação da Palavra ---
-        for simbolo in palavra:
-            if simbolo not in self.alfabeto:
-                # Rejeita imediatamente se um símbolo não pertencer ao alfabeto
-                print(f"Símbolo '{simbolo}' não pertence ao alfabeto {self.alfabeto}", file=sys.stderr)
-                return False, [self.estado_inicial] # Retorna Falso e o caminho (parou no início)
-
-        # --- 2. Processamento ---
-        estado_atual = self.estado_inicial
-        caminho = [estado_atual] # Lista para rastrear os passos
-
-        for simbolo in palavra:
-            try:
-                # Busca o próximo estado no dicionário de transições
-                estado_atual = self.transicoes[estado_atual][simbolo]
-                caminho.append(estado_atual)
-            
-            except KeyError:
-                # Transição não definida (DFA incompleto).
-                # Em um DFA formal, isso iria para um "estado de erro/morte" implícito.
-                # Para esta implementação, podemos simplesmente rejeitar.
-                print(f"Transição não definida para o estado '{estado_atual}' com o símbolo '{simbolo}'", file=sys.stderr)
-                return False, caminho
-
-        # --- 3. Verificação Final ---
+        return self.run_detalhado(palavra)[:2]
+
+    def run_detalhado(self, palavra):
+        """
+        Como run, mas diz também onde e por que o veredito foi decidido.
+
+        :return: (tuple) (bool de aceitação, list de passos, posição da
+                 decisão antecipada, motivo da rejeição). A posição é quantos
+                 símbolos foram lidos até o veredito ficar decidido, ou None
+                 se a palavra foi lida até o fim (ou tinha símbolo inválido).
+                 O motivo é None se a palavra foi aceita, ou uma das
+                 constantes MOTIVO_*.
+        """
+
+        tabela_compilada = self.compilar()
+        indice = tabela_compilada.indice_simbolos
+        tabela = tabela_compilada.tabela
+        nomes = tabela_compilada.estados
+        k = tabela_compilada.num_simbolos
+        morto = tabela_compilada.morto
+        decisao = tabela_compilada.decisao
+
+        # --- Processamento (uma única passada sobre a palavra) ---
+        estado_atual = tabela_compilada.inicial
+        caminho = [self.estado_inicial] # Lista para rastrear os passos
+
+        posicao = 0 # Quantos símbolos já foram consumidos
+        if not decisao[estado_atual]:
+            for posicao, simbolo in enumerate(palavra, 1):
+                j = indice.get(simbolo)
+                if j is None:
+                    # Rejeita imediatamente se um símbolo não pertencer ao alfabeto
+                    print(f"Símbolo '{simbolo}' não pertence ao alfabeto {self.alfabeto}", file=sys.stderr)
+                    # Retorna Falso e o caminho (parou no início)
+                    return False, [self.estado_inicial], None, MOTIVO_SIMBOLO_INVALIDO
+
+                estado_atual = tabela[estado_atual * k + j]
+                if estado_atual == morto:
+                    break
+                caminho.append(nomes[estado_atual])
+                if decisao[estado_atual]:
+                    break
+
+        decidida_em = None
+        if decisao[estado_atual] and posicao < len(palavra):
+            # --- Veredito antecipado ---
+            # O resto da palavra não muda o resultado, mas a palavra inteira
+            # ainda precisa pertencer ao alfabeto (mesmo retorno de antes).
+            invalido = self._simbolo_invalido(palavra[posicao:])
+            if invalido is not None:
+                print(f"Símbolo '{invalido}' não pertence ao alfabeto {self.alfabeto}", file=sys.stderr)
+                return False, [self.estado_inicial], None, MOTIVO_SIMBOLO_INVALIDO
+            decidida_em = posicao
+
+        if estado_atual == morto:
+            # Transição não definida (DFA incompleto): o estado de morte só rejeita.
+            print(f"Transição não definida para o estado '{caminho[-1]}' com o símbolo '{simbolo}'", file=sys.stderr)
+            return False, caminho, decidida_em, MOTIVO_SEM_TRANSICAO
+
+        # --- Verificação Final ---
         # A palavra é aceita se, e somente se, o estado em que paramos
         # é um dos estados finais.
-        aceita = estado_atual in self.estados_finais
-        return aceita, caminho
\ No newline at end of file
+        aceita = tabela_compilada.finais[estado_atual] == 1
+        if aceita:
+            return True, caminho, decidida_em, None
+        if decidida_em is not None:
+            return False, caminho, decidida_em, MOTIVO_FINAL_INALCANCAVEL
+        return False, caminho, None, MOTIVO_ESTADO_NAO_FINAL
+
+    def run_batch(self, palavras, compartilhar_prefixos=False):
+        """
+        Processa uma lista de palavras de uma só vez (sem montar caminhos).
+
+        :param palavras: (iterable) As palavras a serem testadas.
+        :param compartilhar_prefixos: (bool) Se True, cada prefixo comum às
+                                      palavras é percorrido uma vez só (veja
+                                      TabelaCompilada.executar_lote_prefixos).
+        :return: (tuple) (aceitações, índices dos estados finais), como arrays
+                 NumPy quando disponível (listas se compartilhar_prefixos).
+                 Veja TabelaCompilada.executar_lote.
+        """
+        if compartilhar_prefixos:
+            return self.compilar().executar_lote_prefixos(palavras)
+        return self.compilar().executar_lote(palavras)
+
+    def runner(self):
+        """Retorna um DFARunner (execução incremental) para este DFA."""
+        return DFARunner(self)
+
+
+class DFARunner:
+    """
+    Execução incremental de um DFA: a palavra chega em pedaços (feed), e
+    só o estado atual é guardado, sem caminho. A memória usada é constante,
+    qualquer que seja o tamanho da entrada (ex: arquivos de log enormes).
+    """
+
+    # Tamanho padrão dos pedaços lidos de arquivos em feed_from
+    TAMANHO_BLOCO = 1 << 16
+
+    def __init__(self, dfa):
+        """
+        :param dfa: (DFA) O autômato a ser executado.
+        """
+        self._tabela = dfa.compilar()
+        self._alfabeto = dfa.alfabeto
+        self.reset()
+
+    def reset(self):
+        """Volta ao estado inicial, descartando tudo o que já foi lido."""
+        self._estado = self._tabela.inicial
+        self.posicao = 0                # Quantos símbolos já foram lidos
+        self.posicao_decisao = None     # Onde o veredito foi decidido (se foi)
+        self.simbolo_invalido = None    # Primeiro símbolo fora do alfabeto (se houve)
+        if self._tabela.decisao[self._estado]:
+            self.posicao_decisao = 0
+
+    @property
+    def state(self):
+        """
+        (str) Nome do estado atual, ou None no estado de morte.
+        Depois de uma decisão antecipada, é o estado em que ela aconteceu.
+        """
+        if self._estado == self._tabela.morto:
+            return None
+        return self._tabela.estados[self._estado]
+
+    @property
+    def accepted(self):
+        """(bool) Se a entrada lida até agora é aceita."""
+        if self.simbolo_invalido is not None:
+            return False
+        return self._tabela.finais[self._estado] == 1
+
+    def feed(self, chunk):
+        """
+        Processa mais um pedaço da entrada.
+
+        :param chunk: (str) Os próximos símbolos da palavra.
+        """
+        if self.simbolo_invalido is not None:
+            # Já rejeitada: só contabiliza o que foi lido
+            self.posicao += len(chunk)
+            return
+
+        resto = chunk
+        if self.posicao_decisao is None:
+            tabela_compilada = self._tabela
+            indice = tabela_compilada.indice_simbolos
+            tabela = tabela_compilada.tabela
+            decisao = tabela_compilada.decisao
+            k = tabela_compilada.num_simbolos
+            estado = self._estado
+
+            lidos = 0
+            for lidos, simbolo in enumerate(chunk, 1):
+                j = indice.get(simbolo)
+                if j is None:
+                    self._estado = estado
+                    self.simbolo_invalido = simbolo
+                    self.posicao += len(chunk)
+                    return
+                estado = tabela[estado * k + j]
+                if decisao[estado]:
+                    self.posicao_decisao = self.posicao + lidos
+                    break
+
+            self._estado = estado
+            resto = chunk[lidos:]
+
+        # Depois de decidido, o estado não muda mais; basta conferir o alfabeto
+        if resto:
+            invalidos = set(resto) - self._alfabeto
+            if invalidos:
+                self.simbolo_invalido = next(s for s in resto if s in invalidos)
+        self.posicao += len(chunk)
+
+    def feed_from(self, fonte, tamanho_bloco=None):
+        """
+        Consome toda a entrada de 'fonte' e retorna se ela foi aceita.
+
+        :param fonte: Um arquivo aberto em modo texto (lido em blocos de
+                      'tamanho_bloco' caracteres) ou qualquer iterável de strings.
+        :return: (bool) O mesmo que 'accepted' ao final da leitura.
+        """
+        if hasattr(fonte, 'read'):
+            tamanho_bloco = tamanho_bloco or self.TAMANHO_BLOCO
+            chunk = fonte.read(tamanho_bloco)
+            while chunk:
+                self.feed(chunk)
+                chunk = fonte.read(tamanho_bloco)
+        else:
+            for chunk in fonte:
+                self.feed(chunk)
+        return self.accepted
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Comparação de linguagens entre DFAs (TabelaCompilada), sem testar palavras.
+
+A equivalência usa o algoritmo de Hopcroft e Karp: os estados dos dois
+autômatos são unidos aos pares numa estrutura union-find, a partir dos
+iniciais, e cada par só é explorado se ainda não estiver na mesma classe.
+São no máximo n1 + n2 uniões, então o custo é quase linear no tamanho dos
+autômatos. Se um par une um estado final a um não final, a palavra que
+leva até ele é um contraexemplo.
+
+Alfabetos diferentes são comparados sobre a união deles: um símbolo fora
+do alfabeto de um DFA o leva ao estado de morte (como em DFA.run, a
+palavra é rejeitada).
+"""
+from collections import deque
+
+# Máximo de estados ao determinizar um NFA para compará-lo
+LIMITE_DETERMINIZACAO = 100000
+
+
+class _UniaoBusca:
+    """Union-find com compressão de caminho e união por tamanho."""
+
+    def __init__(self):
+        self._pai = {}
+        self._tamanho = {}
+
+    def buscar(self, x):
+        pai = self._pai
+        raiz = pai.setdefault(x, x)
+        while pai[raiz] != raiz:
+            raiz = pai[raiz]
+        while pai[x] != raiz:
+            pai[x], x = raiz, pai[x]
+        return raiz
+
+    def unir(self, x, y):
+        """Une as classes de x e y. Retorna False se elas já eram a mesma."""
+        x, y = self.buscar(x), self.buscar(y)
+        if x == y:
+            return False
+        if self._tamanho.get(x, 1) < self._tamanho.get(y, 1):
+            x, y = y, x
+        self._pai[y] = x
+        self._tamanho[x] = self._tamanho.get(x, 1) + self._tamanho.get(y, 1)
+        return True
+
+
+def tabela_para_comparacao(automato):
+    """
+    TabelaCompilada de um DFA ou NFA (que é determinizado antes; veja
+    NFA.determinizar), para as funções deste módulo.
+    """
+    if hasattr(automato, 'determinizar'):
+        automato = automato.determinizar(LIMITE_DETERMINIZACAO)
+    return automato.compilar()
+
+
+def _colunas(tabela_compilada, simbolos):
+    """Coluna de cada símbolo da união na tabela (-1 se fora do alfabeto dela)."""
+    return [tabela_compilada.indice_simbolos.get(s, -1) for s in simbolos]
+
+
+def _passo(tabela_compilada, colunas, estado, j):
+    """Transição na tabela pelo símbolo j da união (fora do alfabeto: estado de morte)."""
+    coluna = colunas[j]
+    if coluna < 0:
+        return tabela_compilada.morto
+    return tabela_compilada.tabela[estado * tabela_compilada.num_simbolos + coluna]
+
+
+def _hopcroft_karp(inicial1, inicial2, final1, final2, proximo1, proximo2, simbolos):
+    """
+    Núcleo do algoritmo, sobre dois autômatos dados por funções (os estados
+    só precisam ser "hashable"; os dois lados são marcados com 1 e 2).
+
+    :return: (tuple) (True, None) se forem equivalentes, ou (False, palavra)
+             com uma palavra aceita por um e rejeitada pelo outro.
+    """
+    classes = _UniaoBusca()
+    classes.unir((1, inicial1), (2, inicial2))
+    anterior = {(inicial1, inicial2): None} # par -> (par anterior, símbolo)
+    fila = deque([(inicial1, inicial2)])
+
+    while fila:
+        par = fila.popleft()
+        p, q = par
+        if final1(p) != final2(q):
+            palavra = []
+            while anterior[par] is not None:
+                par, simbolo = anterior[par]
+                palavra.append(simbolo)
+            return False, "".join(reversed(palavra))
+
+        for j, simbolo in enumerate(simbolos):
+            proximo = (proximo1(p, j), proximo2(q, j))
+            if classes.unir((1, proximo[0]), (2, proximo[1])):
+                anterior[proximo] = (par, simbolo)
+                fila.append(proximo)
+    return True, None
+
+
+def equivalencia(tabela1, tabela2):
+    """
+    Verifica se dois DFAs aceitam exatamente a mesma linguagem.
+
+    :return: (tuple) (bool, contraexemplo): o contraexemplo é uma palavra
+             aceita por só um dos dois, ou None se forem equivalentes.
+    """
+    simbolos = sorted(set(tabela1.simbolos) | set(tabela2.simbolos))
+    colunas1 = _colunas(tabela1, simbolos)
+    colunas2 = _colunas(tabela2, simbolos)
+    return _hopcroft_karp(
+        tabela1.inicial, tabela2.inicial,
+        lambda p: tabela1.finais[p] == 1,
+        lambda q: tabela2.finais[q] == 1,
+        lambda p, j: _passo(tabela1, colunas1, p, j),
+        lambda q, j: _passo(tabela2, colunas2, q, j),
+        simbolos
+    )
+
+
+def inclusao(tabela1, tabela2):
+    """
+    Verifica se a linguagem do primeiro DFA está contida na do segundo.
+
+    L1 ⊆ L2 exatamente quando L1 ∪ L2 = L2, então a verificação é a
+    equivalência entre o produto "união" (pares de estados, montados só
+    quando alcançados) e o segundo DFA.
+
+    :return: (tuple) (bool, contraexemplo): o contraexemplo é uma palavra
+             aceita pelo primeiro e rejeitada pelo segundo, ou None.
+    """
+    simbolos = sorted(set(tabela1.simbolos) | set(tabela2.simbolos))
+    colunas1 = _colunas(tabela1, simbolos)
+    colunas2 = _colunas(tabela2, simbolos)
+    return _hopcroft_karp(
+        (tabela1.inicial, tabela2.inicial), tabela2.inicial,
+        lambda par: tabela1.finais[par[0]] == 1 or tabela2.finais[par[1]] == 1,
+        lambda q: tabela2.finais[q] == 1,
+        lambda par, j: (_passo(tabela1, colunas1, par[0], j), _passo(tabela2, colunas2, par[1], j)),
+        lambda q, j: _passo(tabela2, colunas2, q, j),
+        simbolos
+    )
@@ -0,0 +1,146 @@
+"""
+Instrumentação leve por etapa: contadores e histogramas de latência.
+
+As etapas são medidas pelo decorador 'instrumentado' ou pelo gerenciador
+de contexto 'medir'. Enquanto a coleta está desligada (o padrão), cada
+ponto instrumentado custa só a leitura de um atributo.
+"""
+import functools
+import threading
+import time
+
+# Histograma em faixas de potências de 2 microssegundos:
+# a faixa i guarda as durações em [2^(i-1), 2^i) µs (a faixa 0 guarda < 1 µs)
+NUM_FAIXAS = 40
+
+
+class _Etapa:
+    """Estatísticas acumuladas de uma etapa."""
+
+    __slots__ = ("chamadas", "total", "minimo", "maximo", "faixas")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.total = 0.0
+        self.minimo = None
+        self.maximo = 0.0
+        self.faixas = [0] * NUM_FAIXAS
+
+    def percentil(self, fracao):
+        """Limite superior (em segundos) da faixa onde está o percentil pedido."""
+        alvo = fracao * self.chamadas
+        acumulado = 0
+        for i, quantidade in enumerate(self.faixas):
+            acumulado += quantidade
+            if acumulado >= alvo and quantidade:
+                return min((1 << i) / 1e6, self.maximo)
+        return self.maximo
+
+
+class _MedicaoNula:
+    """Gerenciador de contexto usado quando a coleta está desligada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_MEDICAO_NULA = _MedicaoNula()
+
+
+class _Medicao:
+    """Gerenciador de contexto que mede uma execução de uma etapa."""
+
+    __slots__ = ("metricas", "nome", "inicio")
+
+    def __init__(self, metricas, nome):
+        self.metricas = metricas
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metricas.registrar(self.nome, time.perf_counter() - self.inicio)
+        return False
+
+
+class Metricas:
+    """Coletor de métricas por etapa (pode ser usado por várias threads)."""
+
+    def __init__(self, ativo=False):
+        self.ativo = ativo
+        self._etapas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nome, duracao):
+        """Acrescenta uma execução de 'duracao' segundos à etapa 'nome'."""
+        faixa = min(int(duracao * 1e6).bit_length(), NUM_FAIXAS - 1)
+        with self._lock:
+            etapa = self._etapas.get(nome)
+            if etapa is None:
+                etapa = self._etapas[nome] = _Etapa()
+            etapa.chamadas += 1
+            etapa.total += duracao
+            etapa.minimo = duracao if etapa.minimo is None else min(etapa.minimo, duracao)
+            etapa.maximo = max(etapa.maximo, duracao)
+            etapa.faixas[faixa] += 1
+
+    def medir(self, nome):
+        """Gerenciador de contexto: 'with metricas.medir("etapa"): ...'."""
+        if not self.ativo:
+            return _MEDICAO_NULA
+        return _Medicao(self, nome)
+
+    def zerar(self):
+        """Apaga tudo o que já foi coletado."""
+        with self._lock:
+            self._etapas = {}
+
+    def resumo(self):
+        """
+        :return: (dict) Por etapa: chamadas, total, média, mínimo, máximo,
+                 p50, p90 e p99 (em segundos) e o histograma
+                 ({limite superior em µs: quantidade}, só faixas não vazias).
+        """
+        with self._lock:
+            resumo = {}
+            for nome, etapa in self._etapas.items():
+                resumo[nome] = {
+                    "chamadas": etapa.chamadas,
+                    "total": etapa.total,
+                    "media": etapa.total / etapa.chamadas,
+                    "minimo": etapa.minimo,
+                    "maximo": etapa.maximo,
+                    "p50": etapa.percentil(0.50),
+                    "p90": etapa.percentil(0.90),
+                    "p99": etapa.percentil(0.99),
+                    "histograma": {1 << i: n for i, n in enumerate(etapa.faixas) if n},
+                }
+            return resumo
+
+
+# Coletor único do programa: Model, banco e View registram nele
+METRICAS = Metricas()
+
+
+def instrumentado(nome):
+    """
+    Decorador que mede cada chamada da função como a etapa 'nome'.
+    Com a coleta desligada, só repassa a chamada.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            if not METRICAS.ativo:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                METRICAS.registrar(nome, time.perf_counter() - inicio)
+        return wrapper
+    return decorador
@@ -1,7 +1,17 @@
 import json
+import sqlite3
 import sys
+import threading
 from .banco import DatabaseManager 
-from .dfa import DFA               
+from .cache import CacheLRU
+from .metricas import METRICAS, instrumentado
+from .dfa import DFA, FORMATO_BINARIO, TabelaCompilada
+from .equivalencia import equivalencia, inclusao, tabela_para_comparacao
+from .nfa import NFA
+from .produto import ProdutoDFA
+from .regex import compilar_regex, hash_regex, simbolos_da_regex
+from .paralelo import (executar_blocos_em_paralelo, executar_em_paralelo, executar_palavra_em_paralelo,
+                       ler_arquivos_definicao, validar_arquivos_em_paralelo)
 
 class AutomatonModel:
     """
@@ -12,19 +22,38 @@ class AutomatonModel:
     Ela NÃO sabe nada sobre a interface gráfica (tkinter).
     """
 
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, minimizar=True, armazenamento_binario=True,
+                 max_cache_entradas=64, max_cache_bytes=256 * 1024 * 1024):
         """
         Inicializa o Model.
         
         :param db_manager: Uma instância já conectada do DatabaseManager.
                            Isso é chamado de "Injeção de Dependência".
+        :param minimizar: (bool) Se True, os testes rodam sobre o DFA mínimo
+                          equivalente (veja DFA.minimizar).
+        :param armazenamento_binario: (bool) Se True, as tabelas de transições
+                          são salvas no formato binário compacto em vez de JSON.
+        :param max_cache_entradas: (int) Máximo de DFAs compilados mantidos em memória.
+        :param max_cache_bytes: (int) Memória estimada máxima desses DFAs.
         """
         self.db = db_manager
+        self.minimizar = minimizar
+        self.armazenamento_binario = armazenamento_binario
         
-        # Cache para guardar instâncias de DFA já criadas e definições do DB.
-        # Isso evita consultas desnecessárias ao DB.
-        self._automata_definitions = {} # Cache de definições
-        self._automata_cache = {}       # Cache de instâncias de DFA
+        # Nomes dos autômatos salvos e cache (LRU, limitado) das instâncias
+        # de DFA já compiladas. As definições só são lidas do DB quando a
+        # instância não está no cache, então a memória usada fica estável
+        # por mais autômatos que sejam testados.
+        self._automata_names = set()
+        # Tarefas do Controller rodam em threads: este lock protege o set de
+        # nomes e as gravações que dependem dele (conferir que o nome está
+        # livre e salvar tem de ser uma operação só)
+        self._lock_nomes = threading.RLock()
+        self._automata_cache = CacheLRU(max_cache_entradas, max_cache_bytes)
+        # Chave no cache do último autômato produto montado por classify_words
+        # (os nomes e as versões dos DFAs: ele é reaproveitado enquanto
+        # nenhum deles for alterado, e conta no limite de memória do cache)
+        self._product_key = None
         
         # Garante que as tabelas existam ao iniciar
         self.db.create_tables() 
@@ -48,30 +77,56 @@ class AutomatonModel:
 
     def load_definitions_from_db(self):
         """
-        Limpa os caches e recarrega todas as definições do banco de dados.
+        Limpa o cache e recarrega do banco só os NOMES dos autômatos.
+        Cada definição é lida (e compilada) no primeiro uso,
+        por _get_definition / _get_automaton_instance.
         """
-        self._automata_definitions = {}
-        self._automata_cache = {}
+        with self._lock_nomes:
+            self._automata_cache.clear()
+            self._automata_names = set(self.db.get_automaton_names())
         
-        definitions = self.db.get_all_automaton_definitions()
-        for definicao in definitions:
-            self._automata_definitions[definicao['nome']] = definicao
+        print(f"Model carregou {len(self._automata_names)} nomes de autômatos.")
+
+    def _get_definition(self, nome):
+        """
+        Busca no banco a definição de um autômato (ela não fica guardada:
+        o que fica em memória é a instância compilada, no cache LRU).
+        """
+        if nome not in self._automata_names:
+            raise ValueError(f"Nenhum autômato com o nome '{nome}' foi definido.")
         
-        print(f"Model carregou {len(self._automata_definitions)} definições.")
+        definicao = self.db.get_automaton_definition(nome)
+        if definicao is None:
+            raise ValueError(f"O autômato '{nome}' não foi encontrado no banco de dados.")
+        return definicao
 
     def get_available_automata_names(self):
         """
         Retorna uma lista de nomes dos autômatos disponíveis.
         A View (interface) usará isso para popular o dropdown.
         """
-        return sorted(list(self._automata_definitions.keys()))
+        with self._lock_nomes:
+            return sorted(self._automata_names)
 
-    def _parse_transitions(self, transicoes_str):
+    def get_cache_stats(self):
+        """
+        Retorna o estado do cache de DFAs compilados: entradas, memória
+        estimada (bytes), limites e contadores de acertos, falhas e despejos.
+        """
+        return self._automata_cache.stats()
+
+    @staticmethod
+    @instrumentado("model.parse_transitions")
+    def _parse_transitions(transicoes_str, deterministico=True):
         """
         Analisa a string de transições (do campo de texto do tkinter)
         e a transforma em um dicionário aninhado.
         
         Este é o código que definimos anteriormente.
+        
+        :param deterministico: (bool) Se False (NFA), um mesmo estado pode ter
+                               várias transições com o mesmo símbolo (e com ε):
+                               cada destino vira um conjunto de estados.
         """
         transicoes_dict = {}
         linhas = transicoes_str.strip().split('\n')
@@ -102,6 +157,10 @@ class AutomatonModel:
             if estado_origem not in transicoes_dict:
                 transicoes_dict[estado_origem] = {}
 
+            if not deterministico:
+                transicoes_dict[estado_origem].setdefault(simbolo, set()).add(estado_destino)
+                continue
+
             if simbolo in transicoes_dict[estado_origem]:
                 raise ValueError(
                     f"Erro de Não-Determinismo na linha {numero_linha}: "
@@ -112,76 +171,338 @@ class AutomatonModel:
             
         return transicoes_dict
 
+    @staticmethod
+    def _build_dfa(estados_str, alfabeto_str, inicial_str, finais_str,
+                   transicoes_str, minimizar=False):
+        """
+        Analisa as strings de uma definição e a valida pelo motor DFA.
+        Dispara ValueError se a definição for inválida.
+        
+        :return: (DFA) O DFA validado (o mínimo equivalente, se 'minimizar').
+        """
+        # --- "PARSEAR" (Analisar) as strings ---
+        estados_set = set(s.strip() for s in estados_str.split(',') if s.strip())
+        alfabeto_set = set(s.strip() for s in alfabeto_str.split(',') if s.strip())
+        finais_set = set(s.strip() for s in finais_str.split(',') if s.strip())
+        estado_inicial = inicial_str.strip()
+
+        transicoes_dict = AutomatonModel._parse_transitions(transicoes_str)
+        
+        # --- VALIDAR a lógica do Autômato ---
+        # Nós usamos seu motor 'DFA' universal para validar!
+        dfa = DFA(
+            estados=estados_set,
+            alfabeto=alfabeto_set,
+            transicoes=transicoes_dict,
+            estado_inicial=estado_inicial,
+            estados_finais=finais_set
+        )
+        # Se o __init__ do DFA não disparar um erro, a definição é válida.
+        
+        if minimizar:
+            dfa = dfa.minimizar()
+        return dfa
+
+    @staticmethod
+    def _build_automaton(estados_str, alfabeto_str, inicial_str, finais_str,
+                         transicoes_str, minimizar=False, tipo="dfa"):
+        """
+        Como _build_dfa, mas também aceita definições não-determinísticas
+        e expressões regulares.
+        
+        :param tipo: (str) 'dfa', 'nfa' ou 'regex'. Um NFA não é minimizado.
+                     Em 'regex', 'transicoes_str' é a expressão regular, o
+                     alfabeto é opcional e os estados são ignorados: o DFA
+                     compilado já é o mínimo (veja model.regex).
+        :return: (DFA ou NFA) O autômato validado.
+        """
+        tipo = (tipo or "dfa").strip().lower()
+        if tipo == "dfa":
+            return AutomatonModel._build_dfa(estados_str, alfabeto_str, inicial_str,
+                                             finais_str, transicoes_str, minimizar)
+        if tipo == "regex":
+            return compilar_regex(transicoes_str.strip(),
+                                  set(s.strip() for s in alfabeto_str.split(',') if s.strip()))
+        if tipo != "nfa":
+            raise ValueError(f"Tipo de autômato desconhecido: '{tipo}' (use 'dfa', 'nfa' ou 'regex').")
+        
+        return NFA(
+            estados=set(s.strip() for s in estados_str.split(',') if s.strip()),
+            alfabeto=set(s.strip() for s in alfabeto_str.split(',') if s.strip()),
+            transicoes=AutomatonModel._parse_transitions(transicoes_str, deterministico=False),
+            estado_inicial=inicial_str.strip(),
+            estados_finais=set(s.strip() for s in finais_str.split(',') if s.strip())
+        )
+
+    @staticmethod
+    def _automaton_type(automato):
+        """Retorna o tipo salvo no banco ('dfa', 'nfa' ou 'regex') de uma instância."""
+        if isinstance(automato, NFA):
+            return "nfa"
+        return "regex" if getattr(automato, "regex", None) is not None else "dfa"
+
+    def _compile_regex(self, regex, alfabeto_str):
+        """
+        Compila uma expressão regular num DFA mínimo. Se a mesma fonte (mesmo
+        hash) já foi compilada e salva, a tabela salva é reutilizada.
+        """
+        regex = regex.strip()
+        alfabeto = set(s.strip() for s in alfabeto_str.split(',') if s.strip()) or simbolos_da_regex(regex)
+        fonte_hash = hash_regex(regex, alfabeto)
+        
+        salva = self.db.get_compiled_source(fonte_hash)
+        if salva is None or salva[1] != FORMATO_BINARIO:
+            return compilar_regex(regex, alfabeto)
+        
+        dfa = DFA.de_tabela(TabelaCompilada.de_bytes(salva[0]))
+        dfa.regex = regex
+        dfa.regex_hash = fonte_hash
+        return dfa
+
+    def _build_or_compile(self, estados_str, alfabeto_str, inicial_str, finais_str,
+                          transicoes_str, minimizar, tipo):
+        """_build_automaton, mas reutilizando as regex já compiladas no banco."""
+        if (tipo or "").strip().lower() == "regex":
+            return self._compile_regex(transicoes_str, alfabeto_str)
+        return self._build_automaton(estados_str, alfabeto_str, inicial_str,
+                                     finais_str, transicoes_str, minimizar, tipo)
+
+    def _register_automaton(self, nome):
+        """
+        Registra um autômato recém-salvo (ou alterado), sem recarregar os
+        outros, e invalida só a instância compilada dele.
+        """
+        with self._lock_nomes:
+            self._automata_names.add(nome)
+        self._automata_cache.pop(nome)
+        self._automata_cache.pop(("original", nome))
+
+    def _storage_params(self, dfa):
+        """
+        Retorna (tabela_bin, formato_bin, tipo, fonte, fonte_hash) para salvar
+        o autômato. A tabela binária fica None se o armazenamento binário
+        estiver desligado (ou num NFA); a de uma regex é sempre gravada,
+        para que ela não precise ser compilada de novo ao ser carregada.
+        """
+        tipo = self._automaton_type(dfa)
+        if tipo == "regex":
+            return dfa.compilar().para_bytes(), FORMATO_BINARIO, tipo, dfa.regex, dfa.regex_hash
+        if not self.armazenamento_binario or tipo == "nfa":
+            return None, None, tipo, None, None
+        return dfa.compilar().para_bytes(), FORMATO_BINARIO, tipo, None, None
+
+    @staticmethod
+    def _definition_to_automaton(definicao):
+        """
+        Cria o DFA (ou NFA) de uma definição lida do banco. No formato
+        binário a tabela é usada direto, sem reconstruir o dicionário
+        de transições.
+        """
+        if definicao.get("tipo") == "nfa":
+            return NFA(
+                estados=definicao["estados"],
+                alfabeto=definicao["alfabeto"],
+                transicoes=definicao["transicoes"],
+                estado_inicial=definicao["estado_inicial"],
+                estados_finais=definicao["estados_finais"]
+            )
+        
+        if definicao.get("tabela_bin") is not None:
+            if definicao.get("formato_bin") != FORMATO_BINARIO:
+                raise ValueError(
+                    f"O autômato '{definicao['nome']}' está num formato binário "
+                    f"desconhecido (versão {definicao.get('formato_bin')})."
+                )
+            return DFA.de_tabela(TabelaCompilada.de_bytes(definicao["tabela_bin"]))
+        
+        return DFA(
+            estados=definicao["estados"],
+            alfabeto=definicao["alfabeto"],
+            transicoes=definicao["transicoes"],
+            estado_inicial=definicao["estado_inicial"],
+            estados_finais=definicao["estados_finais"]
+        )
+
     def create_new_automaton(self, nome, estados_str, alfabeto_str, 
-                             inicial_str, finais_str, transicoes_str):
+                             inicial_str, finais_str, transicoes_str, minimizar=False, tipo="dfa",
+                             verificar_duplicatas=False, tarefa=None):
         """
         Recebe os dados brutos (strings) da interface, valida-os,
         cria uma definição de autômato e a salva no banco de dados.
+        
+        :param minimizar: (bool) Se True, salva o DFA mínimo equivalente
+                          em vez da definição exatamente como foi digitada.
+        :param tipo: (str) 'dfa', 'nfa' (permite não-determinismo e ε) ou
+                     'regex' ('transicoes_str' é uma expressão regular).
+        :param verificar_duplicatas: (bool) Se True, procura na biblioteca os
+                          autômatos que aceitam a mesma linguagem (o novo é
+                          salvo mesmo assim).
+        :param tarefa: (Tarefa) Tarefa do Controller, se houver: o cancelamento
+                       é verificado durante a validação e a busca por
+                       duplicatas, e a tarefa é confirmada (deixa de poder
+                       ser cancelada) logo antes de gravar no banco.
+        :return: (list) Nomes dos autômatos equivalentes já salvos
+                 (None se 'verificar_duplicatas' for False).
         """
         try:
-            # --- PASSO 1: "PARSEAR" (Analisar) as strings ---
+            # --- PASSO 1 e 2: "PARSEAR" as strings e VALIDAR o autômato ---
             if not nome.strip():
                 raise ValueError("O nome do autômato não pode estar vazio.")
                 
             nome = nome.strip()
             
-            if nome in self._automata_definitions:
+            if nome in self._automata_names:
                 raise ValueError(f"Um autômato com o nome '{nome}' já existe.")
 
-            estados_set = set(s.strip() for s in estados_str.split(',') if s.strip())
-            alfabeto_set = set(s.strip() for s in alfabeto_str.split(',') if s.strip())
-            finais_set = set(s.strip() for s in finais_str.split(',') if s.strip())
-            estado_inicial = inicial_str.strip()
-
-            transicoes_dict = self._parse_transitions(transicoes_str)
-            
-            # --- PASSO 2: VALIDAR a lógica do Autômato ---
-            # Nós usamos seu motor 'DFA' universal para validar!
-            DFA(
-                estados=estados_set,
-                alfabeto=alfabeto_set,
-                transicoes=transicoes_dict,
-                estado_inicial=estado_inicial,
-                estados_finais=finais_set
-            )
-            # Se o __init__ do DFA não disparar um erro, a definição é válida.
+            dfa = self._build_or_compile(estados_str, alfabeto_str, inicial_str,
+                                         finais_str, transicoes_str, minimizar, tipo)
 
         except ValueError as e:
             # Se qualquer passo da validação/parse falhar, propaga o erro.
             # O Controller irá capturar este erro e mostrá-lo na View.
             print(f"Erro de validação: {e}", file=sys.stderr)
             raise e # Propaga o erro
+        
+        # A busca por duplicatas é só um aviso: se ela falhar (ex: o novo
+        # autômato é um NFA grande demais para determinizar), salva mesmo assim
+        duplicatas = None
+        if verificar_duplicatas:
+            try:
+                duplicatas = self.find_equivalent_automata(dfa, tarefa)
+            except ValueError as e:
+                print(f"Não foi possível procurar duplicatas de '{nome}': {e}", file=sys.stderr)
+                duplicatas = []
 
         # --- PASSO 3: SALVAR no Banco de Dados ---
-        # Se chegamos aqui, a definição é válida.
+        # Se chegamos aqui, a definição é válida. Daqui em diante o
+        # salvamento não pode mais ser cancelado.
+        if tarefa is not None:
+            tarefa.confirmar()
+        with self._lock_nomes:
+            # O nome pode ter sido salvo por outra tarefa durante a validação
+            if nome in self._automata_names:
+                print(f"Erro de validação: o nome '{nome}' já existe.", file=sys.stderr)
+                raise ValueError(f"Um autômato com o nome '{nome}' já existe.")
+            try:
+                tabela_bin, formato_bin, tipo, fonte, fonte_hash = self._storage_params(dfa)
+                self.db.save_automaton_definition(
+                    nome=nome,
+                    estados=dfa.estados,
+                    alfabeto=dfa.alfabeto,
+                    estado_inicial=dfa.estado_inicial,
+                    estados_finais=dfa.estados_finais,
+                    transicoes_dict=dfa.transicoes,
+                    tabela_bin=tabela_bin,
+                    formato_bin=formato_bin,
+                    tipo=tipo,
+                    fonte=fonte,
+                    fonte_hash=fonte_hash
+                )
+            
+                # Registra só o novo autômato (os outros continuam
+                # carregados e compilados)
+                self._register_automaton(nome)
+                print(f"SUCESSO: Autômato '{nome}' validado e salvo.")
+            
+            except Exception as e:
+                print(f"Erro ao salvar no DB: {e}", file=sys.stderr)
+                raise ValueError(f"Erro ao salvar no banco de dados: {e}")
+        
+        if duplicatas:
+            print(f"Atenção: '{nome}' aceita a mesma linguagem que: {', '.join(duplicatas)}")
+        return duplicatas
+
+    def update_automaton(self, nome, estados_str, alfabeto_str, 
+                         inicial_str, finais_str, transicoes_str, minimizar=False, tipo="dfa"):
+        """
+        Substitui a definição de um autômato já salvo (mesmos parâmetros
+        de create_new_automaton). Só o cache deste autômato é invalidado.
+        """
+        if nome not in self._automata_names:
+            raise ValueError(f"Nenhum autômato com o nome '{nome}' foi definido.")
+        
         try:
-            self.db.save_automaton_definition(
-                nome=nome,
-                estados=estados_set,
-                alfabeto=alfabeto_set,
-                estado_inicial=estado_inicial,
-                estados_finais=finais_set,
-                transicoes_dict=transicoes_dict
-            )
+            dfa = self._build_or_compile(estados_str, alfabeto_str, inicial_str,
+                                         finais_str, transicoes_str, minimizar, tipo)
+        except ValueError as e:
+            print(f"Erro de validação: {e}", file=sys.stderr)
+            raise e
+        
+        with self._lock_nomes:
+            # O autômato pode ter sido apagado por outra tarefa durante a validação
+            if nome not in self._automata_names:
+                raise ValueError(f"Nenhum autômato com o nome '{nome}' foi definido.")
+            try:
+                tabela_bin, formato_bin, tipo, fonte, fonte_hash = self._storage_params(dfa)
+                self.db.update_automaton_definition(
+                    nome=nome,
+                    estados=dfa.estados,
+                    alfabeto=dfa.alfabeto,
+                    estado_inicial=dfa.estado_inicial,
+                    estados_finais=dfa.estados_finais,
+                    transicoes_dict=dfa.transicoes,
+                    tabela_bin=tabela_bin,
+                    formato_bin=formato_bin,
+                    tipo=tipo,
+                    fonte=fonte,
+                    fonte_hash=fonte_hash
+                )
+                self._register_automaton(nome)
+                print(f"SUCESSO: Autômato '{nome}' atualizado.")
             
-            # Atualiza o cache interno para que o novo autômato apareça
-            self.load_definitions_from_db()
-            print(f"SUCESSO: Autômato '{nome}' validado e salvo.")
+            except Exception as e:
+                print(f"Erro ao atualizar no DB: {e}", file=sys.stderr)
+                raise ValueError(f"Erro ao atualizar no banco de dados: {e}")
+
+    def delete_automaton(self, nome):
+        """
+        Apaga um autômato do banco e tira só ele dos caches.
+        """
+        with self._lock_nomes:
+            if nome not in self._automata_names:
+                raise ValueError(f"Nenhum autômato com o nome '{nome}' foi definido.")
             
-        except Exception as e:
-            print(f"Erro ao salvar no DB: {e}", file=sys.stderr)
-            raise ValueError(f"Erro ao salvar no banco de dados: {e}")
+            try:
+                self.db.delete_automaton_definition(nome)
+            except Exception as e:
+                print(f"Erro ao apagar no DB: {e}", file=sys.stderr)
+                raise ValueError(f"Erro ao apagar do banco de dados: {e}")
+            
+            self._automata_names.discard(nome)
+        self._automata_cache.pop(nome)
+        self._automata_cache.pop(("original", nome))
+        print(f"Autômato '{nome}' apagado.")
         
     # (Dentro da classe AutomatonModel, pode ser depois de create_new_automaton)
 
-    def create_automaton_from_file_content(self, file_content_string):
+    def create_automaton_from_file_content(self, file_content_string, tarefa=None):
         """
         Analisa o conteúdo de um arquivo .txt, extrai as 6 strings
         (nome, alfabeto, etc.) e chama a função 'create_new_automaton'
         para fazer a validação e o salvamento.
+        
+        :param tarefa: (Tarefa) Veja create_new_automaton.
         """
         print("Model processando conteúdo de arquivo...")
         
+        dados = self._parse_file_content(file_content_string)
+
+        # --- MÁGICA DA REUTILIZAÇÃO! ---
+        # Chama a função que já existe para fazer todo o trabalho
+        # de validação, criação do DFA e salvamento no DB.
+        print(f"Arquivo parseado. Tentando criar autômato: {dados['nome']}")
+        self.create_new_automaton(**dados, tarefa=tarefa)
+
+    @staticmethod
+    def _parse_file_content(file_content_string):
+        """
+        Extrai de um arquivo .txt as 6 strings da definição (e o tipo
+        opcional, "tipo: nfa"), no formato dos parâmetros de
+        create_new_automaton. Dispara ValueError se o arquivo estiver mal formatado.
+        
+        Um arquivo com a chave "regex: <expressão>" só precisa, além dela,
+        do nome (o alfabeto é opcional) e não tem seção de transições.
+        """
         parsed_data = {}
         transition_lines = []
         parsing_transitions = False
@@ -210,6 +531,19 @@ class AutomatonModel:
 
         # --- Fim da leitura ---
         
+        if 'regex' in parsed_data:
+            if 'nome' not in parsed_data:
+                raise ValueError("Arquivo .txt incompleto. Faltando chaves: nome")
+            return {
+                "nome": parsed_data['nome'],
+                "alfabeto_str": parsed_data.get('alfabeto', ''),
+                "estados_str": "",
+                "inicial_str": "",
+                "finais_str": "",
+                "transicoes_str": parsed_data['regex'],
+                "tipo": "regex"
+            }
+        
         # Verifica se todas as chaves necessárias foram encontradas
         required_keys = ['nome', 'alfabeto', 'estados', 'inicial', 'finais']
         if not all(key in parsed_data for key in required_keys):
@@ -221,73 +555,586 @@ class AutomatonModel:
         if not transicoes_str:
             raise ValueError("Arquivo .txt não contém nenhuma regra de transição após 'transicoes:'.")
 
-        # --- MÁGICA DA REUTILIZAÇÃO! ---
-        # Chama a função que já existe para fazer todo o trabalho
-        # de validação, criação do DFA e salvamento no DB.
-        print(f"Arquivo parseado. Tentando criar autômato: {parsed_data['nome']}")
-        self.create_new_automaton(
-            nome=parsed_data['nome'],
-            alfabeto_str=parsed_data['alfabeto'],
-            estados_str=parsed_data['estados'],
-            inicial_str=parsed_data['inicial'],
-            finais_str=parsed_data['finais'],
-            transicoes_str=transicoes_str
-        )
+        return {
+            "nome": parsed_data['nome'],
+            "alfabeto_str": parsed_data['alfabeto'],
+            "estados_str": parsed_data['estados'],
+            "inicial_str": parsed_data['inicial'],
+            "finais_str": parsed_data['finais'],
+            "transicoes_str": transicoes_str,
+            "tipo": parsed_data.get('tipo', 'dfa') # Chave opcional ("tipo: nfa")
+        }
 
+    def import_automata_bulk(self, fonte, workers=None, minimizar=False, tarefa=None):
+        """
+        Importa de uma vez vários arquivos .txt de definição: 'fonte' pode ser
+        uma pasta (todos os .txt dentro dela), um padrão glob ("defs/*.txt")
+        ou um arquivo .zip. Os arquivos são analisados e validados em
+        paralelo, e todos os válidos são salvos numa única transação (se ela
+        falhar, são salvos um a um e os que falharem entram no relatório).
+        
+        :param tarefa: (Tarefa) Tarefa do Controller, se houver: o cancelamento
+                       é verificado a cada arquivo validado, e a tarefa é
+                       confirmada logo antes de gravar o lote.
+        :return: (dict) Relatório {arquivo: None se importado, ou a mensagem de erro}
+        """
+        arquivos = ler_arquivos_definicao(fonte)
+        print(f"Importação em lote: {len(arquivos)} arquivos encontrados em '{fonte}'.")
+        
+        relatorio = {}
+        novos = []
+        nomes_no_lote = set()
+        for rotulo, nome, dfa, erro in validar_arquivos_em_paralelo(arquivos, workers, minimizar):
+            if tarefa is not None:
+                tarefa.verificar_cancelamento()
+            if erro is None and (nome in self._automata_names or nome in nomes_no_lote):
+                erro = f"Um autômato com o nome '{nome}' já existe."
+            relatorio[rotulo] = erro
+            if erro is None:
+                nomes_no_lote.add(nome)
+                novos.append((rotulo, nome, dfa))
+        
+        if tarefa is not None:
+            tarefa.confirmar()
+        with self._lock_nomes:
+            # Confere de novo: outra tarefa pode ter salvo algum dos nomes
+            for rotulo, nome, _ in novos:
+                if nome in self._automata_names:
+                    relatorio[rotulo] = f"Um autômato com o nome '{nome}' já existe."
+            definicoes = {
+                rotulo: (nome, dfa.estados, dfa.alfabeto, dfa.estado_inicial, dfa.estados_finais, dfa.transicoes)
+                        + self._storage_params(dfa)
+                for rotulo, nome, dfa in novos if relatorio[rotulo] is None
+            }
+            try:
+                self.db.save_automaton_definitions(definicoes.values())
+            except sqlite3.Error as e:
+                # A transação do lote foi desfeita: grava um a um para
+                # separar os arquivos que falham dos que podem ser salvos
+                print(f"Erro ao salvar o lote no DB ({e}); salvando um a um.", file=sys.stderr)
+                for rotulo, definicao in definicoes.items():
+                    try:
+                        self.db.save_automaton_definitions([definicao])
+                    except sqlite3.Error as e_def:
+                        relatorio[rotulo] = f"Erro ao salvar no banco de dados: {e_def}"
+            
+            importados = [nome for rotulo, nome, _ in novos if relatorio[rotulo] is None]
+            for nome in importados:
+                self._register_automaton(nome)
+        
+        print(f"Importação em lote: {len(importados)} importados, {len(relatorio) - len(importados)} com erro.")
+        return relatorio
+
+    @instrumentado("model.get_automaton_instance")
     def _get_automaton_instance(self, nome):
         """
         Método privado para carregar (ou pegar do cache) uma instância 
-        do motor DFA pronta para uso.
+        do motor DFA pronta para uso (já com a tabela compilada).
         """
-        # Se já instanciamos esse DFA antes, reutiliza
-        if nome in self._automata_cache:
-            return self._automata_cache[nome]
+        # Se já instanciamos esse DFA antes (e ele não saiu do cache), reutiliza
+        dfa_instance = self._automata_cache.get(nome)
+        if dfa_instance is not None:
+            return dfa_instance
         
-        # Se não, busca a definição no cache de definições
-        if nome not in self._automata_definitions:
-            raise ValueError(f"Nenhum autômato com o nome '{nome}' foi definido.")
-            
-        definicao = self._automata_definitions[nome]
+        # Se não, busca a definição no banco
+        definicao = self._get_definition(nome)
         
-        # Cria a instância universal do DFA
-        dfa_instance = DFA(
-            estados=definicao["estados"],
-            alfabeto=definicao["alfabeto"],
-            transicoes=definicao["transicoes"],
-            estado_inicial=definicao["estado_inicial"],
-            estados_finais=definicao["estados_finais"]
-        )
+        # Regex compilada por outra versão do compilador: compila e regrava
+        if definicao.get("tipo") == "regex" and \
+                definicao.get("fonte_hash") != hash_regex(definicao["fonte"], definicao["alfabeto"]):
+            print(f"Recompilando a expressão regular de '{nome}'...")
+            self.update_automaton(nome, "", ",".join(sorted(definicao["alfabeto"])), "", "",
+                                  definicao["fonte"], tipo="regex")
+            definicao = self._get_definition(nome)
         
-        # Guarda no cache e retorna
-        self._automata_cache[nome] = dfa_instance
+        with METRICAS.medir("model.construir_dfa"):
+            # Cria a instância universal do DFA (ou o NFA, que se
+            # determiniza sozinho, aos poucos, conforme é executado)
+            dfa_instance = self._definition_to_automaton(definicao)
+            
+            if not isinstance(dfa_instance, NFA):
+                # Executa sobre o DFA mínimo equivalente (tabela menor). Os
+                # estados dele são classes (ex: "{q1|q3}"): quando o caminho é
+                # exibido, o teste roda no DFA original (veja _get_path_instance).
+                # Uma regex já é salva minimizada.
+                if self.minimizar and definicao.get("tipo") != "regex":
+                    dfa_instance = self._minimized_instance(definicao, dfa_instance)
+                
+                # Compila a tabela de transições já aqui, para que ela fique no
+                # cache junto com a instância e as próximas execuções a reutilizem.
+                dfa_instance.compilar()
+        
+        # Guarda no cache (o LRU descarta os menos usados) e retorna
+        self._automata_cache.put(nome, dfa_instance)
         return dfa_instance
 
-    def run_test(self, automaton_name, input_word):
+    def _minimized_instance(self, definicao, dfa):
+        """
+        Retorna o DFA mínimo equivalente a 'dfa' (o próprio 'dfa' se ele já
+        for mínimo). A minimização só é calculada no primeiro carregamento:
+        o resultado fica salvo no banco (veja DatabaseManager.set_minimized_table)
+        e é lido direto nos seguintes, até a definição mudar.
+        
+        O DFA mínimo que difere do salvo tem o atributo 'difere_do_salvo'
+        (os nomes dos estados dele são classes, ex: "{q1|q3}").
+        """
+        tabela_min = definicao.get("tabela_min")
+        if tabela_min is not None and definicao.get("formato_min") == FORMATO_BINARIO:
+            if not tabela_min:
+                return dfa # Já era mínimo
+            minimo = DFA.de_tabela(TabelaCompilada.de_bytes(tabela_min))
+            minimo.difere_do_salvo = True
+            return minimo
+        
+        minimo = dfa.minimizar()
+        if all(original == classe for original, classe in minimo.mapa_minimizacao.items()):
+            self.db.set_minimized_table(definicao["nome"], b'', FORMATO_BINARIO)
+            return dfa
+        self.db.set_minimized_table(definicao["nome"], minimo.compilar().para_bytes(), FORMATO_BINARIO)
+        minimo.difere_do_salvo = True
+        return minimo
+
+    def _get_path_instance(self, nome):
+        """
+        Instância usada quando o caminho da execução é exibido (run_test):
+        o DFA como foi salvo, para que os passos tenham os nomes de estados
+        do usuário, e não as classes do DFA mínimo. Ela também fica no cache
+        LRU (chave ("original", nome)), só enquanto for usada.
+        """
+        instancia = self._get_automaton_instance(nome)
+        if not getattr(instancia, 'difere_do_salvo', False):
+            return instancia # Não foi minimizada (NFA, regex) ou já era mínima
+        
+        chave = ("original", nome)
+        original = self._automata_cache.get(chave)
+        if original is None:
+            original = self._definition_to_automaton(self._get_definition(nome))
+            original.compilar()
+            self._automata_cache.put(chave, original)
+        return original
+
+    def _get_dfa_instance(self, nome, operacao):
+        """
+        Como _get_automaton_instance, mas para operações que só existem
+        em DFAs (tabela compilada). Dispara ValueError se for um NFA.
+        """
+        instancia = self._get_automaton_instance(nome)
+        if isinstance(instancia, NFA):
+            raise ValueError(f"O autômato '{nome}' é um NFA: {operacao} só está disponível para DFAs.")
+        return instancia
+
+    def minimize_automaton(self, nome):
+        """
+        Minimiza um autômato salvo sob demanda (sem alterar o banco).
+        
+        :return: (DFA) O DFA mínimo; o atributo 'mapa_minimizacao' leva cada
+                 estado original ao seu estado no DFA mínimo (None se removido).
+        """
+        automato = self._definition_to_automaton(self._get_definition(nome))
+        if isinstance(automato, NFA):
+            raise ValueError(f"O autômato '{nome}' é um NFA e não pode ser minimizado.")
+        return automato.minimizar()
+
+    def migrate_to_binary_storage(self):
+        """
+        Converte para o formato binário os autômatos que o banco ainda guarda
+        em JSON (de versões anteriores), numa única transação.
+        
+        :return: (int) Quantos autômatos foram convertidos.
+        """
+        nomes = self.db.get_json_automaton_names()
+        if not nomes:
+            return 0
+        
+        tabelas = []
+        for nome in nomes:
+            definicao = self.db.get_automaton_definition(nome)
+            tabela_bin = self._definition_to_automaton(definicao).compilar().para_bytes()
+            tabelas.append((nome, tabela_bin, FORMATO_BINARIO))
+        
+        try:
+            self.db.set_automaton_binary_tables(tabelas)
+        except Exception as e:
+            print(f"Erro ao converter as definições no DB: {e}", file=sys.stderr)
+            raise ValueError(f"Erro ao converter o banco de dados: {e}")
+        
+        print(f"Model converteu {len(tabelas)} autômatos para o formato binário.")
+        return len(tabelas)
+
+    @instrumentado("model.run_test")
+    def run_test(self, automaton_name, input_word, tarefa=None):
         """
         Ponto de entrada principal para a lógica de teste.
         Recebe o nome do autômato e a palavra, retorna o resultado.
         
-        :return: (tuple) (bool de aceitação, list de passos)
+        :param tarefa: (Tarefa) Tarefa do Controller, se houver: ela é
+                       confirmada (deixa de poder ser cancelada) antes de
+                       gravar o resultado no histórico.
+        :return: (tuple) (bool de aceitação, list de passos, posição da
+                 decisão antecipada, motivo da rejeição); veja
+                 DFA.run_detalhado. A posição e o motivo também são
+                 gravados no histórico.
         """
         try:
-            # 1. Pega o motor DFA correto
-            dfa_engine = self._get_automaton_instance(automaton_name)
+            # 1. Pega o motor DFA correto (o original, não o mínimo: o
+            #    caminho é exibido com os nomes de estados do usuário)
+            dfa_engine = self._get_path_instance(automaton_name)
             
             # 2. Executa o motor universal com a palavra
-            aceita, caminho = dfa_engine.run(input_word)
+            with METRICAS.medir("dfa.run"):
+                aceita, caminho, decidida_em, motivo = dfa_engine.run_detalhado(input_word)
             
             # 3. Salva o resultado no histórico
-            self.db.save_test_result(automaton_name, input_word, aceita)
+            if tarefa is not None:
+                tarefa.confirmar()
+            with METRICAS.medir("db.save_test_result"):
+                self.db.save_test_result(automaton_name, input_word, aceita, decidida_em, motivo)
             
-            return aceita, caminho
+            return aceita, caminho, decidida_em, motivo
             
         except Exception as e:
             print(f"Erro ao executar o teste: {e}", file=sys.stderr)
             # Retorna um resultado de falha que a interface possa entender
             raise e # Propaga o erro
 
-    def get_test_history(self):
+    def run_test_batch(self, automaton_name, words, compartilhar_prefixos=False):
+        """
+        Testa várias palavras de uma vez no mesmo autômato, usando a
+        execução vetorizada do DFA (sem montar os caminhos).
+        
+        :param compartilhar_prefixos: (bool) Se True, os prefixos comuns às
+                                      palavras são percorridos uma vez só
+                                      (só em DFAs; veja DFA.run_batch).
+        :return: (tuple) (aceitações, índices dos estados finais), veja DFA.run_batch
+                 (num NFA, os nomes dos estados finais, veja NFA.run_batch)
+        """
+        try:
+            words = list(words)
+            if compartilhar_prefixos:
+                dfa_engine = self._get_dfa_instance(automaton_name, "a execução por prefixos")
+                aceitas, estados = dfa_engine.run_batch(words, compartilhar_prefixos=True)
+            else:
+                dfa_engine = self._get_automaton_instance(automaton_name)
+                aceitas, estados = dfa_engine.run_batch(words)
+            # A tabela NumPy do lote passou a ocupar memória: reavalia o cache
+            self._automata_cache.remeasure(automaton_name)
+            
+            # Salva todo o lote no histórico numa única transação
+            self.db.save_test_results(
+                (automaton_name, word, bool(aceita)) for word, aceita in zip(words, aceitas)
+            )
+            
+            return aceitas, estados
+            
+        except Exception as e:
+            print(f"Erro ao executar o lote de testes: {e}", file=sys.stderr)
+            raise e
+
+    def run_tests_parallel(self, automaton_name, words, workers=None):
+        """
+        Testa várias palavras distribuindo blocos delas entre 'workers'
+        processos. O autômato compilado é enviado uma vez a cada processo
+        e o histórico é gravado de uma vez, ao final.
+        
+        :return: (tuple) (aceitações, índices dos estados finais), na ordem de 'words'
+        """
+        try:
+            words = list(words)
+            tabela_compilada = self._get_dfa_instance(automaton_name, "a execução em paralelo").compilar()
+            aceitas, estados = executar_em_paralelo(tabela_compilada, words, workers)
+            
+            self.db.save_test_results(
+                (automaton_name, word, bool(aceita)) for word, aceita in zip(words, aceitas)
+            )
+            
+            return aceitas, estados
+            
+        except Exception as e:
+            print(f"Erro ao executar os testes em paralelo: {e}", file=sys.stderr)
+            raise e
+
+    def get_state_names(self, automaton_name):
+        """
+        Retorna os nomes dos estados do autômato na ordem dos índices
+        devolvidos por run_test_batch / run_test_blocks, ou None para um
+        NFA (que já devolve os nomes dos estados finais).
+        """
+        instancia = self._get_automaton_instance(automaton_name)
+        if isinstance(instancia, NFA):
+            return None
+        return instancia.compilar().estados
+
+    def run_test_blocks(self, automaton_name, blocos, workers=None, salvar_historico=True,
+                        compartilhar_prefixos=False):
+        """
+        Testa blocos de palavras vindos de um iterável (ex: lidos aos poucos
+        de um arquivo), produzindo os resultados de cada bloco assim que
+        ficam prontos. Com workers > 1 os blocos rodam em vários processos
+        (exceto num NFA, cuja tabela é montada durante a execução).
+        
+        :param blocos: (iterable) Listas de palavras.
+        :param salvar_historico: (bool) Se True, cada bloco vai para o histórico.
+        :param compartilhar_prefixos: (bool) Se True, os prefixos comuns às
+                                      palavras de cada bloco são percorridos
+                                      uma vez só (só em DFAs, num processo).
+        :return: (generator) Tuplas (bloco, aceitações, índices dos estados
+                 finais), como em run_test_batch.
+        """
+        if compartilhar_prefixos:
+            dfa_engine = self._get_dfa_instance(automaton_name, "a execução por prefixos")
+            resultados = ((bloco, dfa_engine.run_batch(bloco, compartilhar_prefixos=True)) for bloco in blocos)
+        else:
+            dfa_engine = self._get_automaton_instance(automaton_name)
+            if workers and workers > 1 and not isinstance(dfa_engine, NFA):
+                resultados = executar_blocos_em_paralelo(dfa_engine.compilar(), blocos, workers)
+            else:
+                resultados = ((bloco, dfa_engine.run_batch(bloco)) for bloco in blocos)
+        
+        for bloco, (aceitas, estados) in resultados:
+            if salvar_historico:
+                self.db.save_test_results(
+                    (automaton_name, word, bool(aceita)) for word, aceita in zip(bloco, aceitas)
+                )
+            yield bloco, aceitas, estados
+
+    def run_long_word_parallel(self, automaton_name, fonte, workers=None):
+        """
+        Testa uma única palavra muito longa (string ou arquivo aberto em modo
+        texto) dividindo-a em pedaços executados em paralelo.
+        O caminho não é montado e o teste não vai para o histórico.
+        
+        :return: (tuple) (bool de aceitação, nome do estado final; None no
+                 estado de morte ou se houver símbolo fora do alfabeto)
+        """
+        try:
+            tabela_compilada = self._get_dfa_instance(automaton_name, "a execução em paralelo").compilar()
+            aceita, estado = executar_palavra_em_paralelo(tabela_compilada, fonte, workers)
+            
+            nome_estado = None
+            if 0 <= estado < tabela_compilada.num_estados:
+                nome_estado = tabela_compilada.estados[estado]
+            return aceita, nome_estado
+            
+        except Exception as e:
+            print(f"Erro ao executar a palavra em paralelo: {e}", file=sys.stderr)
+            raise e
+
+    def run_test_stream(self, automaton_name, fonte):
         """
-        Busca o histórico de testes no banco de dados.
+        Testa uma entrada grande demais para caber em memória, lida em
+        pedaços de um arquivo aberto (modo texto) ou de um iterável de strings.
+        O caminho não é montado e o teste não vai para o histórico.
+        
+        :return: (DFARunner) O executor ao final da leitura
+                 (veja accepted, state, posicao e posicao_decisao).
+        """
+        try:
+            runner = self._get_dfa_instance(automaton_name, "a execução em fluxo").runner()
+            runner.feed_from(fonte)
+            return runner
+            
+        except Exception as e:
+            print(f"Erro ao executar o teste em fluxo: {e}", file=sys.stderr)
+            raise e
+
+    # --- Comparação de linguagens (veja model/equivalencia.py) ---
+
+    def _comparison_table(self, nome):
+        """TabelaCompilada de um autômato salvo, pronta para ser comparada."""
+        return tabela_para_comparacao(self._get_automaton_instance(nome))
+
+    def check_equivalence(self, automaton_name_1, automaton_name_2):
+        """
+        Verifica se dois autômatos salvos aceitam a mesma linguagem, sem
+        testar palavras (algoritmo de Hopcroft e Karp).
+        
+        :return: (tuple) (bool, contraexemplo): uma palavra aceita por só
+                 um dos dois, ou None se forem equivalentes.
+        """
+        return equivalencia(self._comparison_table(automaton_name_1),
+                            self._comparison_table(automaton_name_2))
+
+    def check_inclusion(self, automaton_name_1, automaton_name_2):
+        """
+        Verifica se toda palavra aceita pelo primeiro autômato também é
+        aceita pelo segundo.
+        
+        :return: (tuple) (bool, contraexemplo): uma palavra aceita pelo
+                 primeiro e rejeitada pelo segundo, ou None.
+        """
+        return inclusao(self._comparison_table(automaton_name_1),
+                        self._comparison_table(automaton_name_2))
+
+    def _library_comparison_table(self, nome):
+        """
+        Como _comparison_table, mas sem passar pelo cache LRU: usa a instância
+        se ela já estiver no cache e, se não, monta a tabela direto da
+        definição, sem guardá-la (uma busca na biblioteca inteira não
+        despeja os autômatos em uso).
+        """
+        instancia = self._automata_cache.peek(nome)
+        if instancia is None:
+            instancia = self._definition_to_automaton(self._get_definition(nome))
+        return tabela_para_comparacao(instancia)
+
+    def find_equivalent_automata(self, automato, tarefa=None):
+        """
+        Procura na biblioteca os autômatos equivalentes a 'automato'
+        (o nome de um salvo, que é ignorado na busca, ou uma instância de DFA/NFA).
+        Um autômato da biblioteca que não pode ser comparado (ex: um NFA
+        grande demais para determinizar) é ignorado, com um aviso.
+        
+        :param tarefa: (Tarefa) Se informada, o cancelamento é verificado a cada autômato.
+        :return: (list) Nomes dos autômatos que aceitam a mesma linguagem.
+        """
+        ignorar = None
+        if isinstance(automato, str):
+            ignorar = automato
+            tabela = self._comparison_table(automato)
+        else:
+            tabela = tabela_para_comparacao(automato)
+        
+        equivalentes = []
+        for nome in self.get_available_automata_names():
+            if nome == ignorar:
+                continue
+            if tarefa is not None:
+                tarefa.verificar_cancelamento()
+            try:
+                if equivalencia(tabela, self._library_comparison_table(nome))[0]:
+                    equivalentes.append(nome)
+            except ValueError as e:
+                print(f"Autômato '{nome}' ignorado na busca por equivalentes: {e}", file=sys.stderr)
+        return equivalentes
+
+    def _get_product(self, nomes, versoes):
+        """
+        Retorna o ProdutoDFA dos autômatos 'nomes' (todos DFAs) e a sua chave
+        no cache. O último produto (e a sua tabela memoizada) é reaproveitado
+        sem carregar os DFAs enquanto os nomes e as versões forem os mesmos.
+        
+        :param versoes: (dict) Veja DatabaseManager.get_automaton_versions.
+        """
+        chave = ("produto",) + tuple((nome, versoes.get(nome)) for nome in nomes)
+        produto = self._automata_cache.get(chave)
+        if produto is None:
+            produto = ProdutoDFA([self._get_automaton_instance(nome).compilar() for nome in nomes])
+            if self._product_key is not None:
+                self._automata_cache.pop(self._product_key)
+            self._product_key = chave
+            self._automata_cache.put(chave, produto)
+        return produto, chave
+
+    def classify_words(self, words, automaton_names=None, salvar_historico=True, tarefa=None):
         """
-        return self.db.get_test_history()
\ No newline at end of file
+        Testa cada palavra em vários autômatos de uma vez: os DFAs avançam
+        juntos (autômato produto, veja ProdutoDFA), então cada palavra é lida
+        uma única vez em vez de uma vez por autômato. Os NFAs, que montam a
+        própria tabela durante a execução, rodam em separado.
+        
+        :param automaton_names: (list) Os autômatos (padrão: todos os salvos).
+        :param salvar_historico: (bool) Se True, cada teste vai para o histórico.
+        :param tarefa: (Tarefa) Tarefa do Controller, se houver: ela é
+                       confirmada antes de gravar o histórico.
+        :return: (tuple) (nomes dos autômatos, e para cada palavra a lista
+                 das aceitações, na ordem dos nomes)
+        """
+        try:
+            words = list(words)
+            nomes = list(automaton_names) if automaton_names is not None else self.get_available_automata_names()
+            for nome in nomes:
+                if nome not in self._automata_names:
+                    raise ValueError(f"Nenhum autômato com o nome '{nome}' foi definido.")
+            
+            # O tipo vem do banco: os DFAs só são carregados se o produto
+            # precisar ser montado de novo, e cada NFA é carregado uma vez
+            versoes = self.db.get_automaton_versions()
+            nfas = [nome for nome in nomes if versoes.get(nome, ("dfa",))[0] == "nfa"]
+            dfas = [nome for nome in nomes if versoes.get(nome, ("dfa",))[0] != "nfa"]
+            instancias_nfas = [self._get_automaton_instance(nome) for nome in nfas]
+            
+            with METRICAS.medir("model.classify_words"):
+                if dfas:
+                    produto, chave = self._get_product(dfas, versoes)
+                    resultados_dfas = produto.executar_lote(words)
+                    # A tabela memoizada cresceu: reavalia o cache
+                    self._automata_cache.remeasure(chave)
+                else:
+                    resultados_dfas = [[] for _ in words]
+                resultados_nfas = [nfa.run_batch(words)[0] for nfa in instancias_nfas]
+                for nome in nfas:
+                    self._automata_cache.remeasure(nome)
+            
+            # Volta para a ordem de 'nomes'
+            colunas_dfas = {nome: i for i, nome in enumerate(dfas)}
+            colunas_nfas = {nome: i for i, nome in enumerate(nfas)}
+            resultados = []
+            for p, aceitas_dfas in enumerate(resultados_dfas):
+                resultados.append([
+                    aceitas_dfas[colunas_dfas[nome]] if nome in colunas_dfas
+                    else resultados_nfas[colunas_nfas[nome]][p]
+                    for nome in nomes
+                ])
+            
+            if tarefa is not None:
+                tarefa.confirmar()
+            if salvar_historico:
+                self.db.save_test_results(
+                    (nome, word, aceita)
+                    for word, aceitas in zip(words, resultados)
+                    for nome, aceita in zip(nomes, aceitas)
+                )
+            
+            return nomes, resultados
+            
+        except Exception as e:
+            print(f"Erro ao classificar as palavras: {e}", file=sys.stderr)
+            raise e
+
+    def classify_word(self, input_word, automaton_names=None, salvar_historico=True, tarefa=None):
+        """
+        Testa uma palavra em vários autômatos numa única passada (veja classify_words).
+        
+        :return: (dict) {nome do autômato: bool de aceitação}
+        """
+        nomes, resultados = self.classify_words([input_word], automaton_names, salvar_historico, tarefa)
+        return dict(zip(nomes, resultados[0]))
+
+    # --- Diagnóstico (veja model/metricas.py) ---
+
+    def set_metrics_enabled(self, ativo):
+        """Liga ou desliga a coleta de métricas por etapa (desligada por padrão)."""
+        METRICAS.ativo = bool(ativo)
+
+    def is_metrics_enabled(self):
+        """True se a coleta de métricas está ligada."""
+        return METRICAS.ativo
+
+    def get_metrics(self):
+        """
+        Retorna as métricas coletadas por etapa (chamadas, tempos e
+        histograma de latência), veja Metricas.resumo.
+        """
+        return METRICAS.resumo()
+
+    def reset_metrics(self):
+        """Apaga as métricas coletadas até agora."""
+        METRICAS.zerar()
+
+    def get_test_history(self, after=None, limit=None, automaton=None, result=None):
+        """
+        Busca o histórico de testes no banco de dados
+        (paginado por cursor, veja DatabaseManager.get_test_history).
+        """
+        return self.db.get_test_history(after=after, limit=limit, automaton=automaton, result=result)
+
+    def get_test_history_since(self, after_id):
+        """
+        Busca só as entradas do histórico gravadas depois da entrada 'after_id'
+        (mais recentes primeiro), para atualizar a tabela sem recarregá-la.
+        """
+        return self.db.get_test_history_since(after_id)
+
+    def get_last_history_id(self):
+        """Retorna o id da entrada mais recente do histórico (0 se vazio)."""
+        return self.db.get_last_history_id()
\ No newline at end of file
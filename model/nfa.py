@@ -0,0 +1,292 @@
+import sys
+
+from .dfa import MOTIVO_ESTADO_NAO_FINAL, MOTIVO_SEM_TRANSICAO, MOTIVO_SIMBOLO_INVALIDO
+from .sob_demanda import TabelaSobDemanda
+
+# Símbolo das transições vazias (ε-NFA), ex: "q0, ε -> q1"
+EPSILON = "ε"
+
+
+class NFA:
+    """
+    Autômato finito não-determinístico, com transições vazias (ε).
+
+    A execução usa determinização "sob demanda": cada estado do DFA
+    equivalente (um subconjunto de estados do NFA) só é construído quando
+    uma entrada chega nele, e as transições já calculadas ficam numa tabela
+    memoizada. Execuções repetidas passam a custar o mesmo que um DFA, sem
+    nunca montar o autômato das partes inteiro (que pode ser exponencial).
+
+    A tabela (veja TabelaSobDemanda) é limitada a 'limite_estados'
+    subconjuntos: ao enchê-la, ela é esvaziada e volta a ser preenchida a
+    partir do ponto atual da execução.
+    """
+
+    LIMITE_ESTADOS = 4096
+
+    def __init__(self, estados, alfabeto, transicoes, estado_inicial, estados_finais, limite_estados=None):
+        """
+        :param estados: (set) Estados do NFA (ex: {'q0', 'q1'})
+        :param alfabeto: (set) Símbolos do alfabeto (sem o ε)
+        :param transicoes: (dict) {estado_origem: {simbolo: conjunto de destinos}}.
+                           O símbolo EPSILON marca as transições vazias.
+                           Ex: {'q0': {'0': {'q0', 'q1'}, 'ε': {'q2'}}}
+        :param estado_inicial: (str) Estado inicial
+        :param estados_finais: (set) Estados de aceitação
+        :param limite_estados: (int) Máximo de subconjuntos na tabela memoizada.
+        """
+        self.estados = set(estados)
+        self.alfabeto = set(alfabeto)
+        self.transicoes = {
+            origem: {simbolo: set(destinos) for simbolo, destinos in caminhos.items()}
+            for origem, caminhos in transicoes.items()
+        }
+        self.estado_inicial = estado_inicial
+        self.estados_finais = set(estados_finais)
+        self.limite_estados = limite_estados or self.LIMITE_ESTADOS
+
+        self._validar_definicao()
+        self._internar()
+        self._memo = self._nova_tabela()
+
+    def _validar_definicao(self):
+        """
+        Verifica se a definição do NFA é coerente (mesmas regras do DFA,
+        mas cada transição pode ter vários destinos e o símbolo ε).
+        """
+        if EPSILON in self.alfabeto:
+            raise ValueError(f"Definição inválida: '{EPSILON}' é reservado para transições vazias e não pode estar no alfabeto.")
+
+        if self.estado_inicial not in self.estados:
+            raise ValueError(f"Definição inválida: Estado inicial '{self.estado_inicial}' não pertence ao conjunto de estados.")
+
+        if not self.estados_finais.issubset(self.estados):
+            raise ValueError(f"Definição inválida: Estados finais {self.estados_finais - self.estados} não pertencem ao conjunto de estados.")
+
+        for estado_origem, caminhos in self.transicoes.items():
+            if estado_origem not in self.estados:
+                raise ValueError(f"Definição inválida: Estado de origem '{estado_origem}' nas transições não pertence ao conjunto de estados.")
+
+            for simbolo, destinos in caminhos.items():
+                if simbolo != EPSILON and simbolo not in self.alfabeto:
+                    raise ValueError(f"Definição inválida: Símbolo '{simbolo}' na transição de '{estado_origem}' não pertence ao alfabeto.")
+
+                invalidos = destinos - self.estados
+                if invalidos:
+                    raise ValueError(f"Definição inválida: Estados de destino {invalidos} na transição de '{estado_origem}' não pertencem ao conjunto de estados.")
+
+    def _internar(self):
+        """
+        Numera estados e símbolos e representa cada conjunto de estados como
+        uma máscara de bits (int). Os fechos-ε já entram nas transições:
+        _delta[i][j] é o fecho-ε de todos os destinos de (estado i, símbolo j).
+        """
+        self._nomes = sorted(self.estados)
+        indice = {estado: i for i, estado in enumerate(self._nomes)}
+        self._simbolos = sorted(self.alfabeto)
+        self._indice_simbolos = {simbolo: j for j, simbolo in enumerate(self._simbolos)}
+
+        def mascara(estados):
+            resultado = 0
+            for estado in estados:
+                resultado |= 1 << indice[estado]
+            return resultado
+
+        # Fecho-ε de cada estado (busca a partir dele pelas transições vazias)
+        fechos = []
+        for estado in self._nomes:
+            visitados = {estado}
+            pilha = [estado]
+            while pilha:
+                for destino in self.transicoes.get(pilha.pop(), {}).get(EPSILON, ()):
+                    if destino not in visitados:
+                        visitados.add(destino)
+                        pilha.append(destino)
+            fechos.append(mascara(visitados))
+
+        def fecho(estados):
+            resultado = 0
+            for estado in estados:
+                resultado |= fechos[indice[estado]]
+            return resultado
+
+        self._delta = [
+            [fecho(self.transicoes.get(estado, {}).get(simbolo, ())) for simbolo in self._simbolos]
+            for estado in self._nomes
+        ]
+        self._mascara_inicial = fechos[indice[self.estado_inicial]]
+        self._mascara_finais = mascara(self.estados_finais)
+
+    def _nova_tabela(self):
+        """Tabela memoizada de subconjuntos (chaves: máscaras; marcas: 1 se final)."""
+        return TabelaSobDemanda(len(self._simbolos), self.limite_estados, self._sucessor, self._marca_final)
+
+    def _marca_final(self, mascara):
+        """1 se o subconjunto contém um estado final."""
+        return 1 if mascara & self._mascara_finais else 0
+
+    def _sucessor(self, mascara, j):
+        """Máscara dos destinos do subconjunto 'mascara' pelo símbolo j (com os fechos-ε)."""
+        destino = 0
+        i = 0
+        while mascara:
+            if mascara & 1:
+                destino |= self._delta[i][j]
+            mascara >>= 1
+            i += 1
+        return destino
+
+    def _nome_mascara(self, mascara):
+        """Nome de um subconjunto, ex: "{q0,q2}"."""
+        return "{" + ",".join(n for i, n in enumerate(self._nomes) if mascara >> i & 1) + "}"
+
+    def _nome(self, numero):
+        """Nome de um subconjunto da tabela (montado uma vez por subconjunto)."""
+        return self._memo.rotulo(numero, self._nome_mascara)
+
+    def _simbolo_invalido(self, palavra):
+        """Retorna o primeiro símbolo da palavra fora do alfabeto, ou None."""
+        for simbolo in palavra:
+            if simbolo not in self._indice_simbolos:
+                return simbolo
+        return None
+
+    def run(self, palavra):
+        """
+        Processa uma palavra, como DFA.run. Os passos do caminho são os
+        subconjuntos de estados ativos (ex: "{q0,q1}"); a execução para
+        assim que nenhum estado fica ativo.
+
+        :return: (tuple) (bool de aceitação, list de passos)
+        """
+        return self.run_detalhado(palavra)[:2]
+
+    def run_detalhado(self, palavra):
+        """
+        Como run, mas diz também onde e por que o veredito foi decidido
+        (mesmo retorno de DFA.run_detalhado).
+        """
+        invalido = self._simbolo_invalido(palavra)
+        if invalido is not None:
+            print(f"Símbolo '{invalido}' não pertence ao alfabeto {self.alfabeto}", file=sys.stderr)
+            return False, [self._nome_inicial()], None, MOTIVO_SIMBOLO_INVALIDO
+
+        indice = self._indice_simbolos
+        k = len(self._simbolos)
+        memo = self._memo
+        with memo.lock:
+            atual = memo.estado(self._mascara_inicial)
+            caminho = [self._nome(atual)]
+            for posicao, simbolo in enumerate(palavra, 1):
+                j = indice[simbolo]
+                proximo = memo.transicoes[atual * k + j]
+                if proximo < 0:
+                    proximo = memo.proximo(atual, j)
+                atual = proximo
+                if not memo.chaves[atual]:
+                    # Nenhum estado ativo: nada mais pode ser aceito
+                    decidida_em = posicao if posicao < len(palavra) else None
+                    return False, caminho, decidida_em, MOTIVO_SEM_TRANSICAO
+                caminho.append(self._nome(atual))
+            if memo.marcas[atual] == 1:
+                return True, caminho, None, None
+            return False, caminho, None, MOTIVO_ESTADO_NAO_FINAL
+
+    def _nome_inicial(self):
+        with self._memo.lock:
+            return self._nome(self._memo.estado(self._mascara_inicial))
+
+    def run_batch(self, palavras):
+        """
+        Processa várias palavras (sem montar caminhos).
+
+        :return: (tuple) (lista de aceitações, lista com o nome do subconjunto
+                 final de cada palavra; None se ela tiver símbolo fora do alfabeto)
+        """
+        indice = self._indice_simbolos
+        k = len(self._simbolos)
+        aceitas = []
+        finais = []
+        memo = self._memo
+        with memo.lock:
+            for palavra in palavras:
+                atual = memo.estado(self._mascara_inicial)
+                try:
+                    for simbolo in palavra:
+                        proximo = memo.transicoes[atual * k + indice[simbolo]]
+                        if proximo < 0:
+                            proximo = memo.proximo(atual, indice[simbolo])
+                        atual = proximo
+                except KeyError:
+                    aceitas.append(False)
+                    finais.append(None)
+                    continue
+                aceitas.append(memo.marcas[atual] == 1)
+                finais.append(self._nome(atual))
+        return aceitas, finais
+
+    def determinizar(self, limite_estados=None):
+        """
+        Construção completa dos subconjuntos (só os alcançáveis a partir do
+        inicial), para quando o DFA inteiro é necessário (ex: para minimizá-lo).
+        O subconjunto vazio vira o estado de morte implícito do DFA.
+
+        :param limite_estados: (int) Dispara ValueError se o DFA passar disso.
+        :return: (DFA) Estados nomeados pelos subconjuntos, ex: "{q0,q2}".
+        """
+        # Importado aqui para não criar um ciclo (dfa não depende deste módulo)
+        from .dfa import DFA
+
+        nome = self._nome_mascara
+
+        inicial = self._mascara_inicial
+        vistos = {inicial: nome(inicial)}
+        pendentes = [inicial]
+        transicoes = {}
+        while pendentes:
+            mascara = pendentes.pop()
+            caminhos = {}
+            for j, simbolo in enumerate(self._simbolos):
+                destino = self._sucessor(mascara, j)
+                if not destino:
+                    continue
+                if destino not in vistos:
+                    if limite_estados and len(vistos) >= limite_estados:
+                        raise ValueError(f"A determinização passou do limite de {limite_estados} estados.")
+                    vistos[destino] = nome(destino)
+                    pendentes.append(destino)
+                caminhos[simbolo] = vistos[destino]
+            if caminhos:
+                transicoes[vistos[mascara]] = caminhos
+
+        return DFA(
+            estados=set(vistos.values()),
+            alfabeto=self.alfabeto,
+            transicoes=transicoes,
+            estado_inicial=vistos[inicial],
+            estados_finais={n for m, n in vistos.items() if m & self._mascara_finais}
+        )
+
+    def __getstate__(self):
+        # Um lock não pode ser enviado a outro processo (pickle): manda o
+        # NFA sem a tabela memoizada (e o lock dela), que é refeita vazia.
+        estado = self.__dict__.copy()
+        del estado['_memo']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._memo = self._nova_tabela()
+
+    def estatisticas(self):
+        """
+        :return: (dict) Subconjuntos na tabela memoizada, o limite e quantas
+                 vezes ela foi esvaziada por ter enchido.
+        """
+        return self._memo.estatisticas()
+
+    def tamanho_estimado(self):
+        """Estimativa (em bytes) da memória ocupada pelo NFA e pela tabela memoizada."""
+        tamanho = sum(sys.getsizeof(c) for c in (self.estados, self.alfabeto, self.estados_finais, self.transicoes))
+        tamanho += sum(sys.getsizeof(linha) + sum(sys.getsizeof(m) for m in linha) for linha in self._delta)
+        return tamanho + self._memo.tamanho_estimado()
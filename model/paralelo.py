@@ -0,0 +1,229 @@
+"""
+Execução de testes em vários processos (ProcessPoolExecutor).
+
+As funções de worker precisam estar no nível do módulo para que o
+multiprocessing consiga encontrá-las nos processos filhos.
+"""
+import glob
+import os
+from collections import deque
+
+from .dfa import carregar_numpy
+
+# O ProcessPoolExecutor e o zipfile são importados só nas funções que os
+# usam: juntos, custam dezenas de milissegundos na inicialização do
+# executor de linha de comando, que quase sempre roda num processo só.
+
+
+# Tabela compilada do autômato, recebida uma única vez por processo
+_tabela_worker = None
+
+
+def _inicializar_worker(tabela_compilada):
+    """Roda uma vez em cada processo: guarda o autômato compilado."""
+    global _tabela_worker
+    _tabela_worker = tabela_compilada
+
+
+def _executar_bloco(palavras):
+    """Executa um bloco de palavras no autômato deste processo."""
+    return _tabela_worker.executar_lote(palavras)
+
+
+def _mapear_pedaco(pedaco):
+    """Calcula o mapa estado -> estado de um pedaço de uma palavra longa."""
+    return _tabela_worker.mapear_pedaco(pedaco)
+
+
+def _pedacos(fonte, tamanho_pedaco):
+    """Divide uma string ou um arquivo aberto (modo texto) em pedaços."""
+    if hasattr(fonte, 'read'):
+        pedaco = fonte.read(tamanho_pedaco)
+        while pedaco:
+            yield pedaco
+            pedaco = fonte.read(tamanho_pedaco)
+    else:
+        for inicio in range(0, len(fonte), tamanho_pedaco):
+            yield fonte[inicio:inicio + tamanho_pedaco]
+
+
+def executar_palavra_em_paralelo(tabela_compilada, fonte, workers=None, tamanho_pedaco=1 << 20):
+    """
+    Executa UMA palavra muito longa dividindo-a em pedaços processados em
+    paralelo. Como não se sabe em que estado cada pedaço começa, cada
+    processo calcula o mapa "estado inicial -> estado final" do seu pedaço
+    (TabelaCompilada.mapear_pedaco), e os mapas são compostos em ordem.
+
+    Compensa para autômatos com poucos estados: o trabalho de cada pedaço
+    cresce com o número de estados que não convergem logo.
+
+    :param fonte: (str) A palavra, ou um arquivo aberto em modo texto.
+    :param tamanho_pedaco: (int) Caracteres por pedaço.
+    :return: (tuple) (bool de aceitação, índice do estado final; -1 se a
+             palavra tiver símbolo fora do alfabeto)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    estado = tabela_compilada.inicial
+    invalida = False
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_inicializar_worker,
+                             initargs=(tabela_compilada,)) as executor:
+        # Limita os pedaços em voo, para não ler o arquivo inteiro de uma vez
+        em_voo = deque()
+        for pedaco in _pedacos(fonte, tamanho_pedaco):
+            em_voo.append(executor.submit(_mapear_pedaco, pedaco))
+            if len(em_voo) >= 2 * workers:
+                mapa = em_voo.popleft().result()
+                invalida = invalida or mapa is None
+                if not invalida:
+                    estado = mapa[estado]
+        while em_voo:
+            mapa = em_voo.popleft().result()
+            invalida = invalida or mapa is None
+            if not invalida:
+                estado = mapa[estado]
+
+    if invalida:
+        return False, -1
+    return tabela_compilada.finais[estado] == 1, estado
+
+
+def executar_em_paralelo(tabela_compilada, palavras, workers=None, tamanho_bloco=None):
+    """
+    Divide as palavras em blocos e executa cada bloco em um processo.
+    O autômato é enviado a cada processo uma só vez (no initializer),
+    não uma vez por bloco, e os resultados voltam na ordem original.
+
+    :param tabela_compilada: (TabelaCompilada) O autômato a ser executado.
+    :param palavras: (list) As palavras a serem testadas.
+    :param workers: (int) Número de processos (padrão: número de núcleos).
+    :param tamanho_bloco: (int) Palavras por tarefa (padrão: ~4 blocos por processo).
+    :return: (tuple) (aceitações, índices dos estados finais), como em executar_lote.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    if not tamanho_bloco:
+        tamanho_bloco = max(1, -(-len(palavras) // (workers * 4)))
+    blocos = [palavras[i:i + tamanho_bloco] for i in range(0, len(palavras), tamanho_bloco)]
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_inicializar_worker,
+                             initargs=(tabela_compilada,)) as executor:
+        resultados = list(executor.map(_executar_bloco, blocos))
+
+    # Sem NumPy, os resultados são juntados como listas
+    np = carregar_numpy()
+    if np is not None and resultados:
+        aceitas = np.concatenate([r[0] for r in resultados])
+        estados = np.concatenate([r[1] for r in resultados])
+        return aceitas, estados
+
+    aceitas = []
+    estados = []
+    for aceitas_bloco, estados_bloco in resultados:
+        aceitas.extend(aceitas_bloco)
+        estados.extend(estados_bloco)
+    return aceitas, estados
+
+
+def executar_blocos_em_paralelo(tabela_compilada, blocos, workers=None):
+    """
+    Versão "em fluxo" de executar_em_paralelo: os blocos de palavras são
+    consumidos de um iterável (ex: lidos da entrada padrão) e os resultados
+    são produzidos na ordem, conforme ficam prontos. Só alguns blocos ficam
+    em voo ao mesmo tempo, então a memória não cresce com a entrada.
+
+    :param blocos: (iterable) Listas de palavras.
+    :return: (generator) Tuplas (bloco, (aceitações, índices dos estados finais)).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_inicializar_worker,
+                             initargs=(tabela_compilada,)) as executor:
+        em_voo = deque()
+        for bloco in blocos:
+            em_voo.append((bloco, executor.submit(_executar_bloco, bloco)))
+            if len(em_voo) >= 2 * workers:
+                bloco_pronto, futuro = em_voo.popleft()
+                yield bloco_pronto, futuro.result()
+        while em_voo:
+            bloco_pronto, futuro = em_voo.popleft()
+            yield bloco_pronto, futuro.result()
+
+
+def ler_arquivos_definicao(fonte):
+    """
+    Lê os arquivos .txt de definição de uma pasta, de um padrão glob
+    ou de um arquivo .zip.
+
+    :return: (list) Tuplas (rotulo, conteudo); 'conteudo' é None se o
+             arquivo não pôde ser lido como texto UTF-8.
+    """
+    import zipfile
+    arquivos = []
+    if zipfile.is_zipfile(fonte):
+        with zipfile.ZipFile(fonte) as pacote:
+            for nome in sorted(pacote.namelist()):
+                if nome.lower().endswith('.txt'):
+                    arquivos.append((nome, pacote.read(nome)))
+    else:
+        if os.path.isdir(fonte):
+            caminhos = glob.glob(os.path.join(fonte, '**', '*.txt'), recursive=True)
+        else:
+            caminhos = glob.glob(fonte, recursive=True)
+        for caminho in sorted(caminhos):
+            try:
+                with open(caminho, 'rb') as f:
+                    arquivos.append((caminho, f.read()))
+            except OSError:
+                arquivos.append((caminho, None))
+
+    resultado = []
+    for rotulo, dados in arquivos:
+        try:
+            resultado.append((rotulo, dados.decode('utf-8') if dados is not None else None))
+        except UnicodeDecodeError:
+            resultado.append((rotulo, None))
+    return resultado
+
+
+def _validar_arquivo(item):
+    """
+    Worker da importação em lote: analisa e valida um arquivo de definição.
+    :return: (tuple) (rotulo, nome, DFA ou NFA, None) ou (rotulo, None, None, erro)
+    """
+    # Importado aqui porque model.model importa este módulo
+    from .model import AutomatonModel
+
+    rotulo, conteudo, minimizar = item
+    if conteudo is None:
+        return rotulo, None, None, "Não foi possível ler o arquivo como texto UTF-8."
+    try:
+        dados = AutomatonModel._parse_file_content(conteudo)
+        nome = dados.pop("nome").strip()
+        if not nome:
+            raise ValueError("O nome do autômato não pode estar vazio.")
+        return rotulo, nome, AutomatonModel._build_automaton(minimizar=minimizar, **dados), None
+    except ValueError as e:
+        return rotulo, None, None, str(e)
+
+
+def validar_arquivos_em_paralelo(arquivos, workers=None, minimizar=False):
+    """
+    Analisa e valida vários arquivos de definição em processos separados.
+
+    :param arquivos: (list) Tuplas (rotulo, conteudo), como em ler_arquivos_definicao.
+    :return: (list) Tuplas (rotulo, nome, DFA, erro), na ordem de 'arquivos'.
+    """
+    itens = [(rotulo, conteudo, minimizar) for rotulo, conteudo in arquivos]
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(itens) < 2:
+        return [_validar_arquivo(item) for item in itens]
+
+    tamanho_bloco = max(1, len(itens) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_validar_arquivo, itens, chunksize=tamanho_bloco))
@@ -0,0 +1,115 @@
+from .sob_demanda import TabelaSobDemanda
+
+
+class ProdutoDFA:
+    """
+    Executa vários DFAs (suas TabelaCompilada) sobre a mesma palavra numa
+    única passada: o estado da execução é a tupla com o estado de cada DFA
+    (autômato produto), e a palavra é lida uma vez só, qualquer que seja o
+    número de autômatos.
+
+    Como na determinização do NFA, cada tupla só é construída quando uma
+    entrada chega nela e as transições calculadas ficam numa tabela
+    memoizada (veja TabelaSobDemanda): depois de aquecida, cada símbolo
+    custa uma consulta, e não uma por autômato. A tabela é limitada a
+    'limite_estados' tuplas e é esvaziada ao encher.
+
+    Um símbolo fora do alfabeto de um dos DFAs o rejeita (componente -1),
+    sem afetar os outros. A execução termina antes do fim da palavra
+    assim que todos os componentes já decidiram o veredito.
+    """
+
+    LIMITE_ESTADOS = 4096
+
+    def __init__(self, tabelas, limite_estados=None):
+        """
+        :param tabelas: (list) As TabelaCompilada dos DFAs, na ordem dos resultados.
+        :param limite_estados: (int) Máximo de tuplas na tabela memoizada.
+        """
+        self.tabelas = list(tabelas)
+        self.simbolos = sorted(set().union(*(t.simbolos for t in self.tabelas)))
+        self.indice_simbolos = {simbolo: j for j, simbolo in enumerate(self.simbolos)}
+        self.limite_estados = limite_estados or self.LIMITE_ESTADOS
+
+        # _colunas[j]: coluna do símbolo j em cada tabela (-1 se fora do alfabeto dela)
+        self._colunas = [[t.indice_simbolos.get(s, -1) for t in self.tabelas] for s in self.simbolos]
+        self._alfabetos = [set(t.simbolos) for t in self.tabelas]
+        self._inicial = tuple(t.inicial for t in self.tabelas)
+
+        # Marca de cada tupla: True se todos os componentes já decidiram
+        self._memo = TabelaSobDemanda(len(self.simbolos), self.limite_estados, self._sucessor, self._decidido)
+
+    def _decidido(self, tupla):
+        """True se todos os componentes da tupla já decidiram o veredito."""
+        return all(e < 0 or t.decisao[e] for t, e in zip(self.tabelas, tupla))
+
+    def _sucessor(self, tupla, j):
+        """Tupla de destino pelo símbolo j (-1 nos DFAs em que ele não está no alfabeto)."""
+        return tuple(
+            -1 if e < 0 or c < 0 else t.tabela[e * t.num_simbolos + c]
+            for t, e, c in zip(self.tabelas, tupla, self._colunas[j])
+        )
+
+    def _veredito(self, tupla, resto):
+        """
+        Aceitação de cada componente. Se a execução parou antes do fim, um
+        componente que só aceita ainda rejeita se 'resto' tiver símbolo
+        fora do alfabeto dele (como em DFA.run).
+        """
+        resto = set(resto)
+        return [
+            e >= 0 and t.finais[e] == 1 and resto <= alfabeto
+            for t, e, alfabeto in zip(self.tabelas, tupla, self._alfabetos)
+        ]
+
+    def _executar(self, palavra):
+        """Corpo de executar, já com o lock da tabela."""
+        indice = self.indice_simbolos
+        k = len(self.simbolos)
+        memo = self._memo
+        atual = memo.estado(self._inicial)
+        for posicao, simbolo in enumerate(palavra):
+            if memo.marcas[atual]:
+                return self._veredito(memo.chaves[atual], palavra[posicao:])
+            j = indice.get(simbolo)
+            if j is None:
+                # Fora do alfabeto de todos: todos rejeitam
+                return [False] * len(self.tabelas)
+            proximo = memo.transicoes[atual * k + j]
+            if proximo < 0:
+                proximo = memo.proximo(atual, j)
+            atual = proximo
+        return self._veredito(memo.chaves[atual], ())
+
+    def executar(self, palavra):
+        """
+        Lê a palavra uma vez, avançando todos os DFAs juntos.
+
+        :return: (list) Aceitação (bool) de cada DFA, na ordem de 'tabelas'.
+        """
+        with self._memo.lock:
+            return self._executar(palavra)
+
+    def executar_lote(self, palavras):
+        """
+        Como executar, para várias palavras (a tabela memoizada é a mesma).
+
+        :return: (list) Uma lista de aceitações por palavra.
+        """
+        with self._memo.lock:
+            return [self._executar(palavra) for palavra in palavras]
+
+    def tamanho_estimado(self):
+        """
+        Estimativa (em bytes) da memória ocupada pela tabela memoizada e
+        pelas tabelas dos DFAs (que o produto mantém em memória enquanto
+        existir), para o limite do cache do Model.
+        """
+        return self._memo.tamanho_estimado() + sum(t.tamanho_estimado() for t in self.tabelas)
+
+    def estatisticas(self):
+        """
+        :return: (dict) Tuplas na tabela memoizada, o limite e quantas
+                 vezes ela foi esvaziada por ter enchido.
+        """
+        return self._memo.estatisticas()
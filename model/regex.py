@@ -0,0 +1,285 @@
+"""
+Front end de expressões regulares: compila uma regex no DFA mínimo
+equivalente (Thompson -> NFA -> subconjuntos -> minimização).
+
+Sintaxe (cada símbolo do alfabeto é um caractere):
+    ab      concatenação            a|b     união
+    a*      zero ou mais            a+      uma ou mais
+    a?      opcional                (...)   agrupamento
+    .       qualquer símbolo        [abc]   um dos símbolos
+    [a-z]   faixa                   [^ab]   qualquer símbolo, menos estes
+    ε       palavra vazia           \\x      o caractere x, literal
+Espaços são ignorados.
+"""
+import hashlib
+
+from .dfa import DFA
+from .nfa import EPSILON, NFA
+
+# Muda sempre que a compilação mudar de forma que altere o DFA gerado:
+# as tabelas salvas com outra versão são recompiladas ao serem carregadas.
+VERSAO_COMPILADOR = 1
+
+# Limite de estados do DFA intermediário (antes da minimização)
+LIMITE_ESTADOS = 100000
+
+_ESPECIAIS = set("|*+?()[].\\")
+
+
+def hash_regex(regex, alfabeto):
+    """
+    Hash (sha256) que identifica uma compilação: a regex, o alfabeto e a
+    versão do compilador. Duas regex com o mesmo hash geram o mesmo DFA.
+    """
+    fonte = f"{VERSAO_COMPILADOR}\n{','.join(sorted(alfabeto))}\n{regex}"
+    return hashlib.sha256(fonte.encode('utf-8')).hexdigest()
+
+
+class _Parser:
+    """
+    Analisador descendente recursivo que já monta o NFA de Thompson:
+    cada sub-expressão devolve um fragmento (inicio, fim) de estados.
+    """
+
+    def __init__(self, regex, alfabeto):
+        self.texto = [c for c in regex if not c.isspace()]
+        self.posicao = 0
+        self.alfabeto = alfabeto
+        self.transicoes = {}
+        self.num_estados = 0
+
+    # --- Montagem do NFA ---
+
+    def _novo_estado(self):
+        estado = f"r{self.num_estados}"
+        self.num_estados += 1
+        return estado
+
+    def _ligar(self, origem, simbolo, destino):
+        self.transicoes.setdefault(origem, {}).setdefault(simbolo, set()).add(destino)
+
+    def _simbolos(self, simbolos):
+        inicio, fim = self._novo_estado(), self._novo_estado()
+        for simbolo in simbolos:
+            self._ligar(inicio, simbolo, fim)
+        return inicio, fim
+
+    # --- Gramática ---
+
+    def _erro(self, mensagem):
+        raise ValueError(f"Expressão regular inválida (posição {self.posicao + 1}): {mensagem}")
+
+    def _atual(self):
+        return self.texto[self.posicao] if self.posicao < len(self.texto) else None
+
+    def analisar(self):
+        """:return: (tuple) (estado inicial, estado final) do NFA da regex inteira."""
+        fragmento = self._uniao()
+        if self._atual() is not None:
+            self._erro(f"'{self._atual()}' inesperado.")
+        return fragmento
+
+    def _uniao(self):
+        opcoes = [self._concatenacao()]
+        while self._atual() == '|':
+            self.posicao += 1
+            opcoes.append(self._concatenacao())
+        if len(opcoes) == 1:
+            return opcoes[0]
+        inicio, fim = self._novo_estado(), self._novo_estado()
+        for entrada, saida in opcoes:
+            self._ligar(inicio, EPSILON, entrada)
+            self._ligar(saida, EPSILON, fim)
+        return inicio, fim
+
+    def _concatenacao(self):
+        partes = []
+        while self._atual() is not None and self._atual() not in '|)':
+            partes.append(self._repeticao())
+        if not partes:
+            return self._simbolos([EPSILON])
+        inicio, fim = partes[0]
+        for entrada, saida in partes[1:]:
+            self._ligar(fim, EPSILON, entrada)
+            fim = saida
+        return inicio, fim
+
+    def _repeticao(self):
+        entrada, saida = self._atomo()
+        while self._atual() in ('*', '+', '?'):
+            operador = self._atual()
+            self.posicao += 1
+            inicio, fim = self._novo_estado(), self._novo_estado()
+            self._ligar(inicio, EPSILON, entrada)
+            self._ligar(saida, EPSILON, fim)
+            if operador in '*?':
+                self._ligar(inicio, EPSILON, fim) # Zero ocorrências
+            if operador in '*+':
+                self._ligar(saida, EPSILON, entrada) # Repete
+            entrada, saida = inicio, fim
+        return entrada, saida
+
+    def _atomo(self):
+        c = self._atual()
+        if c in ('*', '+', '?'):
+            self._erro(f"'{c}' sem nada antes para repetir.")
+        self.posicao += 1
+        if c == '(':
+            fragmento = self._uniao()
+            if self._atual() != ')':
+                self._erro("falta fechar o parêntese.")
+            self.posicao += 1
+            return fragmento
+        if c == '[':
+            return self._simbolos(self._classe())
+        if c == '.':
+            return self._simbolos(sorted(self.alfabeto))
+        if c == EPSILON:
+            return self._simbolos([EPSILON])
+        if c == '\\':
+            c = self._atual()
+            if c is None:
+                self._erro("'\\' no fim da expressão.")
+            self.posicao += 1
+        elif c in _ESPECIAIS:
+            self._erro(f"'{c}' inesperado.")
+        return self._simbolos([self._simbolo(c)])
+
+    def _classe(self):
+        """Lê o conteúdo de [...] (a posição já passou do '[')."""
+        negada = self._atual() == '^'
+        if negada:
+            self.posicao += 1
+        simbolos = set()
+        while self._atual() != ']':
+            c = self._atual()
+            if c is None:
+                self._erro("falta fechar o colchete.")
+            self.posicao += 1
+            if c == '\\':
+                c = self._atual()
+                if c is None:
+                    self._erro("'\\' no fim da expressão.")
+                self.posicao += 1
+            if self._atual() == '-' and self.posicao + 1 < len(self.texto) and self.texto[self.posicao + 1] != ']':
+                fim = self.texto[self.posicao + 1]
+                self.posicao += 2
+                if fim < c:
+                    self._erro(f"faixa '{c}-{fim}' invertida.")
+                simbolos.update(s for s in self.alfabeto if c <= s <= fim)
+            else:
+                simbolos.add(self._simbolo(c))
+        self.posicao += 1
+        if negada:
+            return sorted(self.alfabeto - simbolos)
+        return sorted(simbolos)
+
+    def _simbolo(self, c):
+        if c not in self.alfabeto:
+            self._erro(f"o símbolo '{c}' não pertence ao alfabeto.")
+        return c
+
+
+def simbolos_da_regex(regex):
+    """
+    Os caracteres usados como símbolos na regex (para deduzir o alfabeto).
+    '^' e '-' só são operadores dentro de [...] (negação logo no início,
+    faixa entre dois símbolos); no resto da regex são símbolos comuns.
+    """
+    texto = [c for c in regex if not c.isspace()]
+    simbolos = set()
+    posicao = 0
+    while posicao < len(texto):
+        c = texto[posicao]
+        posicao += 1
+        if c == '\\':
+            if posicao < len(texto):
+                simbolos.add(texto[posicao])
+                posicao += 1
+        elif c == '[':
+            posicao = _simbolos_da_classe(texto, posicao, simbolos)
+        elif c not in _ESPECIAIS and c != EPSILON:
+            simbolos.add(c)
+    return simbolos
+
+
+def _simbolos_da_classe(texto, posicao, simbolos):
+    """
+    Junta em 'simbolos' os símbolos de [...] lendo como _Parser._classe
+    (a posição já passou do '['); as faixas contribuem com as pontas.
+    :return: (int) A posição depois do ']'.
+    """
+    if posicao < len(texto) and texto[posicao] == '^':
+        posicao += 1
+    while posicao < len(texto) and texto[posicao] != ']':
+        c = texto[posicao]
+        posicao += 1
+        if c == '\\' and posicao < len(texto):
+            c = texto[posicao]
+            posicao += 1
+        if posicao + 1 < len(texto) and texto[posicao] == '-' and texto[posicao + 1] != ']':
+            if texto[posicao + 1] != EPSILON:
+                simbolos.add(texto[posicao + 1])
+            posicao += 2
+        if c != EPSILON:
+            simbolos.add(c)
+    return posicao + 1
+
+
+def regex_para_nfa(regex, alfabeto):
+    """Monta o ε-NFA de Thompson da regex."""
+    parser = _Parser(regex, set(alfabeto))
+    inicio, fim = parser.analisar()
+    return NFA(
+        estados={f"r{i}" for i in range(parser.num_estados)},
+        alfabeto=alfabeto,
+        transicoes=parser.transicoes,
+        estado_inicial=inicio,
+        estados_finais={fim}
+    )
+
+
+def _renomear(dfa):
+    """Renomeia os estados para q0, q1, ... em ordem de busca em largura."""
+    nomes = {dfa.estado_inicial: "q0"}
+    fila = [dfa.estado_inicial]
+    for estado in fila:
+        for simbolo in sorted(dfa.transicoes.get(estado, {})):
+            destino = dfa.transicoes[estado][simbolo]
+            if destino not in nomes:
+                nomes[destino] = f"q{len(nomes)}"
+                fila.append(destino)
+    return DFA(
+        estados=set(nomes.values()),
+        alfabeto=dfa.alfabeto,
+        transicoes={
+            nomes[origem]: {simbolo: nomes[destino] for simbolo, destino in caminhos.items()}
+            for origem, caminhos in dfa.transicoes.items()
+        },
+        estado_inicial="q0",
+        estados_finais={nomes[estado] for estado in dfa.estados_finais}
+    )
+
+
+def compilar_regex(regex, alfabeto=None):
+    """
+    Compila a regex no DFA mínimo equivalente, com estados q0, q1, ...
+    Dispara ValueError se a regex for inválida.
+
+    :param alfabeto: (set) Alfabeto do DFA. Se vazio, é deduzido dos
+                     símbolos que aparecem na regex.
+    :return: (DFA) Com os atributos 'regex' (a fonte) e 'regex_hash'.
+    """
+    alfabeto = set(alfabeto or ()) or simbolos_da_regex(regex)
+    if not alfabeto:
+        raise ValueError("Não foi possível deduzir o alfabeto da expressão regular: informe-o.")
+    if ',' in alfabeto:
+        raise ValueError("',' separa os símbolos do alfabeto e não pode ser um deles.")
+    if EPSILON in alfabeto:
+        raise ValueError(f"'{EPSILON}' é reservado para a palavra vazia e não pode estar no alfabeto.")
+
+    dfa = regex_para_nfa(regex, alfabeto).determinizar(LIMITE_ESTADOS)
+    dfa = _renomear(dfa.minimizar())
+    dfa.regex = regex
+    dfa.regex_hash = hash_regex(regex, alfabeto)
+    return dfa
@@ -0,0 +1,96 @@
+"""
+Tabela de transições memoizada e limitada, para autômatos construídos
+sob demanda (determinização do NFA, produto de DFAs).
+"""
+import sys
+import threading
+
+
+class TabelaSobDemanda:
+    """
+    Guarda os estados de um DFA que só é construído quando uma entrada
+    chega neles. Cada estado é identificado por uma chave (ex: a máscara
+    de um subconjunto do NFA, ou a tupla de estados de um produto) e
+    numerado na ordem em que foi criado; a transição (número, símbolo j)
+    fica na posição número * num_simbolos + j de 'transicoes' (-1 = ainda
+    não calculada).
+
+    A tabela é limitada a 'limite' estados: ao enchê-la, ela é esvaziada e
+    volta a ser preenchida a partir do ponto atual da execução.
+
+    Quem a usa segura 'lock' durante a execução (a tabela é alterada ao
+    longo dela).
+    """
+
+    def __init__(self, num_simbolos, limite, sucessor, marcar):
+        """
+        :param num_simbolos: (int) Número de símbolos (colunas da tabela).
+        :param limite: (int) Máximo de estados na tabela.
+        :param sucessor: Função (chave, j) -> chave do destino pelo símbolo j.
+        :param marcar: Função chave -> valor guardado em 'marcas' para o
+                       estado (ex: se ele é final), consultado a cada passo.
+        """
+        self.num_simbolos = num_simbolos
+        self.limite = limite
+        self._sucessor = sucessor
+        self._marcar = marcar
+        self.lock = threading.Lock()
+        self.reinicios = 0 # Quantas vezes a tabela encheu e foi esvaziada
+        self.limpar()
+
+    def limpar(self):
+        """Esvazia a tabela."""
+        self.ids = {}          # chave -> número do estado na tabela
+        self.chaves = []       # número do estado -> chave
+        self.transicoes = []   # posição número * num_simbolos + j -> número do destino (-1 = não calculada)
+        self.marcas = []       # número do estado -> marcar(chave)
+        self.rotulos = []      # número do estado -> rótulo (veja rotulo)
+
+    def estado(self, chave):
+        """Retorna o número do estado na tabela, criando-o se preciso."""
+        numero = self.ids.get(chave)
+        if numero is None:
+            if len(self.chaves) >= self.limite:
+                self.reinicios += 1
+                self.limpar()
+            numero = len(self.chaves)
+            self.ids[chave] = numero
+            self.chaves.append(chave)
+            self.transicoes.extend([-1] * self.num_simbolos)
+            self.marcas.append(self._marcar(chave))
+            self.rotulos.append(None)
+        return numero
+
+    def proximo(self, numero, j):
+        """Calcula (e memoriza) a transição do estado 'numero' pelo símbolo j."""
+        destino = self._sucessor(self.chaves[numero], j)
+        reinicios = self.reinicios
+        proximo = self.estado(destino)
+        # Se a tabela foi esvaziada, 'numero' não existe mais nela
+        if self.reinicios == reinicios:
+            self.transicoes[numero * self.num_simbolos + j] = proximo
+        return proximo
+
+    def rotulo(self, numero, montar):
+        """Rótulo do estado (ex: seu nome), montado por montar(chave) uma vez por estado."""
+        rotulo = self.rotulos[numero]
+        if rotulo is None:
+            rotulo = montar(self.chaves[numero])
+            self.rotulos[numero] = rotulo
+        return rotulo
+
+    def estatisticas(self):
+        """
+        :return: (dict) Estados na tabela, o limite e quantas vezes ela foi
+                 esvaziada por ter enchido.
+        """
+        return {
+            "estados_construidos": len(self.chaves),
+            "limite_estados": self.limite,
+            "reinicios": self.reinicios,
+        }
+
+    def tamanho_estimado(self):
+        """Estimativa (em bytes) da memória ocupada pela tabela e pelas chaves."""
+        tamanho = sum(sys.getsizeof(c) for c in (self.ids, self.chaves, self.transicoes, self.marcas, self.rotulos))
+        return tamanho + sum(sys.getsizeof(chave) for chave in self.chaves)
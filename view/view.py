@@ -2,6 +2,9 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import messagebox
 from tkinter import filedialog
+from model.metricas import instrumentado
+from model.dfa import (MOTIVO_ESTADO_NAO_FINAL, MOTIVO_FINAL_INALCANCAVEL, MOTIVO_SEM_TRANSICAO,
+                       MOTIVO_SIMBOLO_INVALIDO)
 # Não precisamos mais importar 'tk' ou 'ttk'
 
 class AutomatonView:
@@ -9,9 +12,24 @@ class AutomatonView:
     Esta é a classe "View" (a Interface Gráfica), agora usando ttkbootstrap.
     """
     
-    def __init__(self, root: tb.Window):
+    # Tabela virtual do histórico: só algumas páginas ficam na Treeview
+    HISTORY_PAGE_SIZE = 200   # Linhas buscadas por página
+    HISTORY_MAX_PAGES = 3     # Páginas mantidas na tabela ao mesmo tempo
+    
+    # Texto exibido para cada motivo de rejeição (veja DFA.run_detalhado)
+    REJECTION_REASONS = {
+        MOTIVO_SIMBOLO_INVALIDO: "símbolo fora do alfabeto",
+        MOTIVO_SEM_TRANSICAO: "transição não definida",
+        MOTIVO_FINAL_INALCANCAVEL: "nenhum estado final alcançável",
+        MOTIVO_ESTADO_NAO_FINAL: "terminou em estado não final",
+    }
+    
+    def __init__(self, root: tb.Window, diagnostics=False):
         """
         Inicializa a interface principal.
+        
+        :param diagnostics: (bool) Se True, mostra a aba "Diagnóstico",
+                            com as métricas de tempo por etapa.
         """
         self.root = root
         self.root.title("Simulador de Autômatos")
@@ -53,12 +71,33 @@ class AutomatonView:
         self.notebook.add(self.tab_create, text="Criar Autômato")
         self.notebook.add(self.tab_history, text="Histórico")
         
+        # Aba opcional de diagnóstico
+        self.tab_diagnostics = None
+        if diagnostics:
+            self.tab_diagnostics = tb.Frame(self.notebook, padding=10)
+            self.notebook.add(self.tab_diagnostics, text="Diagnóstico")
+        
         self.notebook.pack(expand=True, fill='both')
         
+        # --- Barra de status (progresso das tarefas em segundo plano) ---
+        status_frame = tb.Frame(self.root, padding=(10, 5))
+        status_frame.pack(fill=X, side=BOTTOM)
+        
+        self.lbl_status = tb.Label(status_frame, text="", bootstyle="secondary")
+        self.lbl_status.pack(side=LEFT)
+        
+        self.btn_cancel = tb.Button(status_frame, text="Cancelar", bootstyle="danger-outline", state="disabled")
+        self.btn_cancel.pack(side=RIGHT)
+        
+        self.progress = tb.Progressbar(status_frame, bootstyle="info-striped", length=200)
+        self.progress.pack(side=RIGHT, padx=10)
+        
         # --- "Desenha" o conteúdo de cada aba ---
         self._create_test_tab()
         self._create_create_tab()
         self._create_history_tab()
+        if self.tab_diagnostics is not None:
+            self._create_diagnostics_tab()
 
     def toggle_theme(self):
         """Troca o tema entre claro e escuro."""
@@ -77,11 +116,18 @@ class AutomatonView:
         """Vincula os comandos dos botões ao Controller."""
         self.controller = controller
         self.btn_run_test.config(command=self.controller.on_run_test_click)
+        self.btn_classify.config(command=self.controller.on_classify_click)
         self.btn_save_automaton.config(command=self.controller.on_save_automaton_click)
         self.btn_refresh_history.config(command=self.controller.on_refresh_history_click)
         # --- NOVA LINHA ---
         self.btn_clear_history.config(command=self.controller.on_clear_history_click)
         self.btn_load_file.config(command=self.controller.on_load_file_click)
+        self.btn_bulk_import.config(command=self.controller.on_bulk_import_click)
+        self.btn_cancel.config(command=self.controller.on_cancel_click)
+        if self.tab_diagnostics is not None:
+            self.check_metrics.config(command=self.controller.on_toggle_metrics)
+            self.btn_refresh_metrics.config(command=self.controller.on_refresh_metrics_click)
+            self.btn_reset_metrics.config(command=self.controller.on_reset_metrics_click)
 
     # (Dentro da classe AutomatonView, na seção de 'GETTERS')
 
@@ -94,6 +140,11 @@ class AutomatonView:
         # Retorna o caminho do arquivo (ex: "C:/.../meu_automato.txt") ou "" se o usuário cancelar
         return filepath
 
+    def get_directory_to_import(self):
+        """Abre a caixa de diálogo para selecionar uma pasta de arquivos .txt."""
+        # Retorna o caminho da pasta ou "" se o usuário cancelar
+        return filedialog.askdirectory(title="Selecionar pasta com definições de autômatos (.txt)")
+
     # --- Métodos Privados para criar cada aba ---
 
     def _create_test_tab(self):
@@ -110,8 +161,15 @@ class AutomatonView:
         self.entry_word = tb.Entry(frame, bootstyle="info")
         self.entry_word.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
         
-        self.btn_run_test = tb.Button(frame, text="Testar Palavra", bootstyle="info-outline")
-        self.btn_run_test.grid(row=2, column=0, columnspan=2, padx=5, pady=10)
+        test_buttons = tb.Frame(frame)
+        test_buttons.grid(row=2, column=0, columnspan=2, padx=5, pady=10)
+        
+        self.btn_run_test = tb.Button(test_buttons, text="Testar Palavra", bootstyle="info-outline")
+        self.btn_run_test.grid(row=0, column=0, padx=(0, 5))
+        
+        # Testa a palavra em todos os autômatos salvos, numa única passada
+        self.btn_classify = tb.Button(test_buttons, text="Testar em Todos", bootstyle="secondary-outline")
+        self.btn_classify.grid(row=0, column=1, padx=(5, 0))
         
         # --- Quadro de Resultado ---
         # --- CORREÇÃO DO LABELFRAME ---
@@ -158,7 +216,8 @@ class AutomatonView:
         # --- O TEXTO DE AJUDA ---
         help_text = (
             "Digite uma transição por linha no formato: estado, simbolo -> destino\n"
-            "Exemplo: q0, 0 -> q1"
+            "Exemplo: q0, 0 -> q1   (NFA: repita o símbolo para vários destinos; ε = transição vazia)\n"
+            "Expressão regular: digite só a regex, ex: (0|1)*01  (estados não são usados; alfabeto opcional)"
         )
         tb.Label(frame, text=help_text, bootstyle="secondary", justify="left").grid(row=6, column=1, padx=5, pady=(0, 5), sticky='w')
 
@@ -177,6 +236,18 @@ class AutomatonView:
         # Configura o frame para que os botões se expandam
         button_frame.columnconfigure(0, weight=1) 
         button_frame.columnconfigure(1, weight=1)
+        button_frame.columnconfigure(2, weight=1)
+
+        # Tipo do autômato (rótulo mostrado -> tipo salvo no banco)
+        self._tipos_automato = {
+            "DFA": "dfa",
+            "NFA (com ε)": "nfa",
+            "Expressão regular": "regex",
+        }
+        self.combo_type = tb.Combobox(frame, state="readonly", bootstyle="info",
+                                      values=list(self._tipos_automato), width=18)
+        self.combo_type.set("DFA")
+        self.combo_type.grid(row=5, column=1, padx=5, pady=5, sticky='e')
 
         # Agora o btn_save_automaton usa o button_frame
         self.btn_save_automaton = tb.Button(button_frame, text="Salvar Autômato", bootstyle="success")
@@ -184,7 +255,19 @@ class AutomatonView:
 
         # E o btn_load_file também usa o button_frame
         self.btn_load_file = tb.Button(button_frame, text="Carregar de Arquivo (.txt)", bootstyle="secondary-outline")
-        self.btn_load_file.grid(row=0, column=1, padx=(5, 0), sticky='ew')
+        self.btn_load_file.grid(row=0, column=1, padx=5, sticky='ew')
+        
+        # Importação em lote (todos os .txt de uma pasta)
+        self.btn_bulk_import = tb.Button(button_frame, text="Importar Pasta", bootstyle="secondary-outline")
+        self.btn_bulk_import.grid(row=0, column=2, padx=(5, 0), sticky='ew')
+        
+        # Ao salvar, compara a linguagem com a dos autômatos já salvos
+        self.duplicates_var = tb.StringVar(value="0")
+        self.check_duplicates = tb.Checkbutton(
+            button_frame, text="Avisar se a linguagem já existir na biblioteca",
+            bootstyle="info,round-toggle", variable=self.duplicates_var, onvalue="1", offvalue="0"
+        )
+        self.check_duplicates.grid(row=1, column=0, columnspan=3, pady=(10, 0), sticky='w')
 
     # (Dentro da classe AutomatonView)
 
@@ -208,19 +291,61 @@ class AutomatonView:
         self.btn_clear_history.pack(side=LEFT)
         
         # --- Tabela (Treeview) (na linha 1) ---
-        cols = ("Data/Hora", "Autômato", "Palavra", "Resultado")
+        cols = ("Data/Hora", "Autômato", "Palavra", "Resultado", "Decisão")
         self.tree_history = tb.Treeview(frame, columns=cols, show="headings", height=15, bootstyle="info")
         
         for col in cols:
             self.tree_history.heading(col, text=col)
             self.tree_history.column(col, width=150, anchor='center')
         
-        scrollbar = tb.Scrollbar(frame, orient="vertical", command=self.tree_history.yview)
-        self.tree_history.configure(yscrollcommand=scrollbar.set)
+        self.history_scrollbar = tb.Scrollbar(frame, orient="vertical", command=self.tree_history.yview)
+        self.tree_history.configure(yscrollcommand=self._on_history_scroll)
+        scrollbar = self.history_scrollbar
+        
+        # Estado da tabela virtual (veja reset_history_table)
+        self._history_cursors = [None]
+        self._history_window = []
+        self._history_end = True
+        self._history_loading = False
         
         self.tree_history.grid(row=1, column=0, padx=5, pady=5, sticky='nsew') # Na linha 1
         scrollbar.grid(row=1, column=1, padx=5, pady=5, sticky='ns') # Na linha 1
 
+    def _create_diagnostics_tab(self):
+        """Cria os widgets para a aba "Diagnóstico"."""
+        frame = self.tab_diagnostics
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        button_frame = tb.Frame(frame)
+        button_frame.grid(row=0, column=0, columnspan=2, padx=5, pady=10, sticky='w')
+
+        self.metrics_var = tb.StringVar(value="0")
+        self.check_metrics = tb.Checkbutton(
+            button_frame, text="Coletar métricas", bootstyle="info,round-toggle",
+            variable=self.metrics_var, onvalue="1", offvalue="0"
+        )
+        self.check_metrics.pack(side=LEFT, padx=(0, 10))
+
+        self.btn_refresh_metrics = tb.Button(button_frame, text="Atualizar", bootstyle="info-outline")
+        self.btn_refresh_metrics.pack(side=LEFT, padx=(0, 10))
+
+        self.btn_reset_metrics = tb.Button(button_frame, text="Zerar", bootstyle="danger-outline")
+        self.btn_reset_metrics.pack(side=LEFT)
+
+        # Tempos em milissegundos; os percentis são aproximados (histograma)
+        cols = ("Etapa", "Chamadas", "Total (ms)", "Média (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Máx (ms)")
+        self.tree_metrics = tb.Treeview(frame, columns=cols, show="headings", height=15, bootstyle="info")
+        for col in cols:
+            self.tree_metrics.heading(col, text=col)
+            self.tree_metrics.column(col, width=80, anchor='e')
+        self.tree_metrics.column("Etapa", width=200, anchor='w')
+
+        scrollbar = tb.Scrollbar(frame, orient="vertical", command=self.tree_metrics.yview)
+        self.tree_metrics.configure(yscrollcommand=scrollbar.set)
+        self.tree_metrics.grid(row=1, column=0, padx=5, pady=5, sticky='nsew')
+        scrollbar.grid(row=1, column=1, padx=5, pady=5, sticky='ns')
+
     # --- Métodos Públicos (GETTERS) ---
     
     def get_test_data(self):
@@ -235,9 +360,15 @@ class AutomatonView:
             "estados_str": self.entry_new_states.get(),
             "inicial_str": self.entry_new_initial.get(),
             "finais_str": self.entry_new_final.get(),
-            "transicoes_str": self.text_new_transitions.get("1.0", "end-1c")
+            "transicoes_str": self.text_new_transitions.get("1.0", "end-1c"),
+            "tipo": self._tipos_automato.get(self.combo_type.get(), "dfa"),
+            "verificar_duplicatas": self.duplicates_var.get() == "1"
         }
         
+    def is_metrics_collection_checked(self):
+        """Retorna True se a opção "Coletar métricas" está marcada."""
+        return self.metrics_var.get() == "1"
+
     # --- Métodos Públicos (SETTERS/UPDATERS) ---
 
     def populate_automata_list(self, names_list):
@@ -248,9 +379,32 @@ class AutomatonView:
         else:
             self.combo_automata.set("") 
 
-    def show_test_result(self, is_accepted, path_list):
-        """Exibe o resultado 'Aceita' ou 'Rejeitada'."""
+    def _decision_text(self, decided_at, reason, word_length=None):
+        """Descreve a posição da decisão antecipada e o motivo da rejeição (ou "")."""
+        partes = []
+        if decided_at is not None:
+            de = f" de {word_length}" if word_length is not None else ""
+            partes.append(f"decidido na posição {decided_at}{de}")
+        if reason is not None:
+            partes.append(self.REJECTION_REASONS.get(reason, reason))
+        return "; ".join(partes)
+
+    def _history_values(self, row):
+        """Valores das colunas da tabela de histórico para uma linha do banco."""
+        decided_at, reason = row[5:7] if len(row) >= 7 else (None, None)
+        return tuple(row[:4]) + (self._decision_text(decided_at, reason),)
+
+    def show_test_result(self, is_accepted, path_list, decided_at=None, word_length=None, reason=None):
+        """
+        Exibe o resultado 'Aceita' ou 'Rejeitada'.
+        Se 'decided_at' for informado, mostra também em que posição da
+        palavra o veredito foi decidido (execução antecipada); se 'reason'
+        for informado, o motivo da rejeição (veja DFA.run_detalhado).
+        """
         path_str = " -> ".join(path_list)
+        decisao = self._decision_text(decided_at, reason, word_length)
+        if decisao:
+            path_str += f"  ({decisao})"
         self.lbl_path.config(text=f"Caminho: {path_str}")
         
         if is_accepted:
@@ -258,13 +412,153 @@ class AutomatonView:
         else:
             self.lbl_result.config(text="REJEITADA", bootstyle="danger")
             
-    def populate_history_table(self, history_data_rows):
-        """Limpa e preenche a tabela de histórico."""
-        for row in self.tree_history.get_children():
-            self.tree_history.delete(row)
-        for row_data in history_data_rows:
-            self.tree_history.insert("", END, values=row_data)
+    def show_classification_result(self, accepted_names, total):
+        """
+        Exibe o resultado de "Testar em Todos": quantos e quais dos 'total'
+        autômatos aceitaram a palavra.
+        """
+        self.lbl_result.config(
+            text=f"ACEITA POR {len(accepted_names)} DE {total}",
+            bootstyle="success" if accepted_names else "danger"
+        )
+        self.lbl_path.config(text=f"Aceita por: {', '.join(accepted_names) or 'nenhum'}")
+
+    # --- Tabela virtual do Histórico ---
+    # Em vez de inserir todo o histórico na Treeview, a tabela mantém só
+    # uma "janela" de até HISTORY_MAX_PAGES páginas e busca as vizinhas
+    # (pelo controller) quando a rolagem chega perto de uma das pontas.
+
+    @instrumentado("view.history_fill")
+    def reset_history_table(self):
+        """Limpa a tabela de histórico e carrega só a primeira página."""
+        self.tree_history.delete(*self.tree_history.get_children())
+        self._history_cursors = [None] # Cursor ('after') de cada página já vista
+        self._history_window = []      # Páginas exibidas: [(número, [iids])]
+        self._history_end = False      # True quando a última página já foi vista
+        self._load_history_page(0, at_bottom=True)
+
+    @instrumentado("view.history_scroll")
+    def _on_history_scroll(self, first, last):
+        """Repassa a rolagem à barra e busca páginas perto das pontas."""
+        self.history_scrollbar.set(first, last)
+        if self._history_loading or not self._history_window:
+            return
+        if float(last) > 0.95 and not self._history_end:
+            numero = self._history_window[-1][0] + 1
+            self.root.after_idle(self._load_history_page, numero, True)
+        elif float(first) < 0.05 and self._history_window[0][0] > 0:
+            numero = self._history_window[0][0] - 1
+            self.root.after_idle(self._load_history_page, numero, False)
+
+    @instrumentado("view.history_page")
+    def _load_history_page(self, numero, at_bottom):
+        """Busca a página 'numero' e a coloca no fim (ou no início) da janela."""
+        if self._history_loading or numero >= len(self._history_cursors):
+            return
+        if any(pagina == numero for pagina, _ in self._history_window):
+            return
+        self._history_loading = True
+        try:
+            rows = self.controller.fetch_history_page(self._history_cursors[numero], self.HISTORY_PAGE_SIZE)
+            topo = self.tree_history.identify_row(0) # Linha visível no topo, para manter a posição
+            
+            if at_bottom:
+                if len(rows) < self.HISTORY_PAGE_SIZE:
+                    self._history_end = True
+                if not rows and self._history_window:
+                    return
+                if rows and numero + 1 == len(self._history_cursors):
+                    ultima = rows[-1]
+                    self._history_cursors.append((ultima[0], ultima[4]))
+                iids = [self.tree_history.insert("", END, iid=row[4], values=self._history_values(row))
+                        for row in rows if not self.tree_history.exists(row[4])]
+                self._history_window.append((numero, iids))
+                if len(self._history_window) > self.HISTORY_MAX_PAGES:
+                    _, removidos = self._history_window.pop(0)
+                    self.tree_history.delete(*removidos)
+            else:
+                novas = [row for row in rows if not self.tree_history.exists(row[4])]
+                iids = [self.tree_history.insert("", i, iid=row[4], values=self._history_values(row)) for i, row in enumerate(novas)]
+                self._history_window.insert(0, (numero, iids))
+                if len(self._history_window) > self.HISTORY_MAX_PAGES:
+                    _, removidos = self._history_window.pop()
+                    self.tree_history.delete(*removidos)
+                    self._history_end = False
             
+            if topo and self.tree_history.exists(topo):
+                total = len(self.tree_history.get_children())
+                self.tree_history.yview_moveto(self.tree_history.index(topo) / max(total, 1))
+        finally:
+            self._history_loading = False
+
+    @instrumentado("view.prepend_history_rows")
+    def prepend_history_rows(self, rows):
+        """
+        Coloca linhas novas (mais recentes primeiro) no topo da tabela,
+        sem recarregá-la. Se a primeira página não estiver na janela,
+        elas aparecem quando a rolagem voltar ao topo.
+        
+        As linhas novas deslocam as fronteiras das páginas, então a janela
+        é redividida em páginas de HISTORY_PAGE_SIZE linhas a partir do topo
+        (o que passar de HISTORY_MAX_PAGES páginas sai da tabela) e os
+        cursores são refeitos a partir dela. Os das páginas depois da
+        janela são descartados e voltam a ser descobertos pela rolagem.
+        """
+        if not self._history_window or self._history_window[0][0] != 0:
+            return
+        novas = [row for row in rows if not self.tree_history.exists(row[4])]
+        if not novas:
+            return
+        linhas = [self.tree_history.insert("", i, iid=row[4], values=self._history_values(row)) for i, row in enumerate(novas)]
+        linhas += [iid for _, iids in self._history_window for iid in iids]
+        
+        tamanho = self.HISTORY_PAGE_SIZE
+        maximo = tamanho * self.HISTORY_MAX_PAGES
+        if len(linhas) > maximo:
+            self.tree_history.delete(*linhas[maximo:])
+            del linhas[maximo:]
+            self._history_end = False
+        self._history_window = [(i // tamanho, linhas[i:i + tamanho]) for i in range(0, len(linhas), tamanho)]
+        self._history_cursors = [None] + [self._history_cursor(iids[-1]) for _, iids in self._history_window]
+
+    def _history_cursor(self, iid):
+        """Cursor (timestamp, id) de uma linha exibida na tabela de histórico."""
+        return (self.tree_history.set(iid, "Data/Hora"), int(iid))
+
+    def populate_metrics_table(self, metrics):
+        """
+        Preenche a tabela de diagnóstico.
+        :param metrics: (dict) Métricas por etapa, como em AutomatonModel.get_metrics.
+        """
+        if self.tab_diagnostics is None:
+            return
+        self.tree_metrics.delete(*self.tree_metrics.get_children())
+        for nome, etapa in sorted(metrics.items(), key=lambda item: -item[1]["total"]):
+            tempos = (etapa[chave] * 1000 for chave in ("total", "media", "p50", "p90", "p99", "maximo"))
+            self.tree_metrics.insert("", END, values=(nome, etapa["chamadas"], *(f"{t:.3f}" for t in tempos)))
+
+    def show_progress(self, message, fraction=None):
+        """
+        Mostra que há uma tarefa em andamento (e habilita o Cancelar).
+        Sem 'fraction', a barra fica no modo indeterminado.
+        """
+        self.lbl_status.config(text=message)
+        self.btn_cancel.config(state="normal")
+        if fraction is None:
+            if str(self.progress.cget("mode")) != "indeterminate":
+                self.progress.config(mode="indeterminate")
+                self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.config(mode="determinate", value=fraction * 100)
+
+    def hide_progress(self, message=""):
+        """Esconde o progresso quando não há mais tarefas em andamento."""
+        self.progress.stop()
+        self.progress.config(mode="determinate", value=0)
+        self.lbl_status.config(text=message)
+        self.btn_cancel.config(state="disabled")
+
     def clear_create_form(self):
         """Limpa todos os campos do formulário 'Criar Autômato'."""
         self.entry_new_name.delete(0, END)
@@ -273,6 +567,7 @@ class AutomatonView:
         self.entry_new_initial.delete(0, END)
         self.entry_new_final.delete(0, END)
         self.text_new_transitions.delete("1.0", END)
+        self.combo_type.set("DFA")
         
     def show_message(self, title, message, type="info"):
         """Exibe um pop-up de mensagem."""